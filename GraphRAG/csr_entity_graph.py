@@ -0,0 +1,338 @@
+# pip install numpy langchain-community
+# --------------------------------------------------------------
+# csr_entity_graph.py
+#   GraphQAChain 용 NetworkxEntityGraph 대체 그래프 (수백만 트리플 규모)
+#     - 엔터티/관계 이름을 정수 ID 로 인터닝
+#     - 간선은 CSR(indptr + 정수 배열) 로 보관 → dict-of-dict 대비 메모리 대폭 절감
+#     - GraphDocument 목록에서 한 번에 적재 (add_node / add_edge 반복 호출 불필요)
+#     - get_entity_knowledge / get_triples 등 GraphQAChain 이 쓰는 인터페이스 그대로 제공
+# --------------------------------------------------------------
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from langchain_community.graphs.networkx_graph import KnowledgeTriple, NetworkxEntityGraph
+
+
+def _gather(indptr: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """nodes 각각의 CSR 구간 [indptr[i], indptr[i+1]) 을 이어 붙인 간선 위치 배열."""
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+
+
+class CSREntityGraph(NetworkxEntityGraph):
+    """
+    GraphQAChain.from_llm(llm=llm, graph=CSREntityGraph.from_graph_documents(graph_documents))
+
+    추가된 간선은 버퍼에 쌓였다가 첫 조회 시 CSR 로 압축된다.
+    같은 (시작, 끝) 간선을 다시 추가하면 NetworkX DiGraph 와 같이 관계만 덮어쓴다.
+    """
+
+    def __init__(self) -> None:   # networkx 를 사용하지 않으므로 부모 __init__ 은 호출하지 않음
+        self._graph = None
+        self.clear()
+
+    # -----------------------------
+    # 1) 인터닝 / 적재
+    # -----------------------------
+    def _node_id(self, name: str) -> int:
+        idx = self._ids.get(name)
+        if idx is None:
+            idx = self._ids[name] = len(self._names)
+            self._names.append(name)
+            self._alive.append(1)
+            self._dirty = True    # 노드 수가 바뀌었으므로 _indptr 재구성 필요
+        elif not self._alive[idx]:
+            self._alive[idx] = 1
+        return idx
+
+    def _relation_id(self, relation: str) -> int:
+        idx = self._rel_ids.get(relation)
+        if idx is None:
+            idx = self._rel_ids[relation] = len(self._relations)
+            self._relations.append(relation)
+        return idx
+
+    def add_triples(self, triples: Iterable[Tuple[str, str, str]]) -> None:
+        """(주어, 관계, 목적어) 트리플을 일괄 추가."""
+        for subject, predicate, object_ in triples:
+            self._buf_src.append(self._node_id(subject))
+            self._buf_dst.append(self._node_id(object_))
+            self._buf_rel.append(self._relation_id(predicate))
+        self._dirty = True
+
+    def add_graph_documents(self, graph_documents: Iterable[Any]) -> None:
+        """LLMGraphTransformer 결과(GraphDocument 목록)의 노드와 관계를 적재."""
+        for gd in graph_documents:
+            for node in gd.nodes:
+                self._node_id(str(node.id))
+            self.add_triples((str(r.source.id), r.type, str(r.target.id)) for r in gd.relationships)
+
+    @classmethod
+    def from_graph_documents(cls, graph_documents: Iterable[Any]) -> "CSREntityGraph":
+        graph = cls()
+        graph.add_graph_documents(graph_documents)
+        return graph
+
+    @classmethod
+    def from_networkx_entity_graph(cls, graph: NetworkxEntityGraph) -> "CSREntityGraph":
+        new = cls()
+        for node in graph._graph.nodes:
+            new._node_id(node)
+        new.add_triples((u, r, v) for u, v, r in graph.get_triples())
+        return new
+
+    # -----------------------------
+    # 2) CSR 압축
+    # -----------------------------
+    def _compact(self) -> None:
+        if not self._dirty:
+            return
+        src = np.concatenate([self._src, np.frombuffer(self._buf_src, dtype=np.int32)])
+        dst = np.concatenate([self._dst, np.frombuffer(self._buf_dst, dtype=np.int32)])
+        rel = np.concatenate([self._rel, np.frombuffer(self._buf_rel, dtype=np.int32)])
+        self._buf_src, self._buf_dst, self._buf_rel = array("i"), array("i"), array("i")
+
+        # 중복 간선: 순서는 처음 추가된 위치, 관계는 마지막 값 (DiGraph.add_edge 와 동일)
+        n = len(self._names)
+        keys = src.astype(np.int64) * n + dst
+        _, first = np.unique(keys, return_index=True)
+        _, last_rev = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last_rev
+        perm = np.argsort(first)
+        src, dst, rel = src[first[perm]], dst[first[perm]], rel[last[perm]]
+
+        # 시작 노드 기준 안정 정렬 → 같은 노드의 간선은 추가된 순서 유지
+        order = np.argsort(src, kind="stable")
+        self._src, self._dst, self._rel = src[order], dst[order], rel[order]
+        self._indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._src, minlength=n), out=self._indptr[1:])
+        self._rev = None
+        self._dirty = False
+
+    def _reverse(self) -> Tuple[np.ndarray, np.ndarray]:
+        """들어오는 간선용 CSR (끝 노드 기준). 필요할 때만 생성."""
+        self._compact()
+        if self._rev is None:
+            order = np.argsort(self._dst, kind="stable")
+            indptr = np.zeros(len(self._names) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self._dst, minlength=len(self._names)), out=indptr[1:])
+            self._rev = (indptr, order.astype(np.int64))
+        return self._rev
+
+    def _out(self, idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        a, b = self._indptr[idx], self._indptr[idx + 1]
+        return self._dst[a:b], self._rel[a:b]
+
+    def _drop_edges(self, mask: np.ndarray) -> None:
+        """mask 가 True 인 간선을 제거하고 CSR 재구성."""
+        self._src, self._dst, self._rel = self._src[~mask], self._dst[~mask], self._rel[~mask]
+        self._dirty = True
+        self._compact()
+
+    # -----------------------------
+    # 3) 조회 (GraphQAChain 이 사용하는 인터페이스)
+    # -----------------------------
+    def get_entity_knowledge(self, entity: str, depth: int = 1) -> List[str]:
+        """엔터티에서 depth 홉 이내의 "시작 관계 끝" 문자열 (nx.dfs_edges 와 같은 순서)."""
+        idx = self._ids.get(entity)
+        if idx is None or not self._alive[idx]:
+            return []
+        self._compact()
+        names, relations = self._names, self._relations
+        results = []
+        visited = {idx}
+        stack = [(idx, depth, iter(zip(*(a.tolist() for a in self._out(idx)))))]
+        while stack:
+            parent, remaining, children = stack[-1]
+            for child, rel in children:
+                if child in visited:
+                    continue
+                results.append(f"{names[parent]} {relations[rel]} {names[child]}")
+                visited.add(child)
+                if remaining > 1:
+                    stack.append((child, remaining - 1, iter(zip(*(a.tolist() for a in self._out(child))))))
+                break
+            else:
+                stack.pop()
+        return results
+
+    def neighborhood(self, entity: str, depth: int = 1, undirected: bool = False) -> Set[str]:
+        """depth 홉 이내의 엔터티 집합 (프런티어 단위 벡터 연산)."""
+        idx = self._ids.get(entity)
+        if idx is None or not self._alive[idx]:
+            return set()
+        self._compact()
+        seen = np.zeros(len(self._names), dtype=bool)
+        seen[idx] = True
+        frontier = np.array([idx], dtype=np.int64)
+        rev = self._reverse() if undirected else None
+        for _ in range(depth):
+            parts = [self._dst[_gather(self._indptr, frontier)]]
+            if rev is not None:
+                indptr, order = rev
+                parts.append(self._src[order[_gather(indptr, frontier)]])
+            nxt = np.unique(np.concatenate(parts))
+            nxt = nxt[~seen[nxt]]
+            if len(nxt) == 0:
+                break
+            seen[nxt] = True
+            frontier = nxt
+        return {self._names[i] for i in np.flatnonzero(seen).tolist()}
+
+    def entity_triples(self, entity: str) -> List[Tuple[str, str, str]]:
+        """엔터티가 주어 또는 목적어인 (주어, 목적어, 관계) 트리플."""
+        idx = self._ids.get(entity)
+        if idx is None or not self._alive[idx]:
+            return []
+        self._compact()
+        names, relations = self._names, self._relations
+        out = [(entity, names[d], relations[r]) for d, r in zip(*(a.tolist() for a in self._out(idx)))]
+        indptr, order = self._reverse()
+        edges = order[indptr[idx]:indptr[idx + 1]]
+        out.extend((names[s], entity, relations[r]) for s, r in zip(self._src[edges].tolist(), self._rel[edges].tolist()))
+        return out
+
+    def get_triples(self) -> List[Tuple[str, str, str]]:
+        """전체 (주어, 목적어, 관계) 트리플."""
+        self._compact()
+        names, relations = self._names, self._relations
+        return [
+            (names[s], names[d], relations[r])
+            for s, d, r in zip(self._src.tolist(), self._dst.tolist(), self._rel.tolist())
+        ]
+
+    def get_neighbors(self, node: str) -> List[str]:
+        idx = self._ids.get(node)
+        if idx is None or not self._alive[idx]:
+            raise KeyError(node)
+        self._compact()
+        return [self._names[i] for i in self._out(idx)[0].tolist()]
+
+    def has_node(self, node: str) -> bool:
+        idx = self._ids.get(node)
+        return idx is not None and bool(self._alive[idx])
+
+    def has_edge(self, source_node: str, destination_node: str) -> bool:
+        if not (self.has_node(source_node) and self.has_node(destination_node)):
+            return False
+        self._compact()
+        return bool((self._out(self._ids[source_node])[0] == self._ids[destination_node]).any())
+
+    def get_number_of_nodes(self) -> int:
+        return sum(self._alive)
+
+    def get_number_of_edges(self) -> int:
+        self._compact()
+        return len(self._src)
+
+    def get_topological_sort(self) -> List[str]:
+        """Kahn 알고리즘. 순환이 있으면 ValueError."""
+        self._compact()
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        indegree = np.bincount(self._dst, minlength=len(self._names))
+        queue = [i for i in np.flatnonzero(alive & (indegree == 0)).tolist()]
+        order = []
+        while queue:
+            idx = queue.pop()
+            order.append(self._names[idx])
+            for child in self._out(idx)[0].tolist():
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+        if len(order) != int(alive.sum()):
+            raise ValueError("Graph contains a cycle")
+        return order
+
+    # -----------------------------
+    # 4) 수정
+    # -----------------------------
+    def add_node(self, node: str) -> None:
+        self._node_id(node)
+
+    def add_triple(self, knowledge_triple: KnowledgeTriple) -> None:
+        self.add_triples([(knowledge_triple.subject, knowledge_triple.predicate, knowledge_triple.object_)])
+
+    def delete_triple(self, knowledge_triple: KnowledgeTriple) -> None:
+        if self.has_edge(knowledge_triple.subject, knowledge_triple.object_):
+            self.remove_edge(knowledge_triple.subject, knowledge_triple.object_)
+
+    def remove_edge(self, source_node: str, destination_node: str) -> None:
+        if not self.has_edge(source_node, destination_node):
+            raise KeyError((source_node, destination_node))
+        self._drop_edges((self._src == self._ids[source_node]) & (self._dst == self._ids[destination_node]))
+
+    def remove_node(self, node: str) -> None:
+        if not self.has_node(node):
+            return
+        self._compact()
+        idx = self._ids[node]
+        self._alive[idx] = 0   # ID 는 재사용하지 않고 비활성 표시만
+        self._drop_edges((self._src == idx) | (self._dst == idx))
+
+    def clear(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._alive = bytearray()
+        self._rel_ids: Dict[str, int] = {}
+        self._relations: List[str] = []
+        self.clear_edges()
+
+    def clear_edges(self) -> None:
+        self._buf_src, self._buf_dst, self._buf_rel = array("i"), array("i"), array("i")
+        self._src = np.zeros(0, dtype=np.int32)
+        self._dst = np.zeros(0, dtype=np.int32)
+        self._rel = np.zeros(0, dtype=np.int32)
+        self._indptr = np.zeros(len(self._names) + 1, dtype=np.int64)
+        self._rev: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._dirty = True
+
+    # -----------------------------
+    # 5) 저장 / 변환
+    # -----------------------------
+    def save(self, path: str) -> None:
+        """npz 파일로 저장 (GML 보다 훨씬 빠르고 작음)."""
+        self._compact()
+        np.savez_compressed(
+            path,
+            names=np.array(self._names, dtype=object),
+            relations=np.array(self._relations, dtype=object),
+            alive=np.frombuffer(self._alive, dtype=np.uint8),
+            src=self._src, dst=self._dst, rel=self._rel,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CSREntityGraph":
+        data = np.load(path, allow_pickle=True)
+        graph = cls()
+        graph._names = data["names"].tolist()
+        graph._ids = {name: i for i, name in enumerate(graph._names)}
+        graph._relations = data["relations"].tolist()
+        graph._rel_ids = {r: i for i, r in enumerate(graph._relations)}
+        graph._alive = bytearray(data["alive"].tobytes())
+        graph._src, graph._dst, graph._rel = data["src"], data["dst"], data["rel"]
+        graph._dirty = True
+        graph._compact()
+        return graph
+
+    def to_networkx(self) -> Any:
+        import networkx as nx
+
+        g = nx.DiGraph()
+        g.add_nodes_from(name for name, alive in zip(self._names, self._alive) if alive)
+        g.add_edges_from((s, d, {"relation": r}) for s, d, r in self.get_triples())
+        return g
+
+    def write_to_gml(self, path: str) -> None:
+        import networkx as nx
+
+        nx.write_gml(self.to_networkx(), path)
+
+    @classmethod
+    def from_gml(cls, gml_path: str) -> "CSREntityGraph":
+        return cls.from_networkx_entity_graph(NetworkxEntityGraph.from_gml(gml_path))
+
+    def draw_graphviz(self, **kwargs: Any) -> None:
+        NetworkxEntityGraph(self.to_networkx()).draw_graphviz(**kwargs)
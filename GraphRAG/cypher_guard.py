@@ -0,0 +1,244 @@
+# pip install neo4j
+# --------------------------------------------------------------
+# cypher_guard.py
+#   LLM 이 생성한 Cypher 를 실행하기 전 검사하는 단계
+#     ① 정적 검사: 쓰기 절/허용되지 않은 프로시저 거부, 가변 길이 경로 상한, LIMIT 주입
+#     ② EXPLAIN 으로 예상 행 수/연산자 확인 → 예산 초과 시 거부
+#     ③ 서버 측 트랜잭션 타임아웃을 걸고 실행
+# --------------------------------------------------------------
+import functools
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from neo4j import Query, READ_ACCESS
+
+_STRING_OR_COMMENT_RE = re.compile(
+    r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|//[^\n]*|/\*.*?\*/", re.S
+)
+_WRITE_RE = re.compile(
+    r"(?<![.\w])(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)(?!\w)", re.I
+)
+_CALL_RE = re.compile(r"(?<![.\w])CALL\s+([A-Za-z_][\w.]*)", re.I)
+_UNION_RE = re.compile(r"(?<![.\w])UNION(\s+ALL)?(?!\w)", re.I)
+_LIMIT_RE = re.compile(r"(?<![.\w])LIMIT\s+(?:(\d+)|\$(\w+))\s*$", re.I)   # LIMIT 100 / LIMIT $n
+_LIMIT_PARAM_RE = re.compile(r"(?<![.\w])LIMIT\s+\$(\w+)", re.I)
+# 관계 패턴 -[r:TYPE*1..3 {...}]- 의 가변 길이 부분 (리스트 [x IN xs | x*10] 의 곱셈은 제외)
+_VARLEN_RE = re.compile(
+    r"-\s*\[\s*(?:[A-Za-z_]\w*)?\s*(?::[^*{\[\]]*)?\*\s*(\d*)\s*(\.\.\s*(\d*))?(?=[^\[\]]*\]\s*-)"
+)
+_FENCE_RE = re.compile(r"^```(?:cypher)?\s*|\s*```$", re.I)
+
+READ_PROCEDURES = (
+    "db.labels",
+    "db.relationshipTypes",
+    "db.propertyKeys",
+    "db.schema.visualization",
+    "db.index.vector.queryNodes",
+    "db.index.fulltext.queryNodes",
+)
+
+
+class CypherRejected(ValueError):
+    """가드가 실행을 거부한 쿼리."""
+
+
+def _mask(query: str) -> str:
+    # 문자열·주석 내부를 같은 길이의 공백으로 바꿔 키워드 검사와 위치 계산에 사용
+    return _STRING_OR_COMMENT_RE.sub(lambda m: m.group(0)[0] + " " * (len(m.group(0)) - 1), query)
+
+
+class CypherGuard:
+    def __init__(
+        self,
+        driver: Any,                           # neo4j.GraphDatabase.driver(...)
+        database: Optional[str] = None,
+        max_limit: int = 100,                  # RETURN 결과 최대 행 수 (LIMIT 주입/축소)
+        max_hops: int = 5,                     # 가변 길이 경로 최대 홉 수
+        max_estimated_rows: float = 1_000_000, # EXPLAIN 추정 행 수 예산
+        reject_operators: Iterable[str] = ("CartesianProduct",),
+        timeout: float = 10.0,                 # 서버 측 트랜잭션 타임아웃(초)
+        allowed_procedures: Iterable[str] = READ_PROCEDURES,
+    ):
+        self.driver = driver
+        self.database = database
+        self.max_limit = max_limit
+        self.max_hops = max_hops
+        self.max_estimated_rows = max_estimated_rows
+        self.reject_operators = set(reject_operators)
+        self.timeout = timeout
+        self.allowed_procedures = tuple(allowed_procedures)
+
+    # -----------------------------
+    # ① 정적 검사 + 재작성
+    # -----------------------------
+    def validate(self, query: str) -> str:
+        """쓰기/위험 구문을 거부하고, 가변 길이 경로 상한과 LIMIT 을 넣은 쿼리를 반환."""
+        query = _FENCE_RE.sub("", query.strip()).rstrip().rstrip(";")
+        masked = _mask(query)
+
+        m = _WRITE_RE.search(masked)
+        if m:
+            raise CypherRejected(f"쓰기 구문은 허용되지 않습니다: {m.group(1).upper()}")
+        for m in _CALL_RE.finditer(masked):
+            if not m.group(1).startswith(self.allowed_procedures):
+                raise CypherRejected(f"허용되지 않은 프로시저: {m.group(1)}")
+
+        query = self._bound_var_length(query, masked)
+        return self._inject_limit(query)
+
+    def _bound_var_length(self, query: str, masked: str) -> str:
+        out, last = [], 0
+        for m in _VARLEN_RE.finditer(masked):
+            lo, has_range, hi = m.group(1), m.group(2), m.group(3)
+            if not has_range and lo:
+                upper = int(lo)                      # *3 (정확히 3홉)
+            elif has_range and hi:
+                upper = int(hi)                      # *1..3
+            else:
+                upper = None                         # *, *2.., *..
+                if lo and int(lo) > self.max_hops:
+                    raise CypherRejected(f"가변 길이 경로가 너무 깁니다: *{lo}.. (최대 {self.max_hops})")
+            if upper is not None and upper > self.max_hops:
+                raise CypherRejected(f"가변 길이 경로가 너무 깁니다: *{lo}..{upper} (최대 {self.max_hops})")
+            if upper is None:
+                star = masked.index("*", m.start())
+                out.append(query[last:star])
+                out.append(f"*{lo or 1}..{self.max_hops}")
+                last = m.end()
+        out.append(query[last:])
+        return "".join(out)
+
+    def _inject_limit(self, query: str) -> str:
+        masked = _mask(query)
+        bounds, start = [], 0
+        for m in _UNION_RE.finditer(masked):
+            bounds.append((start, m.start(), m.group(0)))
+            start = m.end()
+        bounds.append((start, len(query), ""))
+
+        parts = []
+        for s, e, union in bounds:
+            part = query[s:e].strip()
+            if re.search(r"(?<![.\w])RETURN(?!\w)", _mask(part), re.I):
+                m = _LIMIT_RE.search(_mask(part))
+                if m is None:
+                    part = f"{part}\nLIMIT {self.max_limit}"
+                elif m.group(1) is not None and int(m.group(1)) > self.max_limit:
+                    part = part[:m.start(1)] + str(self.max_limit) + part[m.end(1):]
+            parts.append(part + (f"\n{union.strip()}\n" if union else ""))
+        return "".join(parts)
+
+    # -----------------------------
+    # ② EXPLAIN 비용 검사
+    # -----------------------------
+    def explain(self, query: str, params: Optional[Dict[str, Any]] = None) -> Tuple[float, List[str]]:
+        """(연산자 중 최대 추정 행 수, 연산자 목록) 반환. 쿼리는 실제로 실행되지 않는다."""
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as s:
+            plan = s.run(f"EXPLAIN {query}", params or {}).consume().plan or {}
+
+        max_rows, operators = 0.0, []
+        stack = [plan]
+        while stack:
+            op = stack.pop()
+            if not op:
+                continue
+            operators.append(str(op.get("operatorType", "")).split("@")[0])
+            args = op.get("args") or op.get("arguments") or {}
+            max_rows = max(max_rows, float(args.get("EstimatedRows", 0) or 0))
+            stack.extend(op.get("children", []))
+        return max_rows, operators
+
+    def check(self, query: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """정적 검사 + EXPLAIN 예산 검사를 통과한 (재작성된) 쿼리 반환."""
+        query = self.validate(query)
+        rows, operators = self.explain(query, params)
+        bad = self.reject_operators.intersection(operators)
+        if bad:
+            raise CypherRejected(f"허용되지 않은 실행 계획 연산자: {', '.join(sorted(bad))}")
+        if rows > self.max_estimated_rows:
+            raise CypherRejected(f"예상 처리 행 수 초과: {rows:,.0f} > {self.max_estimated_rows:,.0f}")
+        return query
+
+    # -----------------------------
+    # ③ 타임아웃을 건 실행
+    # -----------------------------
+    def bound_params(self, query: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """LIMIT $n 의 파라미터 값이 max_limit 보다 크면 max_limit 으로 줄인 파라미터 사본."""
+        params = dict(params or {})
+        for m in _LIMIT_PARAM_RE.finditer(_mask(query)):
+            value = params.get(m.group(1))
+            if isinstance(value, int) and value > self.max_limit:
+                params[m.group(1)] = self.max_limit
+        return params
+
+    def run(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        query = self.check(query, params)
+        return self._execute(query, self.bound_params(query, params))
+
+    def _execute(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        # 서버 측 트랜잭션 타임아웃은 Query(timeout=) 로만 적용됨
+        with self.driver.session(database=self.database, default_access_mode=READ_ACCESS) as s:
+            result = s.run(Query(query, timeout=self.timeout), params or {})
+            return [record.data() for record in result]
+
+    def install(self, graph: Any, internal: Iterable[str] = ("refresh_schema", "add_graph_documents")) -> Any:
+        """
+        Neo4jGraph.query 를 가드된 실행으로 교체.
+        GraphCypherQAChain 이 생성한 쿼리도 이 경로로 실행되며, 원래 graph.query 대신
+        가드의 드라이버로 읽기 세션 + self.timeout 을 적용해 실행한다.
+        internal 메서드(스키마 조회, 그래프 적재) 안에서 호출되는 graph.query 는 원래 메서드로 실행한다.
+        """
+        if self.database is None:
+            self.database = getattr(graph, "_database", None)
+        original = graph.query
+        state = threading.local()
+
+        def guarded_query(query: str, params: Optional[Dict[str, Any]] = None, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+            if getattr(state, "depth", 0):
+                return original(query, params or {}, *args, **kwargs)
+            return self.run(query, params)
+
+        def unguarded(method: Callable[..., Any]) -> Callable[..., Any]:
+            @functools.wraps(method)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                state.depth = getattr(state, "depth", 0) + 1
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    state.depth -= 1
+            return wrapper
+
+        for name in internal:
+            method = getattr(graph, name, None)
+            if method is not None:
+                setattr(graph, name, unguarded(method))
+        graph.query = guarded_query
+        return graph
+
+
+def run_generated(
+    guard: CypherGuard,
+    question: str,
+    generate: Callable[[str], str],
+    params: Optional[Dict[str, Any]] = None,
+    max_retries: int = 1,
+) -> List[Dict[str, Any]]:
+    """
+    generate(question) 으로 Cypher 생성 후 가드 실행.
+    거부되면 거부 사유와 제약을 덧붙인 질문으로 다시 생성한다.
+    """
+    prompt = question
+    for attempt in range(max_retries + 1):
+        cypher = generate(prompt)
+        try:
+            return guard.run(cypher, params)
+        except CypherRejected as e:
+            if attempt == max_retries:
+                raise
+            prompt = (
+                f"{question}\n"
+                f"(이전 쿼리가 거부되었습니다: {e}. 읽기 전용으로, 반드시 LIMIT {guard.max_limit} 이하를 포함하고, "
+                f"연결되지 않은 MATCH(데카르트 곱)나 {guard.max_hops}홉을 넘는 가변 길이 경로는 사용하지 마세요.)"
+            )
+    return []
@@ -0,0 +1,189 @@
+# --------------------------------------------------------------
+# cypher_template_cache.py
+#   Text-to-Cypher 결과를 "질문 형태 → 파라미터화된 Cypher 템플릿" 으로 캐시
+#
+#   "현대에서 만든 자동차 브랜드는 무엇인가요?"
+#     → MATCH (m:Manufacturer {Name: '현대'})-[:PRODUCES]->(b:Brand) RETURN b.Name
+#   를 한 번 생성하면
+#     질문 형태: "{p0}에서 만든 자동차 브랜드는 무엇인가요"
+#     템플릿  : MATCH (m:Manufacturer {Name: $p0})-[:PRODUCES]->(b:Brand) RETURN b.Name
+#   로 저장하고, "기아에서 만든 자동차 브랜드는 무엇인가요?" 는 LLM 호출 없이 p0='기아' 로 실행
+# --------------------------------------------------------------
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 작은따옴표/큰따옴표 문자열 리터럴 (이스케이프 포함)
+_STRING_LITERAL_RE = re.compile(r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"")
+_SPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.？！]+$")
+
+
+def normalize_question(question: str) -> str:
+    q = _SPACE_RE.sub(" ", question.strip())
+    return _TRAILING_PUNCT_RE.sub("", q)
+
+
+def parameterize(question: str, cypher: str) -> Tuple[str, str, List[str]]:
+    """
+    Cypher 의 문자열 리터럴 중 질문에 그대로 등장하는 값을 파라미터로 추출.
+    반환: (질문 형태, 파라미터화된 Cypher, 파라미터 이름 목록)
+    """
+    shape = normalize_question(question)
+    literals = [
+        (m, m.group(1) if m.group(1) is not None else m.group(2)) for m in _STRING_LITERAL_RE.finditer(cypher)
+    ]
+
+    # 긴 값부터 질문 안의 위치를 차지: "현대자동차" 가 먼저 자리를 잡으면 그 안의 "현대" 는 파라미터가 되지 않음.
+    # 이미 차지한 구간과 겹치지 않는 위치가 정확히 한 곳인 값만 파라미터로 사용
+    spans: Dict[str, Tuple[int, int]] = {}
+    for value in sorted({v for _, v in literals if v}, key=len, reverse=True):
+        found = [
+            (m.start(), m.end()) for m in re.finditer(re.escape(value), shape)
+            if all(m.end() <= a or m.start() >= b for a, b in spans.values())
+        ]
+        if len(found) == 1:
+            spans[value] = found[0]
+
+    names: Dict[str, str] = {}   # 리터럴 값 -> 파라미터 이름 (Cypher 에 나온 순서, 같은 값은 같은 파라미터)
+    out, last = [], 0
+    for m, value in literals:
+        if value not in spans:
+            continue   # 질문에 없거나 위치가 모호한 리터럴은 그대로 둠
+        names.setdefault(value, f"p{len(names)}")
+        out.append(cypher[last:m.start()] + f"${names[value]}")
+        last = m.end()
+    template = "".join(out) + cypher[last:]
+
+    for value, (a, b) in sorted(spans.items(), key=lambda item: item[1][0], reverse=True):
+        shape = shape[:a] + "{" + names[value] + "}" + shape[b:]
+    return shape, template, list(names.values())
+
+
+def _shape_to_regex(shape: str) -> re.Pattern:
+    parts = re.split(r"\{(p\d+)\}", shape)
+    pattern = []
+    for i, part in enumerate(parts):
+        pattern.append(f"(?P<{part}>.+?)" if i % 2 else re.escape(part))
+    return re.compile("".join(pattern))
+
+
+class CypherTemplateCache:
+    """
+    질문 형태별 Cypher 템플릿 캐시 (LRU, 선택적으로 JSON 파일에 영구 저장).
+    entity_validator 를 주면 추출한 값이 실제 엔터티인지 확인한 뒤에만 템플릿을 재사용한다.
+    """
+
+    def __init__(
+        self,
+        max_templates: int = 200,
+        path: Optional[str] = None,
+        entity_validator: Optional[Callable[[str, str], bool]] = None,  # (파라미터 이름, 값) -> bool
+    ):
+        self.max_templates = max_templates
+        self.path = path
+        self.entity_validator = entity_validator
+        self._templates: "OrderedDict[str, Tuple[re.Pattern, str, List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def lookup(self, question: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """일치하는 템플릿이 있으면 (Cypher 템플릿, 파라미터) 반환."""
+        q = normalize_question(question)
+        with self._lock:
+            for shape, (regex, template, params) in reversed(self._templates.items()):
+                m = regex.fullmatch(q)
+                if m is None:
+                    continue
+                groups = m.groupdict()
+                if any(p not in groups for p in params):
+                    continue   # 파라미터가 질문 형태에서 빠진 (예전에 잘못 저장된) 템플릿
+                bound = {p: groups[p] for p in params}
+                if self.entity_validator and not all(self.entity_validator(p, v) for p, v in bound.items()):
+                    continue
+                self._templates.move_to_end(shape)
+                self.stats["hits"] += 1
+                return template, bound
+            self.stats["misses"] += 1
+        return None
+
+    def _prepare(self, question: str, cypher: str) -> Optional[Tuple[str, re.Pattern, str, Dict[str, str]]]:
+        """
+        (질문 형태, 정규식, 템플릿, 파라미터). 질문 형태에 모든 파라미터가 있고
+        원래 질문이 그 형태와 일치하는 경우에만 반환 (아니면 None: 캐시하지 않음).
+        """
+        shape, template, params = parameterize(question, cypher)
+        if set(re.findall(r"\{(p\d+)\}", shape)) != set(params):
+            return None
+        regex = _shape_to_regex(shape)
+        m = regex.fullmatch(normalize_question(question))
+        if m is None:
+            return None
+        return shape, regex, template, m.groupdict()
+
+    def add(self, question: str, cypher: str) -> Tuple[str, Dict[str, str]]:
+        """
+        실행에 성공한 Cypher 를 템플릿으로 등록하고 (템플릿, 파라미터) 반환.
+        파라미터화할 수 없으면 등록하지 않고 (원래 Cypher, {}) 반환.
+        """
+        prepared = self._prepare(question, cypher)
+        if prepared is None:
+            return cypher, {}
+        shape, regex, template, bound = prepared
+        params = sorted(bound, key=lambda p: int(p[1:]))
+        with self._lock:
+            self._templates[shape] = (regex, template, params)
+            self._templates.move_to_end(shape)
+            while len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+        if self.path:
+            self.save(self.path)
+        return template, bound
+
+    def get_or_generate(
+        self, question: str, generate: Callable[[str], str]
+    ) -> Tuple[str, Dict[str, str], bool]:
+        """
+        캐시 조회 후 없으면 generate(question) (예: generate_cypher_query) 로 생성.
+        생성한 Cypher 는 아직 등록하지 않으므로, 실행에 성공한 뒤 add(question, cypher) 를 호출 (또는 run() 사용).
+        반환: (Cypher, 파라미터, 캐시 적중 여부)
+        """
+        hit = self.lookup(question)
+        if hit is not None:
+            return hit[0], hit[1], True
+        return generate(question), {}, False
+
+    def run(
+        self, question: str, generate: Callable[[str], str], execute: Callable[[str, Dict[str, str]], Any]
+    ) -> Tuple[Any, str, Dict[str, str], bool]:
+        """
+        get_or_generate 후 execute(Cypher, 파라미터) (예: db.run_query) 로 실행.
+        새로 생성한 Cypher 는 예외 없이 실행된 경우에만 템플릿으로 등록한다.
+        반환: (실행 결과, Cypher, 파라미터, 캐시 적중 여부)
+        """
+        cypher, params, hit = self.get_or_generate(question, generate)
+        results = execute(cypher, params)
+        if not hit:
+            self.add(question, cypher)
+        return results, cypher, params, hit
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = [{"shape": s, "template": t, "params": p} for s, (_, t, p) in self._templates.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def load(self, path: str) -> None:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            for item in data:
+                self._templates[item["shape"]] = (_shape_to_regex(item["shape"]), item["template"], item["params"])
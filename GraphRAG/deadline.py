@@ -0,0 +1,343 @@
+# pip install neo4j openai
+# --------------------------------------------------------------
+# deadline.py
+#   워크플로 전체 마감 시각(deadline)을 LLM / 그래프 / 툴 호출까지 전달
+#     - with scope(60): ... → 안쪽의 모든 호출이 남은 시간 안에서만 실행 (contextvars 로 전달)
+#     - 호출별 예산(budget): 남은 시간과 예산 중 짧은 쪽이 그 호출의 timeout
+#     - 협조적 취소: cancel() 하면 check() / sleep() 이 Cancelled 를 발생
+#     - 재시도는 지터 백오프로, 남은 시간 안에 다시 시도할 수 있을 때만
+#     - hard=True 호출은 별도 스레드에서 실행해 응답이 없어도 timeout 에 반환 (스레드는 버려짐)
+#
+#   with scope(30, name="workflow"):
+#       runnable = graph_query(driver, q, {"state": state}, budget=3)
+#       resp = chat_completion(client, budget=15, model="gpt-4o-mini", messages=[...])
+#       out = call_tool(VaR_Calculator, context, tool_args, budget=5)
+# --------------------------------------------------------------
+import contextvars
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+
+class DeadlineExceeded(TimeoutError):
+    """마감 시각(또는 호출 예산)을 넘김."""
+
+
+class Cancelled(RuntimeError):
+    """cancel() 로 취소된 작업."""
+
+
+# -----------------------------
+# 1) Deadline
+# -----------------------------
+class Deadline:
+    """
+    부모의 마감 시각과 취소 상태를 물려받는 마감 시각.
+    자식은 부모보다 늦게 끝날 수 없고, 부모를 취소하면 자식도 취소된 것으로 본다.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None, name: str = ""):
+        now = time.monotonic()
+        expires_at = now + seconds if seconds is not None else math.inf
+        if parent is not None:
+            expires_at = min(expires_at, parent.expires_at)
+        self.expires_at = expires_at
+        self.budget = seconds
+        self.parent = parent
+        self.name = name or (parent.name if parent is not None else "deadline")
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._token: Optional[contextvars.Token] = None
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def timeout(self, cap: Optional[float] = None) -> Optional[float]:
+        """네이티브 timeout 인자에 넘길 값 (제한이 없으면 None)."""
+        remaining = self.remaining()
+        if cap is not None:
+            remaining = min(remaining, cap)
+        return None if math.isinf(remaining) else remaining
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        self.reason = reason
+        self._event.set()
+
+    def cancelled(self) -> bool:
+        node: Optional[Deadline] = self
+        while node is not None:
+            if node._event.is_set():
+                return True
+            node = node.parent
+        return False
+
+    def _cancel_reason(self) -> str:
+        node: Optional[Deadline] = self
+        while node is not None:
+            if node._event.is_set():
+                return f"{node.name}: {node.reason}"
+            node = node.parent
+        return self.name
+
+    def check(self) -> None:
+        """긴 작업 중간중간 호출: 취소됐거나 시간이 지났으면 예외."""
+        if self.cancelled():
+            raise Cancelled(self._cancel_reason())
+        if self.expired():
+            raise DeadlineExceeded(f"{self.name} exceeded its {self._describe()} deadline")
+
+    def sleep(self, seconds: float) -> None:
+        """취소되면 바로 깨어나는 sleep. 남은 시간보다 길게 자지 않는다."""
+        end = time.monotonic() + min(seconds, self.remaining())
+        while True:
+            if self.cancelled():
+                self.check()
+            left = end - time.monotonic()
+            if left <= 0:
+                return
+            # 자기 이벤트는 바로 깨우고, 부모 취소는 짧은 간격으로 확인
+            self._event.wait(min(left, 0.05))
+
+    def _describe(self) -> str:
+        return f"{self.budget:.2f}s" if self.budget is not None else "inherited"
+
+    def __enter__(self) -> "Deadline":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("deadline", default=None)
+
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+
+def scope(seconds: Optional[float] = None, name: str = "") -> Deadline:
+    """현재 마감 시각의 자식. with scope(5): ... 안에서는 current() 가 이 마감 시각."""
+    return Deadline(seconds, parent=current(), name=name)
+
+
+def remaining() -> float:
+    d = current()
+    return d.remaining() if d is not None else math.inf
+
+
+def check() -> None:
+    d = current()
+    if d is not None:
+        d.check()
+
+
+def spawn(target: Callable[..., Any], *args: Any, **kwargs: Any) -> threading.Thread:
+    """현재 마감 시각(contextvars)을 물려받는 스레드 시작. ThreadPoolExecutor 에는 contextvars.copy_context().run 을 넘긴다."""
+    ctx = contextvars.copy_context()
+    thread = threading.Thread(target=ctx.run, args=(target, *args), kwargs=kwargs, daemon=True)
+    thread.start()
+    return thread
+
+
+# -----------------------------
+# 2) 예산 + 재시도
+# -----------------------------
+def _run_hard(d: Deadline, fn: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]) -> Any:
+    # 응답이 없는 호출도 timeout 에 돌아오도록 별도 스레드에서 실행
+    box: Dict[str, Any] = {}
+
+    def target() -> None:
+        try:
+            box["result"] = fn(*args, **kwargs)
+        except BaseException as e:
+            box["error"] = e
+
+    allowed = d.timeout()
+    thread = spawn(target)
+    while thread.is_alive() and not d.expired():
+        if d.cancelled():
+            d.check()             # 응답 없는 호출이어도 취소되면 바로 반환
+        thread.join(min(d.remaining(), 0.05))
+    if thread.is_alive():
+        d.cancel("timed out")     # 툴이 check() 를 호출하면 여기서 멈춤
+        raise DeadlineExceeded(f"{d.name} did not finish within {allowed:.2f}s")
+    if "error" in box:
+        raise box["error"]
+    return box["result"]
+
+
+def call(
+    fn: Callable[..., Any],
+    *args: Any,
+    budget: Optional[float] = None,                     # 시도 1회의 최대 시간 (남은 시간이 더 짧으면 그쪽)
+    retries: int = 0,
+    retry_on: Tuple[Type[BaseException], ...] = (),      # 재시도할 예외 (시도 예산 초과는 항상 재시도 대상)
+    backoff: float = 0.2,                                # 백오프 기준 (full jitter: 0 ~ backoff * 2^n)
+    max_backoff: float = 2.0,
+    hard: bool = False,
+    name: str = "call",
+    **kwargs: Any,
+) -> Any:
+    """
+    fn 을 현재 마감 시각의 자식 scope 안에서 실행.
+    fn 안에서는 current().timeout() 으로 네이티브 timeout 값을 얻을 수 있다.
+    """
+    parent = current()
+    last: Optional[BaseException] = None
+    for attempt in range(retries + 1):
+        if parent is not None:
+            parent.check()
+        with Deadline(budget, parent=parent, name=f"{name}#{attempt + 1}") as d:
+            try:
+                d.check()
+                return _run_hard(d, fn, args, kwargs) if hard else fn(*args, **kwargs)
+            except Cancelled:
+                raise
+            except DeadlineExceeded as e:
+                # 워크플로 마감이 지났으면 중단, 이번 시도의 예산만 넘겼으면 재시도
+                if parent is not None and parent.expired():
+                    raise
+                last = e
+            except retry_on as e:
+                last = e
+        if attempt == retries:
+            break
+        delay = random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+        left = parent.remaining() if parent is not None else math.inf
+        if delay >= left:
+            break    # 기다리고 나면 다시 시도할 시간이 없음
+        if parent is not None:
+            parent.sleep(delay)
+        else:
+            time.sleep(delay)
+    assert last is not None
+    if parent is not None and parent.expired() and not isinstance(last, DeadlineExceeded):
+        raise DeadlineExceeded(f"{parent.name} expired after {attempt + 1} attempt(s) of {name}") from last
+    raise last
+
+
+# -----------------------------
+# 3) LLM / 그래프 / 툴 호출
+# -----------------------------
+def _openai_transient() -> Tuple[Type[BaseException], ...]:
+    try:
+        import openai
+    except ImportError:
+        return (TimeoutError, ConnectionError)
+    return (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+
+def _neo4j_transient() -> Tuple[Type[BaseException], ...]:
+    try:
+        from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+    except ImportError:
+        return (TimeoutError, ConnectionError)
+    return (ServiceUnavailable, SessionExpired, TransientError)
+
+
+def chat_completion(client: Any, budget: Optional[float] = 30.0, retries: int = 2, hard: bool = True, **kwargs: Any) -> Any:
+    """client.chat.completions.create(**kwargs) 를 예산 안에서 실행 (SDK 자체 재시도는 끄고 여기서 재시도)."""
+    def attempt() -> Any:
+        timeout = current().timeout()
+        return client.with_options(timeout=timeout, max_retries=0).chat.completions.create(**kwargs)
+
+    return call(attempt, budget=budget, retries=retries, retry_on=_openai_transient(), hard=hard, name="llm")
+
+
+def graph_query(
+    driver: Any,
+    query: str,
+    params: Optional[Dict[str, Any]] = None,
+    budget: Optional[float] = 5.0,
+    write: bool = False,
+    retries: Optional[int] = None,      # None 이면 읽기 2회, 쓰기 0회 (쓰기는 멱등일 때만 재시도 지정)
+    database: Optional[str] = None,
+    hard: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    s.run(query, params).data() 를 예산 안에서 실행.
+    서버 쪽 트랜잭션 timeout 도 남은 시간으로 설정 (execute_read 의 자체 재시도 대신 auto-commit + 여기서 재시도).
+    """
+    from neo4j import Query
+
+    def attempt() -> List[Dict[str, Any]]:
+        with driver.session(database=database) as s:
+            return s.run(Query(query, timeout=current().timeout()), params or {}).data()
+
+    name = "graph-write" if write else "graph"
+    if retries is None:
+        retries = 0 if write else 2
+    return call(attempt, budget=budget, retries=retries, retry_on=_neo4j_transient(), hard=hard, name=name)
+
+
+def call_tool(
+    fn: Callable[..., Dict[str, Any]],
+    context: Dict[str, Any],
+    tool_args: Optional[Dict[str, Any]] = None,
+    budget: Optional[float] = 10.0,
+    retries: int = 0,                   # 툴은 부작용이 있을 수 있으므로 기본은 재시도 안 함
+) -> Dict[str, Any]:
+    """fn(context, **tool_args) 를 예산 안에서 실행. 오래 걸리는 툴은 안에서 deadline.check() 를 호출하면 바로 멈춘다."""
+    return call(fn, context, budget=budget, retries=retries, hard=True, name=getattr(fn, "__name__", "tool"), **(tool_args or {}))
+
+
+if __name__ == "__main__":
+    # 멈춘 LLM / 일시 오류가 나는 그래프 / 협조적 툴을 흉내 내 마감 시각 동작 확인
+    class StuckLLM:
+        def with_options(self, **options: Any) -> "StuckLLM":
+            self.options = options
+            return self
+
+        @property
+        def chat(self) -> "StuckLLM":
+            return self
+
+        @property
+        def completions(self) -> "StuckLLM":
+            return self
+
+        def create(self, **kwargs: Any) -> str:
+            time.sleep(60)       # 응답 없음 (timeout 도 무시)
+            return "never"
+
+    attempts = {"graph": 0}
+
+    def flaky_graph() -> List[str]:
+        attempts["graph"] += 1
+        if attempts["graph"] < 3:
+            raise ConnectionError("connection reset")
+        return ["AssessRisk", "Optimize"]
+
+    def slow_tool(context: Dict[str, Any], steps: int = 100) -> Dict[str, Any]:
+        for _ in range(steps):
+            check()              # 취소되거나 예산을 넘기면 여기서 중단
+            time.sleep(0.05)
+        return {"risk_score": 0.97}
+
+    def timed(label: str, fn: Callable[[], Any]) -> None:
+        start = time.perf_counter()
+        try:
+            result = fn()
+            outcome = f"ok {result}"
+        except (DeadlineExceeded, Cancelled) as e:
+            outcome = f"{type(e).__name__}: {e}"
+        print(f"{label:<32} {time.perf_counter() - start:6.2f}s  {outcome}")
+
+    with scope(3.0, name="workflow"):
+        timed("graph (2 transient errors)", lambda: call(flaky_graph, budget=0.5, retries=3, retry_on=(ConnectionError,), backoff=0.05, name="graph"))
+        timed("stuck LLM, budget 0.5s x3", lambda: chat_completion(StuckLLM(), budget=0.5, retries=2, model="m", messages=[]))
+        timed("tool 5s, budget 0.3s", lambda: call_tool(slow_tool, {}, budget=0.3))
+        timed("stuck LLM, rest of workflow", lambda: chat_completion(StuckLLM(), budget=None, retries=0, model="m", messages=[]))
+        timed("graph after workflow deadline", lambda: call(flaky_graph, name="graph"))
+
+    with scope(10.0, name="workflow") as workflow:
+        threading.Timer(0.3, workflow.cancel, args=("user abort",)).start()
+        timed("tool cancelled by user", lambda: call_tool(slow_tool, {}, budget=5.0))
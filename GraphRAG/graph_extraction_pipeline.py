@@ -0,0 +1,229 @@
+# pip install neo4j langchain-community langchain-experimental
+# --------------------------------------------------------------
+# graph_extraction_pipeline.py
+#   LLMGraphTransformer 로 청크별 그래프를 추출해 Neo4j 에 적재하는 파이프라인
+#     - 제한된 스레드 풀로 청크를 동시에 처리
+#     - 청크 해시별 추출 결과를 디스크에 캐시 (재실행 시 LLM 호출 생략)
+#     - Neo4j 에 쓴 청크를 체크포인트로 기록 → 실패 후 이어서 실행
+#     - 노드/관계는 레이블·타입별 UNWIND + MERGE 배치 트랜잭션으로 저장
+# --------------------------------------------------------------
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+from langchain_core.documents import Document
+
+
+def chunk_hash(doc: Document, salt: str = "") -> str:
+    """청크 내용(+추출 설정)으로 만든 캐시 키."""
+    return hashlib.sha1((salt + "\x00" + doc.page_content).encode("utf-8")).hexdigest()
+
+
+def _quote(name: str) -> str:
+    # 레이블/관계 타입은 파라미터로 넘길 수 없으므로 백틱으로 감싸 안전하게 삽입
+    return "`" + str(name).replace("`", "") + "`"
+
+
+# -----------------------------
+# 1) GraphDocument <-> JSON
+# -----------------------------
+def _to_json(gd: GraphDocument) -> Dict[str, Any]:
+    return {
+        "nodes": [{"id": n.id, "type": n.type, "properties": n.properties} for n in gd.nodes],
+        "relationships": [
+            {
+                "source": {"id": r.source.id, "type": r.source.type},
+                "target": {"id": r.target.id, "type": r.target.type},
+                "type": r.type,
+                "properties": r.properties,
+            }
+            for r in gd.relationships
+        ],
+    }
+
+
+def _from_json(data: Dict[str, Any], source: Document) -> GraphDocument:
+    return GraphDocument(
+        nodes=[Node(**n) for n in data["nodes"]],
+        relationships=[
+            Relationship(source=Node(**r["source"]), target=Node(**r["target"]), type=r["type"], properties=r["properties"])
+            for r in data["relationships"]
+        ],
+        source=source,
+    )
+
+
+# -----------------------------
+# 2) 파이프라인
+# -----------------------------
+class GraphExtractionPipeline:
+    def __init__(
+        self,
+        transformer: Any,                # LLMGraphTransformer(llm=llm, ...)
+        cache_dir: str,                  # 추출 결과 캐시 + 체크포인트 저장 폴더
+        driver: Any = None,              # neo4j.GraphDatabase.driver(...), None 이면 추출만 수행
+        database: Optional[str] = None,
+        max_workers: int = 4,            # 동시에 LLM 을 호출할 청크 수
+        batch_size: int = 500,           # UNWIND 한 번에 보낼 행 수
+        write_every: int = 20,           # 추출이 끝난 청크가 이만큼 모이면 Neo4j 에 기록
+        max_retries: int = 2,
+        cache_salt: str = "",            # allowed_nodes 등 추출 설정이 바뀌면 다른 값을 사용
+    ):
+        self.transformer = transformer
+        self.cache_dir = cache_dir
+        self.driver = driver
+        self.database = database
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.write_every = write_every
+        self.max_retries = max_retries
+        self.cache_salt = cache_salt
+        os.makedirs(cache_dir, exist_ok=True)
+        self._checkpoint_path = os.path.join(cache_dir, "written.log")
+        self.written = self._load_checkpoint()
+        self.stats = {"cached": 0, "extracted": 0, "failed": 0, "skipped": 0, "written": 0}
+        self._stats_lock = threading.Lock()
+
+    # ---- 캐시/체크포인트 ----
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_checkpoint(self) -> set:
+        if not os.path.exists(self._checkpoint_path):
+            return set()
+        with open(self._checkpoint_path, encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _mark_written(self, keys: Iterable[str]) -> None:
+        with open(self._checkpoint_path, "a", encoding="utf-8") as f:
+            for key in keys:
+                f.write(key + "\n")
+                self.written.add(key)
+
+    # ---- 추출 ----
+    def _extract_one(self, key: str, doc: Document) -> GraphDocument:
+        path = self._cache_path(key)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            with self._stats_lock:
+                self.stats["cached"] += 1
+            return _from_json(data, doc)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                gd = self.transformer.convert_to_graph_documents([doc])[0]
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+        # 같은 내용의 청크를 여러 스레드/프로세스가 동시에 쓸 수 있으므로 임시 파일 이름은 작성자마다 다르게
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_to_json(gd), f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)   # 중간에 중단돼도 깨진 캐시 파일이 남지 않도록
+        with self._stats_lock:
+            self.stats["extracted"] += 1
+        return gd
+
+    def _iter_extracted(self, documents: List[Document]) -> Iterable[Tuple[str, GraphDocument]]:
+        """완료된 순서대로 (청크 해시, GraphDocument) 를 yield. 동시에 실행 중인 작업은 max_workers*2 개 이하."""
+        pending_docs = []
+        for doc in documents:
+            key = chunk_hash(doc, self.cache_salt)
+            if key in self.written:
+                self.stats["skipped"] += 1
+                continue
+            pending_docs.append((key, doc))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extract") as pool:
+            queue = iter(pending_docs)
+            in_flight = {}
+            for key, doc in queue:
+                in_flight[pool.submit(self._extract_one, key, doc)] = (key, doc)
+                if len(in_flight) >= self.max_workers * 2:
+                    break
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    key, doc = in_flight.pop(fut)
+                    try:
+                        yield key, fut.result()
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        print(f"Error extracting chunk {key[:8]}. Error: {e}")
+                    nxt = next(queue, None)
+                    if nxt is not None:
+                        in_flight[pool.submit(self._extract_one, *nxt)] = nxt
+
+    def extract(self, documents: List[Document]) -> List[GraphDocument]:
+        """Neo4j 에 쓰지 않고 추출 결과만 반환 (캐시는 사용)."""
+        return [gd for _, gd in self._iter_extracted(documents)]
+
+    # ---- 적재 ----
+    def write(self, graph_documents: List[GraphDocument]) -> None:
+        """노드는 레이블별, 관계는 (시작 레이블, 타입, 끝 레이블)별로 묶어 UNWIND + MERGE."""
+        nodes: Dict[str, Dict[Any, dict]] = defaultdict(dict)
+        rels: Dict[Tuple[str, str, str], List[dict]] = defaultdict(list)
+        for gd in graph_documents:
+            for n in gd.nodes:
+                nodes[n.type].setdefault(n.id, {}).update(n.properties)
+            for r in gd.relationships:
+                nodes[r.source.type].setdefault(r.source.id, {})
+                nodes[r.target.type].setdefault(r.target.id, {})
+                rels[(r.source.type, r.type, r.target.type)].append(
+                    {"source": r.source.id, "target": r.target.id, "properties": r.properties}
+                )
+
+        with self.driver.session(database=self.database) as s:
+            for label, by_id in nodes.items():
+                rows = [{"id": node_id, "properties": props} for node_id, props in by_id.items()]
+                query = f"UNWIND $rows AS row MERGE (n:{_quote(label)} {{id: row.id}}) SET n += row.properties"
+                self._write_batches(s, query, rows)
+            for (src, rel_type, tgt), rows in rels.items():
+                query = (
+                    f"UNWIND $rows AS row "
+                    f"MATCH (a:{_quote(src)} {{id: row.source}}) "
+                    f"MATCH (b:{_quote(tgt)} {{id: row.target}}) "
+                    f"MERGE (a)-[r:{_quote(rel_type)}]->(b) SET r += row.properties"
+                )
+                self._write_batches(s, query, rows)
+
+    def _write_batches(self, session: Any, query: str, rows: List[dict]) -> None:
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+
+    def create_constraints(self, labels: Iterable[str]) -> None:
+        """MERGE 가 인덱스를 사용하도록 레이블별 id 고유 제약을 먼저 생성."""
+        with self.driver.session(database=self.database) as s:
+            for label in labels:
+                s.run(f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{_quote(label)}) REQUIRE n.id IS UNIQUE").consume()
+
+    def run(self, documents: List[Document]) -> Dict[str, int]:
+        """추출 → 배치 적재 → 체크포인트 기록. 중단 후 다시 호출하면 남은 청크만 처리."""
+        buffer: List[Tuple[str, GraphDocument]] = []
+
+        def flush():
+            if not buffer:
+                return
+            if self.driver is not None:
+                self.write([gd for _, gd in buffer])
+            self._mark_written(key for key, _ in buffer)
+            self.stats["written"] += len(buffer)
+            buffer.clear()
+
+        for key, gd in self._iter_extracted(documents):
+            buffer.append((key, gd))
+            if len(buffer) >= self.write_every:
+                flush()
+        flush()
+        return dict(self.stats)
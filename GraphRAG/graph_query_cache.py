@@ -0,0 +1,373 @@
+# pip install neo4j
+# --------------------------------------------------------------
+# graph_query_cache.py
+#   자주 바뀌지 않는 참조 데이터(제조사·종목·시장·규칙·태스크) 조회 결과 캐시
+#     - (쿼리, 파라미터) 키의 read-through 캐시 → 같은 조회는 네트워크 왕복 없이 반환
+#     - 레이블/관계 타입별 쓰기 버전: 쓰기 헬퍼가 버전을 올리면 그 레이블을 읽은 결과만 무효화
+#     - 결과 크기 추정치 합계 / 항목 수 상한 (LRU 로 제거), 적중률 통계
+#     - db.run_query (노트북 Neo4jDatabase), KGClient.fetch_runnable_tasks 같은 함수에 그대로 씌울 수 있음
+# --------------------------------------------------------------
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from cypher_guard import READ_PROCEDURES, _CALL_RE, _WRITE_RE, _mask
+
+ANY = "*"     # 레이블을 특정할 수 없는 읽기: 모든 쓰기에 무효화
+
+# 읽기 전용으로 알려진 프로시저 (접두사). 그 밖의 CALL (apoc.create.*, apoc.merge.*, apoc.periodic.* 등) 은 쓰기로 간주
+READ_ONLY_PROCEDURES = READ_PROCEDURES + (
+    "db.index.vector.queryRelationships",
+    "db.index.fulltext.queryRelationships",
+    "apoc.meta.",
+)
+
+# 마스킹된 쿼리에서 찾음: 백틱 이름은 여는 ` 만 남으므로 원문에서 읽음
+_LABEL_RE = re.compile(r"(?::|\|)\s*(?:(`)|([A-Za-z_]\w*))")
+_BACKTICK_RE = re.compile(r"`((?:[^`]|``)*)`")
+_BARE_NODE_RE = re.compile(r"\(\s*([A-Za-z_]\w*)?\s*(?=[){])")
+# 타입 없는 관계: -[r]-, -[*1..3]-, -->, <--
+_BARE_REL_RE = re.compile(r"-\[\s*([A-Za-z_]\w*)?\s*(?=[*{\]])|<--|-->|\)--\(")
+
+
+def _names(query: str, masked: str, start: int, end: int) -> set:
+    names = set()
+    for m in _LABEL_RE.finditer(masked, start, end):
+        if m.group(1) is None:
+            names.add(m.group(2))
+        else:
+            quoted = _BACKTICK_RE.match(query, m.start(1))
+            names.add(quoted.group(1).replace("``", "`") if quoted else ANY)
+    return names
+
+
+def query_labels(query: str) -> Tuple[FrozenSet[str], bool]:
+    """
+    쿼리에 나오는 레이블·관계 타입과, 레이블 없는 노드 패턴이 있는지.
+    맵의 "key: value" 값도 레이블로 잡히지만 무효화가 늘어날 뿐 오래된 결과를 돌려주지는 않는다.
+    """
+    masked = _mask(query)
+    labels = _names(query, masked, 0, len(masked))
+    unlabeled = False
+    for pattern in (_BARE_NODE_RE, _BARE_REL_RE):
+        for m in pattern.finditer(masked):
+            var = m.group(1) if m.groups() else None
+            # (t) 처럼 다른 곳에서 (t:Trader) / t:Trader 로 레이블이 붙은 변수는 괜찮음
+            if not var or not re.search(rf"(?<![\w.]){re.escape(var)}\s*:\s*[`A-Za-z_]", masked):
+                unlabeled = True
+                break
+    return frozenset(labels), unlabeled
+
+
+_CLAUSE_RE = re.compile(
+    r"(?<![.\w])(OPTIONAL\s+MATCH|MATCH|WITH|UNWIND|RETURN|WHERE|CREATE|MERGE|ON\s+CREATE\s+SET|ON\s+MATCH\s+SET|"
+    r"SET|DETACH\s+DELETE|DELETE|REMOVE|FOREACH|CALL|ORDER\s+BY|LIMIT|UNION)(?!\w)",
+    re.I,
+)
+_MAP_RE = re.compile(r"\{[^{}]*\}")
+_PAREN_RE = re.compile(r"\([^()]*\)|\[[^\[\]]*\]")
+_TARGET_RE = re.compile(r"(?:^|,)\s*([A-Za-z_]\w*)")
+_VAR_LABELS_RE = re.compile(r"[(\[]\s*([A-Za-z_]\w*)\s*((?::\s*(?:`[^`]*`|[A-Za-z_]\w*)\s*(?:\|\s*)?)+)")
+
+
+def write_labels(query: str) -> Optional[FrozenSet[str]]:
+    """
+    쓰기 쿼리가 실제로 바꾸는 레이블·관계 타입 (MATCH 로 찾기만 한 레이블은 제외).
+    CREATE / MERGE 절의 레이블 + SET / REMOVE / DELETE 대상 변수와 붙이거나 뗀 레이블.
+    알 수 없으면 None (전체 무효화): 레이블 없는 대상, DETACH DELETE, 읽기 전용이 아닌 프로시저 CALL.
+    """
+    masked = _mask(query)
+    if _calls_write_procedure(masked):
+        return None
+    # 맵 리터럴 {key: value} 을 지워 key 가 레이블로 잡히지 않게 함 (길이는 그대로 유지)
+    while True:
+        stripped = _MAP_RE.sub(lambda m: " " * len(m.group(0)), masked)
+        if stripped == masked:
+            break
+        masked = stripped
+    var_labels: Dict[str, set] = {}
+    for m in _VAR_LABELS_RE.finditer(masked):
+        var_labels.setdefault(m.group(1), set()).update(_names(query, masked, m.start(2), m.end(2)))
+    bounds = [m.start() for m in _CLAUSE_RE.finditer(masked)] + [len(masked)]
+    written = set()
+    for start, end in zip(bounds, bounds[1:]):
+        head = _CLAUSE_RE.match(masked, start)
+        keyword = head.group(1).upper().split()
+        if keyword[0] in ("CREATE", "MERGE"):
+            written |= _names(query, masked, head.end(), end)
+        elif keyword[0] == "DETACH":
+            # 함께 지워지는 관계의 타입은 쿼리에서 알 수 없음
+            return None
+        elif keyword[-1] in ("SET", "DELETE", "REMOVE"):
+            # SET o:Archived / REMOVE o:Active → 붙이거나 떼는 레이블도 바뀐 것
+            written |= _names(query, masked, head.end(), end)
+            # SET o.status = ..., o += ... / DELETE a, b → 쉼표로 나뉜 각 항목의 첫 변수
+            items = masked[head.end():end]
+            while _PAREN_RE.search(items):
+                items = _PAREN_RE.sub(" ", items)     # coalesce(a, b) 안의 쉼표 제외
+            for var in _TARGET_RE.findall(items):
+                if var not in var_labels:
+                    return None
+                written |= var_labels[var]
+    return frozenset(written) if written else None
+
+
+def _calls_write_procedure(masked: str) -> bool:
+    return any(not m.group(1).startswith(READ_ONLY_PROCEDURES) for m in _CALL_RE.finditer(masked))
+
+
+def is_write(query: str) -> bool:
+    masked = _mask(query)
+    return _WRITE_RE.search(masked) is not None or _calls_write_procedure(masked)
+
+
+def _size(rows: Any) -> int:
+    # 메모리 상한용 대략적인 크기 (레코드 repr 길이)
+    return len(repr(rows))
+
+
+class GraphQueryCache:
+    """
+    cache = GraphQueryCache(driver, max_bytes=32 * 2**20)
+    cache.read("MATCH (s:Stock) RETURN s.symbol AS symbol")      # 두 번째부터 왕복 없음
+    cache.write("MATCH (s:Stock {symbol:$s}) SET s.sector=$x", {...})   # Stock 을 읽은 결과만 무효화
+    cache.install(db)                                # 노트북 Neo4jDatabase.run_query 를 캐시 경유로 교체
+    kg.fetch_runnable_tasks = cache.cached(kg.fetch_runnable_tasks, labels=TASK_LABELS)
+    """
+
+    def __init__(
+        self,
+        driver: Any = None,                  # read() / write() 에 사용 (install / cached 만 쓰면 없어도 됨)
+        database: Optional[str] = None,
+        max_bytes: int = 32 * 2**20,         # 캐시된 결과 크기 추정치 합계 상한
+        max_entries: int = 10000,
+        max_entry_bytes: Optional[int] = None,   # 이보다 큰 결과는 캐시하지 않음 (기본: max_bytes 의 1/8)
+    ):
+        self.driver = driver
+        self.database = database
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, Tuple[Tuple[str, int], ...], int]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._epoch = 0          # 레이블을 알 수 없는 쓰기 → 전체 무효화
+        self._any_write = 0      # 모든 쓰기에 증가 (레이블을 알 수 없는 읽기가 의존)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "uncacheable": 0, "writes": 0}
+
+    # -----------------------------
+    # 1) 버전
+    # -----------------------------
+    def _snapshot(self, labels: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        # 호출 시점의 버전 (읽기 실행 전에 잡아 두므로 읽는 동안 쓰기가 끝나면 다음 조회에서 무효)
+        versions = [("", self._epoch)]
+        for label in labels:
+            versions.append((label, self._any_write if label == ANY else self._versions.get(label, 0)))
+        return tuple(versions)
+
+    def _valid(self, snapshot: Tuple[Tuple[str, int], ...]) -> bool:
+        return snapshot == self._snapshot(label for label, _ in snapshot[1:])
+
+    def bump(self, *labels: str) -> None:
+        """레이블/관계 타입 쓰기 후 호출. 인자가 없으면 전체 무효화."""
+        with self._lock:
+            self._counts["writes"] += 1
+            self._any_write += 1
+            if not labels:
+                self._epoch += 1
+            for label in labels:
+                self._versions[label] = self._versions.get(label, 0) + 1
+
+    def bump_for(self, query: str) -> None:
+        """쓰기 쿼리가 바꾸는 레이블의 버전을 올림 (찾을 수 없으면 전체 무효화)."""
+        labels = write_labels(query)
+        if labels is None:
+            self.bump()
+        else:
+            self.bump(*labels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # -----------------------------
+    # 2) read-through
+    # -----------------------------
+    @staticmethod
+    def _key(query: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        return query, json.dumps(params or {}, sort_keys=True, default=str, ensure_ascii=False)
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get_or_load(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]],
+        loader: Callable[[], Any],
+        labels: Optional[Iterable[str]] = None,   # None 이면 쿼리에서 추출
+    ) -> Any:
+        key = self._key(query, params)
+        if labels is None:
+            found, unlabeled = query_labels(query)
+            labels = found | {ANY} if unlabeled or not found else found
+        labels = sorted(labels)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._valid(entry[1]):
+                    self._entries.move_to_end(key)
+                    self._counts["hits"] += 1
+                    return entry[0]
+                self._counts["stale"] += 1
+                self._remove(key)
+            self._counts["misses"] += 1
+            snapshot = self._snapshot(labels)
+
+        result = loader()
+        if not isinstance(result, (list, tuple)):
+            # 노트북 run_query 는 오류 시 문자열을 반환 → 캐시하지 않음
+            return result
+        size = _size(result)
+        with self._lock:
+            if size > self.max_entry_bytes:
+                self._counts["uncacheable"] += 1
+                return result
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, snapshot, size)
+            self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                self._remove(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+        return result
+
+    def read(self, query: str, params: Optional[Dict[str, Any]] = None, labels: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        def load() -> List[Dict[str, Any]]:
+            with self.driver.session(database=self.database) as s:
+                return s.execute_read(lambda tx: [record.data() for record in tx.run(query, params or {})])
+
+        # 호출한 쪽이 결과 dict 를 고쳐도 캐시가 바뀌지 않도록 복사해서 반환
+        return [dict(row) for row in self.get_or_load(query, params, load, labels)]
+
+    def write(self, query: str, params: Optional[Dict[str, Any]] = None, labels: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """_run_write 와 같이 쓰기 트랜잭션으로 실행하고, 커밋 후 관련 레이블 버전을 올림."""
+        try:
+            with self.driver.session(database=self.database) as s:
+                return s.execute_write(lambda tx: [record.data() for record in tx.run(query, params or {})])
+        finally:
+            # 실패해도 커밋됐을 수 있으므로 (커밋 응답 유실 등) 항상 무효화
+            if labels is not None:
+                self.bump(*labels)
+            else:
+                self.bump_for(query)
+
+    # -----------------------------
+    # 3) 기존 코드에 씌우기
+    # -----------------------------
+    def install(self, db: Any, method: str = "run_query") -> Any:
+        """
+        db.run_query(query, parameters) 를 교체: 읽기는 캐시 경유, 쓰기는 실행 후 버전 증가.
+        (노트북의 Neo4jDatabase, 트레이딩 워크플로의 _run_read 같은 함수형 헬퍼는 cached() 사용)
+        """
+        original = getattr(db, method)
+
+        def run_query(query: str, parameters: Optional[Dict[str, Any]] = None, *args: Any, **kwargs: Any) -> Any:
+            if is_write(query):
+                try:
+                    return original(query, parameters or {}, *args, **kwargs)
+                finally:
+                    self.bump_for(query)
+            return self.get_or_load(query, parameters, lambda: original(query, parameters or {}, *args, **kwargs))
+
+        setattr(db, method, run_query)
+        return db
+
+    def cached(self, fn: Callable[..., Any], labels: Iterable[str], name: Optional[str] = None) -> Callable[..., Any]:
+        """
+        인자별로 결과를 캐시하는 함수 래퍼. labels 중 하나라도 쓰기 버전이 오르면 무효.
+        kg.fetch_runnable_tasks = cache.cached(kg.fetch_runnable_tasks, TASK_LABELS)
+        """
+        labels = tuple(labels)
+        name = name or getattr(fn, "__qualname__", repr(fn))
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return self.get_or_load(name, {"args": args, "kwargs": kwargs}, lambda: fn(*args, **kwargs), labels)
+
+        wrapper.__wrapped__ = fn   # type: ignore[attr-defined]
+        return wrapper
+
+    def writes(self, fn: Callable[..., Any], labels: Iterable[str]) -> Callable[..., Any]:
+        """create_order 같은 쓰기 헬퍼 래퍼: 실행 후 labels 버전 증가."""
+        labels = tuple(labels)
+
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.bump(*labels)
+
+        wrapper.__wrapped__ = fn   # type: ignore[attr-defined]
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            out: Dict[str, Any] = {**counts, "entries": len(self._entries), "bytes": self._bytes}
+        lookups = counts["hits"] + counts["misses"]
+        out["hit_rate"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+        return out
+
+
+# KGClient.fetch_runnable_tasks / fetch_tasks 결과가 의존하는 레이블·관계
+TASK_LABELS = (
+    "Task", "Precondition", "Postcondition", "InputSlot", "Tool",
+    "HAS_PRECONDITION", "HAS_POSTCONDITION", "REQUIRES_INPUT", "USES_TOOL",
+)
+
+
+if __name__ == "__main__":
+    import time
+
+    # Neo4j 대신 왕복 2ms 가 걸리는 가짜 db.run_query 로 참조 데이터 조회 비용 비교
+    class FakeDB:
+        def __init__(self) -> None:
+            self.calls = 0
+            self.sectors = {"AAPL": "Technology", "MSFT": "Technology", "GOOG": "Technology", "JPM": "Finance"}
+
+        def run_query(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> Any:
+            self.calls += 1
+            time.sleep(0.002)
+            if "SET s.sector" in query:
+                self.sectors[parameters["symbol"]] = parameters["sector"]
+                return []
+            if "Stock" in query:
+                return [{"symbol": k, "sector": v} for k, v in sorted(self.sectors.items())]
+            return [{"rule_id": "CR001", "threshold": 100000}]
+
+    stocks_q = "MATCH (s:Stock)-[:TRADED_ON]->(m:Market) RETURN s.symbol AS symbol, s.sector AS sector"
+    rules_q = "MATCH (r:ComplianceRule) RETURN r.rule_id AS rule_id, r.threshold AS threshold"
+    order_q = "MATCH (t:Trader {id:$tid}) CREATE (o:Order {order_id:$oid}) CREATE (t)-[:PLACES]->(o)"
+    sector_q = "MATCH (s:Stock {symbol:$symbol}) SET s.sector = $sector"
+    print("labels:", sorted(query_labels(stocks_q)[0]), "| write:", sorted(write_labels(order_q)))
+
+    for label, use_cache in (("uncached", False), ("cached", True)):
+        db = FakeDB()
+        cache = GraphQueryCache()
+        if use_cache:
+            cache.install(db)
+        start = time.perf_counter()
+        for i in range(500):
+            db.run_query(stocks_q)
+            db.run_query(rules_q)
+            if i % 50 == 0:
+                db.run_query(order_q, {"tid": "TR001", "oid": f"O{i}"})     # Order 쓰기: 참조 데이터 캐시는 유지
+        db.run_query(sector_q, {"symbol": "JPM", "sector": "Banking"})      # Stock 쓰기: 종목 조회만 무효화
+        fresh = db.run_query(stocks_q)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<9}: {elapsed:.2f}s, {db.calls} round trips, JPM sector={fresh[-2]['sector']}, {cache.stats()}")
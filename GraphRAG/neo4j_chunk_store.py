@@ -0,0 +1,271 @@
+# pip install neo4j langchain-core
+# --------------------------------------------------------------
+# neo4j_chunk_store.py
+#   Neo4j 벡터 인덱스 기반 청크 저장소 (Neo4jVector.from_documents 대체)
+#     - 벡터 인덱스 차원/유사도 함수를 명시적으로 생성하고, 기존 인덱스(이름이 달라도 같은 레이블·속성)와 다르면 오류
+#     - 청크 임베딩과 저장을 배치로 수행, 이미 저장된 청크는 다시 임베딩하지 않음
+#     - (:Document {source})-[:HAS_CHUNK]->(:Chunk) 구조로 저장해 문서/페이지/그래프 조건으로
+#       후보를 먼저 좁힌 뒤 유사도 검색 (pre-filtering)
+# --------------------------------------------------------------
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+SIMILARITY_FUNCTIONS = {"cosine": "vector.similarity.cosine", "euclidean": "vector.similarity.euclidean"}
+
+
+def chunk_id(doc: Document) -> str:
+    """출처 + 페이지 + 내용으로 만든 청크 ID (같은 청크를 다시 넣어도 중복 저장되지 않음)."""
+    key = f"{doc.metadata.get('source', '')}\x00{doc.metadata.get('page', '')}\x00{doc.page_content}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _scalar_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # Neo4j 속성으로 저장할 수 있는 값만 남김 (id/text/embedding 은 청크 자체 속성이므로 제외)
+    return {
+        k: v for k, v in metadata.items()
+        if isinstance(v, (str, int, float, bool)) and k not in ("id", "text", "embedding")
+    }
+
+
+class Neo4jChunkStore:
+    def __init__(
+        self,
+        driver: Any,                          # neo4j.GraphDatabase.driver(...)
+        embeddings: Embeddings,
+        database: Optional[str] = None,
+        index_name: str = "chunk_embedding",
+        label: str = "Chunk",
+        dimensions: Optional[int] = None,     # None 이면 임베딩 모델로 한 번 계산
+        similarity: str = "cosine",           # "cosine" | "euclidean"
+        batch_size: int = 200,                # 한 트랜잭션에 쓰는 청크 수
+        embed_batch_size: int = 64,           # embed_documents 한 번에 보내는 청크 수
+        exact_threshold: int = 20000,         # 필터 후 후보가 이 수 이하이면 인덱스 없이 정확 계산
+    ):
+        if similarity not in SIMILARITY_FUNCTIONS:
+            raise ValueError(f"similarity must be one of {list(SIMILARITY_FUNCTIONS)}")
+        self.driver = driver
+        self.embeddings = embeddings
+        self.database = database
+        self.index_name = index_name
+        self.label = label
+        self.dimensions = dimensions
+        self.similarity = similarity
+        self.batch_size = batch_size
+        self.embed_batch_size = embed_batch_size
+        self.exact_threshold = exact_threshold
+
+    def _run(self, query: str, **params: Any) -> List[Dict[str, Any]]:
+        with self.driver.session(database=self.database) as s:
+            return [record.data() for record in s.run(query, params)]
+
+    # -----------------------------
+    # 1) 인덱스 생성 / 검증
+    # -----------------------------
+    def _vector_index(self) -> Optional[Dict[str, Any]]:
+        """
+        이 저장소가 쓸 벡터 인덱스: 같은 이름, 또는 (label).embedding 에 이미 있는 인덱스.
+        Neo4j 는 같은 레이블·속성에 벡터 인덱스를 하나만 허용하므로
+        (Neo4jVector.from_documents 가 만든 'vector' 인덱스 등) 다른 이름이어도 그 인덱스를 사용해야 한다.
+        """
+        rows = self._run(
+            "SHOW VECTOR INDEXES YIELD name, labelsOrTypes, properties, options "
+            "WHERE name = $name OR ($label IN labelsOrTypes AND properties = ['embedding']) "
+            "RETURN name, labelsOrTypes, properties, options ORDER BY name = $name DESC",
+            name=self.index_name,
+            label=self.label,
+        )
+        if not rows:
+            return None
+        info = rows[0]
+        config = (info.get("options") or {}).get("indexConfig", {})
+        return {
+            "name": info.get("name"),
+            "label": (info.get("labelsOrTypes") or [None])[0],
+            "property": (info.get("properties") or [None])[0],
+            "dimensions": config.get("vector.dimensions"),
+            "similarity": str(config.get("vector.similarity_function", "")).lower(),
+        }
+
+    def ensure_index(self) -> Dict[str, Any]:
+        """
+        벡터 인덱스와 필터용 속성 인덱스를 생성하고, 실제 인덱스 설정을 다시 읽어 반환.
+        (label).embedding 에 이미 벡터 인덱스가 있으면 그 이름을 사용하고
+        레이블/차원/유사도 함수가 일치하는지 확인한다.
+        """
+        if self.dimensions is None:
+            self.dimensions = len(self.embeddings.embed_query("dimension check"))
+
+        self._run(
+            f"CREATE CONSTRAINT IF NOT EXISTS FOR (c:`{self.label}`) REQUIRE c.id IS UNIQUE"
+        )
+        self._run("CREATE CONSTRAINT IF NOT EXISTS FOR (d:Document) REQUIRE d.source IS UNIQUE")
+        self._run(f"CREATE INDEX IF NOT EXISTS FOR (c:`{self.label}`) ON (c.source, c.page)")
+        if self._vector_index() is None:
+            self._run(
+                f"CREATE VECTOR INDEX `{self.index_name}` IF NOT EXISTS FOR (c:`{self.label}`) ON c.embedding "
+                "OPTIONS {indexConfig: {`vector.dimensions`: $dimensions, `vector.similarity_function`: $similarity}}",
+                dimensions=self.dimensions,
+                similarity=self.similarity,
+            )
+        self._run("CALL db.awaitIndexes(300)")
+
+        actual = self._vector_index()
+        if actual is None:
+            raise ValueError(f"Vector index '{self.index_name}' was not created on :{self.label}(embedding)")
+        expected = {"label": self.label, "property": "embedding", "dimensions": self.dimensions, "similarity": self.similarity}
+        diff = {k: (actual[k], v) for k, v in expected.items() if actual[k] != v}
+        if diff:
+            raise ValueError(f"Vector index '{actual['name']}' does not match (actual, expected): {diff}")
+        if actual["name"] != self.index_name:
+            print(f"Using existing vector index '{actual['name']}' on :{self.label}(embedding) instead of '{self.index_name}'.")
+            self.index_name = actual["name"]
+        return actual
+
+    # -----------------------------
+    # 2) 배치 저장
+    # -----------------------------
+    def add_documents(self, documents: Sequence[Document]) -> Dict[str, int]:
+        """새 청크만 배치로 임베딩·저장. 반환: {"added", "skipped"}."""
+        ids = [chunk_id(doc) for doc in documents]
+        existing = set()
+        for i in range(0, len(ids), 5000):
+            existing.update(
+                row["id"] for row in self._run(
+                    f"UNWIND $ids AS id MATCH (c:`{self.label}` {{id: id}}) RETURN c.id AS id", ids=ids[i:i + 5000]
+                )
+            )
+        new = []
+        seen = set(existing)
+        for cid, doc in zip(ids, documents):
+            if cid not in seen:
+                seen.add(cid)
+                new.append((cid, doc))
+
+        query = (
+            "UNWIND $rows AS row "
+            f"MERGE (c:`{self.label}` {{id: row.id}}) "
+            "SET c += row.metadata, c.text = row.text "
+            "WITH c, row CALL db.create.setNodeVectorProperty(c, 'embedding', row.embedding) "
+            "WITH c, row WHERE row.source IS NOT NULL "
+            "MERGE (d:Document {source: row.source}) "
+            "MERGE (d)-[:HAS_CHUNK]->(c)"
+        )
+        with self.driver.session(database=self.database) as s:
+            for i in range(0, len(new), self.batch_size):
+                batch = new[i:i + self.batch_size]
+                texts = [doc.page_content for _, doc in batch]
+                vectors: List[List[float]] = []
+                for j in range(0, len(texts), self.embed_batch_size):
+                    vectors.extend(self.embeddings.embed_documents(texts[j:j + self.embed_batch_size]))
+                rows = [
+                    {
+                        "id": cid,
+                        "text": doc.page_content,
+                        "metadata": _scalar_metadata(doc.metadata),
+                        "source": doc.metadata.get("source"),
+                        "embedding": vector,
+                    }
+                    for (cid, doc), vector in zip(batch, vectors)
+                ]
+                s.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+        return {"added": len(new), "skipped": len(documents) - len(new)}
+
+    # -----------------------------
+    # 3) 필터 + 유사도 검색
+    # -----------------------------
+    @staticmethod
+    def _filter(
+        source: Union[str, Iterable[str], None],
+        page: Union[int, Iterable[int], None],
+        where: Optional[str],
+    ) -> Tuple[str, Dict[str, Any]]:
+        clauses, params = [], {}
+        if source is not None:
+            params["f_source"] = [source] if isinstance(source, str) else list(source)
+            clauses.append("c.source IN $f_source")
+        if page is not None:
+            params["f_page"] = [page] if isinstance(page, int) else list(page)
+            clauses.append("c.page IN $f_page")
+        if where:
+            clauses.append(f"({where})")   # 예: "EXISTS { (c)<-[:HAS_CHUNK]-(:Document)-[:ABOUT]->(:Topic {name: $topic}) }"
+        return " AND ".join(clauses), params
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        source: Union[str, Iterable[str], None] = None,
+        page: Union[int, Iterable[int], None] = None,
+        where: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[Document, float]]:
+        """
+        source / page / where(c 를 사용하는 Cypher 조건) 로 후보를 먼저 좁힌 뒤 검색.
+        필터 후 후보가 exact_threshold 이하이면 후보 전체에 대해 정확한 유사도를 계산하고,
+        더 많으면 벡터 인덱스에서 후보를 넉넉히 가져와 필터를 적용한다.
+        점수는 높을수록 유사.
+        """
+        vector = self.embeddings.embed_query(query)
+        condition, fparams = self._filter(source, page, where)
+        fparams.update(params or {})
+        ret = "RETURN c.text AS text, c {.*, embedding: null, text: null} AS metadata, score ORDER BY score DESC"
+
+        if condition:
+            n = self._run(f"MATCH (c:`{self.label}`) WHERE {condition} RETURN count(c) AS n", **fparams)[0]["n"]
+            if n == 0:
+                return []
+            if n <= self.exact_threshold:
+                rows = self._run(
+                    f"MATCH (c:`{self.label}`) WHERE {condition} "
+                    f"WITH c, {SIMILARITY_FUNCTIONS[self.similarity]}(c.embedding, $vector) AS score "
+                    f"{ret} LIMIT $k",
+                    vector=vector, k=k, **fparams,
+                )
+                return self._to_documents(rows)
+
+        # 인덱스 검색: 필터 통과 비율이 낮으면 후보 수를 늘려가며 k 개 확보
+        fetch = k if not condition else k * 10
+        while True:
+            rows = self._run(
+                f"CALL db.index.vector.queryNodes($index, $fetch, $vector) YIELD node AS c, score "
+                f"{'WHERE ' + condition if condition else ''} {ret} LIMIT $k",
+                index=self.index_name, fetch=fetch, vector=vector, k=k, **fparams,
+            )
+            if len(rows) >= k or fetch >= 10000:
+                return self._to_documents(rows)
+            fetch *= 4
+
+    @staticmethod
+    def _to_documents(rows: List[Dict[str, Any]]) -> List[Tuple[Document, float]]:
+        out = []
+        for row in rows:
+            metadata = {k: v for k, v in (row["metadata"] or {}).items() if v is not None}
+            out.append((Document(page_content=row["text"] or "", metadata=metadata), float(row["score"])))
+        return out
+
+    def similarity_search(self, query: str, k: int = 4, **filters: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **filters)]
+
+    def as_retriever(self, k: int = 4, **filters: Any) -> "Neo4jChunkRetriever":
+        """RetrievalQAWithSourcesChain 등에 전달할 리트리버 (metadata 에 source/page/score 포함)."""
+        return Neo4jChunkRetriever(store=self, k=k, filters=filters)
+
+
+class Neo4jChunkRetriever(BaseRetriever):
+    store: Any
+    k: int = 4
+    filters: Dict[str, Any] = {}   # source / page / where / params
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        docs = []
+        for doc, score in self.store.similarity_search_with_score(query, self.k, **self.filters):
+            doc.metadata["score"] = score
+            docs.append(doc)
+        return docs
@@ -0,0 +1,645 @@
+# pip install neo4j
+# --------------------------------------------------------------
+# order_intake.py
+#   place_order_workflow(...) 를 주문 1건씩 호출하던 방식을 대체하는 주문 접수 스트림
+#     - 큐 / 이터레이터에서 주문을 받아 마이크로 배치로 묶음 (크기·지연 시간 상한)
+#     - 배치 단위로 생성 → 컴플라이언스 검사 → 상태 업데이트 (단계마다 UNWIND 1회 왕복)
+#     - 동시에 처리하는 배치 수 / 대기 주문 수 상한 (backpressure: 가득 차면 submit 이 대기)
+#     - 배치 크기는 배치 처리 시간이 지연 목표의 절반 안에 들어오도록 자동 조절
+#     - 주문별 결과는 Future / 콜백으로 전달 ({"order_id", "status", "violations"})
+#     - Neo4j 없이 실행할 수 있는 LocalTradingGraph (testsalesAndTradingWorkflow2.py 온톨로지)
+#     - risk=RiskLookup(...) 을 주면 CR002 / CR003 을 그래프 탐색 없이 프로세스 안에서 검사 (risk_lookup.py)
+# --------------------------------------------------------------
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import deadline
+
+ORDER_FIELDS = ("trader_id", "stock_symbol", "order_type", "quantity", "price")
+RESTRICTED = ("JPM",)        # CR002 – Restricted Stock List (원래 Cypher 에 하드코딩된 값)
+LINKED_RULES = ("CR001", "CR003")   # 샘플 주문과 같이 새 주문도 CHECKED_AGAINST 로 연결
+
+
+class IntakeBusy(RuntimeError):
+    """대기 주문이 max_pending 에 도달했고 block=False (또는 timeout 초과)."""
+
+
+def _violation_reason(violations: List[Dict[str, Any]]) -> str:
+    return "; ".join(v["rule_name"] for v in violations)
+
+
+# -----------------------------
+# 1) 주문 그래프 (배치 API)
+# -----------------------------
+class Neo4jTradingGraph:
+    """
+    create_order / check_compliance / update_order_status 의 배치 버전.
+    order_id 는 클라이언트에서 uuid 로 만들어 넘기므로 Future 와 바로 연결된다.
+    """
+
+    CREATE = """
+    UNWIND $rows AS row
+    MATCH (t:Trader {id: row.trader_id})
+    MATCH (s:Stock {symbol: row.stock_symbol})
+    MATCH (ot:OrderType {type: row.order_type})
+    CREATE (o:Order {
+        order_id : row.order_id,
+        quantity : row.quantity,
+        price    : row.price,
+        status   : 'New',
+        created  : row.timestamp
+    })
+    CREATE (t)-[:PLACES]->(o)
+    CREATE (o)-[:FOR_STOCK]->(s)
+    CREATE (o)-[:HAS_TYPE]->(ot)
+    WITH o
+    OPTIONAL MATCH (r:ComplianceRule) WHERE r.rule_id IN $rules
+    WITH o, collect(r) AS rules
+    FOREACH (r IN rules | MERGE (o)-[:CHECKED_AGAINST]->(r))
+    RETURN o.order_id AS order_id
+    """
+
+    CHECK_LIMIT = """
+    // ----- CR001 : Max Order Size ---------------------------------
+    UNWIND $ids AS oid
+    MATCH (o:Order {order_id: oid})-[:CHECKED_AGAINST]->(r:ComplianceRule {rule_id: 'CR001'})
+    WITH o, r, (o.quantity * o.price) AS val
+    WHERE val > r.threshold
+    RETURN o.order_id AS order_id,
+           r.rule_id   AS rule_id,
+           r.name      AS rule_name,
+           val         AS violated_value,
+           r.threshold AS threshold
+    """
+
+    CHECK_RESTRICTED = """
+    // ----- CR002 : Restricted Stock List -------------------------
+    UNWIND $ids AS oid
+    MATCH (o:Order {order_id: oid})-[:FOR_STOCK]->(s:Stock)
+    WHERE s.symbol IN $restricted
+    RETURN o.order_id AS order_id,
+           'CR002'    AS rule_id,
+           'Restricted Stock' AS rule_name,
+           s.symbol   AS violated_value,
+           null       AS threshold
+    """
+
+    UPDATE = """
+    UNWIND $rows AS row
+    MATCH (o:Order {order_id: row.order_id})
+    SET o.status = row.status, o.comment = row.comment
+    """
+
+    # 트레이더 → 고객 → 위험 성향 (RiskLookup 용 비정규화 테이블)
+    RISK_TRADERS = """
+    MATCH (t:Trader)
+    OPTIONAL MATCH (c:InstitutionalClient)-[:HAS_TRADER]->(t)
+    OPTIONAL MATCH (c)-[:HAS_PROFILE]->(p:RiskProfile)
+    OPTIONAL MATCH (c)-[:RESTRICTED_FROM]->(rs:Stock)
+    RETURN t.id              AS trader_id,
+           c.id              AS client_id,
+           c.name            AS client_name,
+           p.level           AS risk_level,
+           p.max_order_value AS max_order_value,
+           collect(DISTINCT rs.symbol) AS client_restricted
+    """
+
+    RISK_RESTRICTED = """
+    MATCH (s:Stock)-[:CHECKED_AGAINST]->(:ComplianceRule {rule_id: 'CR002'})
+    RETURN collect(DISTINCT s.symbol) AS symbols
+    """
+
+    def __init__(
+        self,
+        driver: Any,
+        database: Optional[str] = None,
+        restricted: Sequence[str] = RESTRICTED,
+        cache: Any = None,               # GraphQueryCache: 참조 데이터 조회 캐시, 쓰기마다 레이블 버전 증가
+    ):
+        self.driver = driver
+        self.database = database
+        self.restricted = list(restricted)
+        self.cache = cache
+
+    def _run(self, query: str, write: bool, **params: Any) -> List[Dict[str, Any]]:
+        if write and self.cache is not None:
+            try:
+                return self._execute(query, write, **params)
+            finally:
+                self.cache.bump_for(query)
+        return self._execute(query, write, **params)
+
+    def _read_reference(self, query: str, **params: Any) -> List[Dict[str, Any]]:
+        # 자주 바뀌지 않는 데이터 조회: 캐시가 있으면 쓰기 버전이 그대로인 동안 왕복 없이 반환
+        if self.cache is None:
+            return self._execute(query, False, **params)
+        return self.cache.get_or_load(query, params, lambda: self._execute(query, False, **params))
+
+    def _execute(self, query: str, write: bool, **params: Any) -> List[Dict[str, Any]]:
+        if deadline.current() is not None:
+            # with deadline.scope(...) 안에서 호출되면 auto-commit + Query(timeout=남은 시간),
+            # 재시도도 남은 시간 안에서만 (execute_read/write 의 관리형 재시도는 최대 30초까지 마감 시각을 무시)
+            # 쓰기도 execute_write 처럼 일시 오류(리더 변경, 교착)는 재시도: 주문은 클라이언트가 만든 order_id 로 식별
+            return deadline.graph_query(
+                self.driver, query, params, budget=None, write=write, retries=2, database=self.database, hard=False
+            )
+
+        def tx_work(tx: Any) -> List[Dict[str, Any]]:
+            return [record.data() for record in tx.run(query, params)]
+
+        with self.driver.session(database=self.database) as s:
+            return s.execute_write(tx_work) if write else s.execute_read(tx_work)
+
+    def ensure_indexes(self) -> None:
+        # 배치마다 order_id 로 주문을 다시 찾으므로 인덱스가 없으면 주문 수에 비례해 느려짐
+        self._run("CREATE INDEX order_id IF NOT EXISTS FOR (o:Order) ON (o.order_id)", write=True)
+
+    def create_orders(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """생성된 order_id 목록. Trader / Stock / OrderType 이 없는 주문은 빠진다."""
+        return [r["order_id"] for r in self._run(self.CREATE, write=True, rows=rows, rules=list(LINKED_RULES))]
+
+    def check_compliance(self, order_ids: List[str], restricted: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """restricted=False 이면 CR001 만 검사 (CR002 는 RiskLookup 이 처리할 때)."""
+        query = self.CHECK_LIMIT + ("\n    UNION ALL\n" + self.CHECK_RESTRICTED if restricted else "")
+        violations: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self._run(query, write=False, ids=order_ids, restricted=self.restricted):
+            violations.setdefault(row["order_id"], []).append(row)
+        return violations
+
+    def update_statuses(self, rows: List[Dict[str, Any]]) -> None:
+        self._run(self.UPDATE, write=True, rows=rows)
+
+    def risk_snapshot(self) -> Dict[str, Any]:
+        """{"traders": [트레이더별 고객·위험 성향·고객별 제한 종목], "restricted": [CR002 종목]}"""
+        traders = self._read_reference(self.RISK_TRADERS)
+        restricted = self._read_reference(self.RISK_RESTRICTED)[0]["symbols"]
+        return {"traders": traders, "restricted": restricted}
+
+    def set_client_profile(self, client_id: str, level: str) -> None:
+        self._run(
+            """
+            MATCH (c:InstitutionalClient {id: $cid})
+            MATCH (p:RiskProfile {level: $level})
+            OPTIONAL MATCH (c)-[old:HAS_PROFILE]->()
+            DELETE old
+            MERGE (c)-[:HAS_PROFILE]->(p)
+            """,
+            write=True, cid=client_id, level=level,
+        )
+
+    def restrict_symbol(self, client_id: str, symbol: str) -> None:
+        self._run(
+            """
+            MATCH (c:InstitutionalClient {id: $cid})
+            MATCH (s:Stock {symbol: $symbol})
+            MERGE (c)-[:RESTRICTED_FROM]->(s)
+            """,
+            write=True, cid=client_id, symbol=symbol,
+        )
+
+
+class LocalTradingGraph:
+    """
+    Neo4jTradingGraph 와 같은 메서드를 가진 메모리 그래프 (부하 시험·오프라인 실행용).
+    round_trip_ms / per_row_us 로 네트워크 왕복과 행당 처리 시간을 흉내 낸다.
+    """
+
+    def __init__(
+        self,
+        round_trip_ms: float = 1.0,      # 호출 1회(트랜잭션 1회)당 지연
+        per_row_us: float = 2.0,         # 행 1개당 추가 지연
+        restricted: Sequence[str] = RESTRICTED,
+    ):
+        self.round_trip = round_trip_ms / 1000
+        self.per_row = per_row_us / 1_000_000
+        self.restricted = set(restricted)
+        # testsalesAndTradingWorkflow2.py 의 샘플 데이터
+        self.traders = {"TR001": "IC001", "TR002": "IC002"}
+        self.clients = {"IC001": "Global Asset Management", "IC002": "Tech Innovations Fund"}
+        self.client_profiles = {"IC001": "Conservative", "IC002": "Moderate"}
+        self.client_restricted: Dict[str, set] = {}
+        self.stocks = {"AAPL": "NASDAQ", "MSFT": "NASDAQ", "GOOG": "NASDAQ", "JPM": "NYSE"}
+        self.order_types = {"Buy", "Sell"}
+        self.rules = {
+            "CR001": {"name": "Max Order Size", "threshold": 100000},
+            "CR002": {"name": "Restricted Stock List"},
+            "CR003": {"name": "Risk Profile Match"},
+        }
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _round_trip(self, n: int) -> None:
+        deadline.check()
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.round_trip + self.per_row * n)
+
+    def create_orders(self, rows: List[Dict[str, Any]]) -> List[str]:
+        self._round_trip(len(rows))
+        created = []
+        with self._lock:
+            for row in rows:
+                if (
+                    row["trader_id"] not in self.traders
+                    or row["stock_symbol"] not in self.stocks
+                    or row["order_type"] not in self.order_types
+                ):
+                    continue
+                self.orders[row["order_id"]] = {
+                    **row,
+                    "status": "New",
+                    "rules": [r for r in LINKED_RULES if r in self.rules],
+                }
+                created.append(row["order_id"])
+        return created
+
+    def check_compliance(self, order_ids: List[str], restricted: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        self._round_trip(len(order_ids))
+        rule = self.rules["CR001"]
+        violations: Dict[str, List[Dict[str, Any]]] = {}
+        with self._lock:
+            for oid in order_ids:
+                order = self.orders.get(oid)
+                if order is None:
+                    continue
+                value = order["quantity"] * order["price"]
+                if "CR001" in order["rules"] and value > rule["threshold"]:
+                    violations.setdefault(oid, []).append({
+                        "order_id": oid, "rule_id": "CR001", "rule_name": rule["name"],
+                        "violated_value": value, "threshold": rule["threshold"],
+                    })
+                if restricted and order["stock_symbol"] in self.restricted:
+                    violations.setdefault(oid, []).append({
+                        "order_id": oid, "rule_id": "CR002", "rule_name": "Restricted Stock",
+                        "violated_value": order["stock_symbol"], "threshold": None,
+                    })
+        return violations
+
+    def update_statuses(self, rows: List[Dict[str, Any]]) -> None:
+        self._round_trip(len(rows))
+        with self._lock:
+            for row in rows:
+                order = self.orders.get(row["order_id"])
+                if order is not None:
+                    order["status"] = row["status"]
+                    order["comment"] = row["comment"]
+
+    def risk_snapshot(self) -> Dict[str, Any]:
+        self._round_trip(len(self.traders))
+        with self._lock:
+            traders = [
+                {
+                    "trader_id": trader_id,
+                    "client_id": client_id,
+                    "client_name": self.clients.get(client_id),
+                    "risk_level": self.client_profiles.get(client_id),
+                    "max_order_value": None,
+                    "client_restricted": sorted(self.client_restricted.get(client_id, ())),
+                }
+                for trader_id, client_id in self.traders.items()
+            ]
+        # 샘플 데이터에는 CR002 로 연결된 종목이 없음 (제한 종목은 RESTRICTED 기본값 사용)
+        return {"traders": traders, "restricted": []}
+
+    def set_client_profile(self, client_id: str, level: str) -> None:
+        self._round_trip(1)
+        with self._lock:
+            self.client_profiles[client_id] = level
+
+    def restrict_symbol(self, client_id: str, symbol: str) -> None:
+        self._round_trip(1)
+        with self._lock:
+            self.client_restricted.setdefault(client_id, set()).add(symbol)
+
+
+# -----------------------------
+# 2) 주문 접수 스트림
+# -----------------------------
+class OrderIntake:
+    """
+    intake = OrderIntake(Neo4jTradingGraph(driver), latency_target_ms=50, risk=RiskLookup(graph))
+    future = intake.submit({"trader_id": "TR001", "stock_symbol": "AAPL", "order_type": "Buy",
+                            "quantity": 300, "price": 150.0})
+    future.result()            # {"order_id", "status": "Accepted" | "Rejected", "violations"}
+    futures = intake.consume(order_iterator, callback=print)   # 이터레이터 / queue.Queue 에서 연속 접수
+    intake.close()
+    """
+
+    def __init__(
+        self,
+        graph: Any,                       # Neo4jTradingGraph / LocalTradingGraph
+        latency_target_ms: float = 50.0,  # 주문 1건의 접수 → 결과 목표 지연
+        max_batch: int = 1000,            # 배치 크기 상한
+        max_wait_ms: float = 1.0,         # 첫 주문 이후 배치를 채우려고 기다리는 최대 시간
+        max_in_flight: int = 4,           # 동시에 처리하는 배치 수
+        max_pending: int = 10000,         # 접수 후 배치에 들어가기 전 대기 주문 수 상한
+        window: int = 10000,              # 통계용으로 보관할 최근 주문 수
+        risk: Any = None,                 # RiskLookup: CR002 / CR003 을 조회 테이블로 검사
+        batch_timeout_ms: Optional[float] = None,   # 배치 1개(그래프 호출 3회)의 마감 시간, 넘기면 배치의 주문 모두 실패
+    ):
+        self.graph = graph
+        self.risk = risk
+        self.batch_timeout = batch_timeout_ms / 1000 if batch_timeout_ms is not None else None
+        self.latency_target = latency_target_ms / 1000
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batch_limit = min(32, max_batch)   # 현재 배치 크기 상한 (처리 시간에 따라 조절)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="order-batch")
+        self._lock = threading.Lock()
+        self._counts = {"submitted": 0, "accepted": 0, "rejected": 0, "failed": 0, "batches": 0, "batched_orders": 0}
+        self._latency: deque = deque(maxlen=window)
+        self._started = time.perf_counter()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="order-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += n
+
+    # -----------------------------
+    # 접수
+    # -----------------------------
+    def submit(
+        self,
+        order: Dict[str, Any],
+        callback: Optional[Callable[[Future], None]] = None,
+        block: bool = True,               # 대기 주문이 가득 차면 빈자리가 날 때까지 대기 (False 면 IntakeBusy)
+        timeout: Optional[float] = None,
+    ) -> Future:
+        if self._closed:
+            raise IntakeBusy("order intake closed")
+        missing = [f for f in ORDER_FIELDS if f not in order]
+        if missing:
+            raise ValueError(f"Order is missing fields: {', '.join(missing)}")
+        row = {f: order[f] for f in ORDER_FIELDS}
+        row["order_id"] = order.get("order_id") or str(uuid.uuid4())
+        row["timestamp"] = order.get("timestamp") or datetime.now(timezone.utc).isoformat()
+        future: Future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        try:
+            self._queue.put((row, future, time.perf_counter()), block=block, timeout=timeout)
+        except queue.Full:
+            raise IntakeBusy(f"{self._queue.maxsize} orders already waiting") from None
+        self._count("submitted")
+        return future
+
+    def consume(
+        self,
+        source: Any,                      # 주문 dict 이터러블, 또는 None 을 넣으면 끝나는 queue.Queue
+        callback: Optional[Callable[[Future], None]] = None,
+    ) -> List[Future]:
+        """source 의 주문을 모두 제출 (처리가 밀리면 여기서 대기). 주문 순서대로 Future 목록."""
+        if isinstance(source, queue.Queue):
+            source = iter(source.get, None)
+        return [self.submit(order, callback) for order in source]
+
+    def place_order(self, order: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """place_order_workflow 와 같은 반환값 (다른 주문과 같은 배치로 처리)."""
+        return self.submit(order).result(timeout)
+
+    # -----------------------------
+    # 배치 구성
+    # -----------------------------
+    def _next_batch(self) -> List[Any]:
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return batch
+        limit = self.batch_limit
+        wait_until = time.perf_counter() + self.max_wait
+        while len(batch) < limit:
+            try:
+                # 처리 슬롯을 기다리는 동안 쌓인 주문은 바로 가져오고, 비어 있으면 max_wait 까지만 기다림
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                timeout = wait_until - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            batch.append(item)
+            if item is None:
+                break
+        return batch
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            # 처리 슬롯이 모두 차 있으면 주문이 큐에 쌓이고, 슬롯이 비면 쌓인 만큼 한 배치로 보냄
+            self._slots.acquire()
+            batch = self._next_batch()
+            closing = batch[-1] is None
+            orders = [item for item in batch if item is not None]
+            if orders:
+                self._pool.submit(self._run_batch, orders)
+            else:
+                self._slots.release()
+            if closing:
+                return
+
+    def _adapt(self, size: int, elapsed: float) -> None:
+        # 배치 처리 시간이 지연 목표의 절반(나머지 절반은 큐 대기)을 넘으면 줄이고,
+        # 가득 찬 배치도 여유 있게 끝나면 늘림 (AIMD)
+        budget = self.latency_target / 2
+        with self._lock:
+            if elapsed > budget:
+                self.batch_limit = max(1, int(self.batch_limit * 0.7))
+            elif size >= self.batch_limit and elapsed < budget * 0.8:
+                self.batch_limit = min(self.max_batch, self.batch_limit + max(1, self.batch_limit // 8))
+
+    # -----------------------------
+    # 배치 처리: 생성 → 컴플라이언스 → 상태 업데이트
+    # -----------------------------
+    def _process(
+        self, orders: List[Any], results: Dict[str, Dict[str, Any]], errors: Dict[str, Exception], created: set
+    ) -> None:
+        created.update(self.graph.create_orders([row for row, _, _ in orders]))
+        for row, _, _ in orders:
+            if row["order_id"] not in created:
+                errors[row["order_id"]] = ValueError(
+                    f"Unknown trader, stock or order type: "
+                    f"{row['trader_id']}, {row['stock_symbol']}, {row['order_type']}"
+                )
+        ids = [row["order_id"] for row, _, _ in orders if row["order_id"] in created]
+        violations = self.graph.check_compliance(ids, restricted=self.risk is None) if ids else {}
+        if self.risk is not None:
+            for row, _, _ in orders:
+                if row["order_id"] in created:
+                    found = self.risk.check(row)
+                    if found:
+                        violations.setdefault(row["order_id"], []).extend(found)
+        updates = []
+        for oid in ids:
+            found = violations.get(oid, [])
+            status = "Rejected" if found else "Accepted"
+            updates.append({"order_id": oid, "status": status, "comment": _violation_reason(found) or None})
+            results[oid] = {"order_id": oid, "status": status, "violations": found}
+        if updates:
+            self.graph.update_statuses(updates)
+
+    def _run_batch(self, orders: List[Any]) -> None:
+        start = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, Exception] = {}
+        created: set = set()
+        try:
+            if self.batch_timeout is None:
+                self._process(orders, results, errors, created)
+            else:
+                with deadline.scope(self.batch_timeout, name="order-batch"):
+                    self._process(orders, results, errors, created)
+        except Exception as e:
+            print(f"Error processing batch of {len(orders)} orders. Error: {e}")
+            results.clear()
+            errors = {row["order_id"]: e for row, _, _ in orders}
+            self._reject_created(created, e)
+        finally:
+            self._slots.release()
+
+        elapsed = time.perf_counter() - start
+        self._adapt(len(orders), elapsed)
+        done = time.perf_counter()
+        with self._lock:
+            self._counts["batches"] += 1
+            self._counts["batched_orders"] += len(orders)
+            self._counts["failed"] += len(errors)
+            for result in results.values():
+                self._counts["accepted" if result["status"] == "Accepted" else "rejected"] += 1
+            self._latency.extend(done - enqueued for _, _, enqueued in orders)
+        for row, future, _ in orders:
+            if row["order_id"] in errors:
+                future.set_exception(errors[row["order_id"]])
+            else:
+                future.set_result(results[row["order_id"]])
+
+    def _reject_created(self, created: set, error: Exception) -> None:
+        # 이미 커밋된 주문이 'New' 로 남으면 호출자는 실패로 받았는데 그래프에는 주문이 남으므로 거부로 기록
+        if not created:
+            return
+        comment = f"Processing error: {type(error).__name__}: {error}"
+        try:
+            self.graph.update_statuses(
+                [{"order_id": oid, "status": "Rejected", "comment": comment} for oid in created]
+            )
+        except Exception as e:
+            print(f"Error rejecting {len(created)} created orders. Error: {e}")
+
+    # -----------------------------
+    # 통계 / 종료
+    # -----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            samples = sorted(self._latency)
+            limit = self.batch_limit
+        out: Dict[str, Any] = {**counts, "pending": self._queue.qsize(), "batch_limit": limit}
+        out["mean_batch"] = round(counts["batched_orders"] / counts["batches"], 2) if counts["batches"] else 0.0
+        completed = counts["accepted"] + counts["rejected"] + counts["failed"]
+        out["orders_per_s"] = round(completed / (time.perf_counter() - self._started), 1)
+        if samples:
+            n = len(samples)
+            out["p50"] = round(samples[n // 2], 4)
+            out["p95"] = round(samples[min(n - 1, int(n * 0.95))], 4)
+            out["p99"] = round(samples[min(n - 1, int(n * 0.99))], 4)
+            out["within_target"] = round(sum(1 for s in samples if s <= self.latency_target) / n, 4)
+        return out
+
+    def close(self) -> None:
+        """이미 접수한 주문은 모두 처리한 뒤 종료."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "OrderIntake":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def place_order_workflow(graph: Any, order: Dict[str, Any]) -> Dict[str, Any]:
+    """기존 방식(주문 1건 = 왕복 3회)과 같은 흐름. 비교용."""
+    row = {f: order[f] for f in ORDER_FIELDS}
+    row["order_id"] = str(uuid.uuid4())
+    row["timestamp"] = datetime.now(timezone.utc).isoformat()
+    if not graph.create_orders([row]):
+        raise ValueError(f"Unknown trader, stock or order type: {row['trader_id']}, {row['stock_symbol']}")
+    violations = graph.check_compliance([row["order_id"]]).get(row["order_id"], [])
+    status = "Rejected" if violations else "Accepted"
+    graph.update_statuses([{"order_id": row["order_id"], "status": status, "comment": _violation_reason(violations) or None}])
+    return {"order_id": row["order_id"], "status": status, "violations": violations}
+
+
+def sample_orders(n: int, seed: int = 0) -> Iterable[Dict[str, Any]]:
+    """샘플 데이터의 트레이더·종목으로 만든 주문 (일부는 CR001 / CR002 위반)."""
+    import random
+
+    rng = random.Random(seed)
+    stocks = {"AAPL": 150.0, "MSFT": 160.0, "GOOG": 135.0, "JPM": 145.0}
+    for _ in range(n):
+        symbol = rng.choice(list(stocks))
+        yield {
+            "trader_id": rng.choice(["TR001", "TR002"]),
+            "stock_symbol": symbol,
+            "order_type": rng.choice(["Buy", "Sell"]),
+            "quantity": rng.choice([100, 300, 500, 1000, 2000]),
+            "price": stocks[symbol],
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    n_orders = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    target_ms = 50.0
+
+    # ① 기존 방식: 주문 1건씩 순차 처리 (왕복 1ms 가정)
+    graph = LocalTradingGraph(round_trip_ms=1.0)
+    start = time.perf_counter()
+    for order in sample_orders(300):
+        place_order_workflow(graph, order)
+    elapsed = time.perf_counter() - start
+    print(f"sequential : {300 / elapsed:,.0f} orders/s ({elapsed / 300 * 1000:.2f} ms/order, {graph.calls} graph calls)")
+
+    # ② 주문 접수 스트림: 같은 그래프 지연으로 n_orders 건 연속 접수
+    graph = LocalTradingGraph(round_trip_ms=1.0)
+    with OrderIntake(graph, latency_target_ms=target_ms) as intake:
+        futures = intake.consume(sample_orders(n_orders))
+        statuses: Dict[str, int] = {}
+        for future in futures:
+            status = future.result()["status"]
+            statuses[status] = statuses.get(status, 0) + 1
+        stats = intake.stats()
+    print(f"intake     : {stats['orders_per_s']:,.0f} orders/s, {graph.calls} graph calls, {statuses}")
+    print(f"             target {target_ms:.0f} ms → {stats}")
+
+    # ③ 일정 속도로 도착하는 주문 (초당 rate 건)
+    rate = 5000
+    graph = LocalTradingGraph(round_trip_ms=1.0)
+    with OrderIntake(graph, latency_target_ms=target_ms) as intake:
+        start = time.perf_counter()
+        futures = []
+        for i, order in enumerate(sample_orders(rate * 2)):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(intake.submit(order))
+        for future in futures:
+            future.result()
+        stats = intake.stats()
+    print(f"paced {rate}/s: p50 {stats['p50'] * 1000:.1f} ms, p99 {stats['p99'] * 1000:.1f} ms, "
+          f"mean batch {stats['mean_batch']}, within target {stats['within_target']:.1%}")
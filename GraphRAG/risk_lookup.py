@@ -0,0 +1,191 @@
+# pip install neo4j
+# --------------------------------------------------------------
+# risk_lookup.py
+#   사전 매매 검사(pre-trade check)용 트레이더 위험 정보 조회 테이블
+#     - Order→Trader→InstitutionalClient→RiskProfile 탐색을 주문마다 하지 않고
+#       트레이더 → (고객, 위험 성향, 주문 금액 한도, 제한 종목) 테이블을 미리 만들어 둠
+#     - CR002 (Restricted Stock List) / CR003 (Risk Profile Match) 를 주문당 dict 조회 한 번으로 검사
+#     - 변경 반영: set_client_profile / restrict_symbol 로 쓰면 즉시 재구성,
+#       그 밖의 변경은 refresh_interval 마다 백그라운드에서 다시 읽어 바뀐 경우에만 교체
+#     - 테이블은 통째로 교체하므로 읽는 쪽은 잠금 없이 조회
+# --------------------------------------------------------------
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence
+
+from order_intake import RESTRICTED
+
+# CR003: RiskProfile.max_order_value 속성이 없을 때 사용할 위험 성향별 주문 금액 한도 (None = 제한 없음)
+RISK_LIMITS: Dict[str, Optional[float]] = {
+    "Conservative": 50_000,
+    "Moderate": 250_000,
+    "Aggressive": None,
+}
+
+
+class TraderRisk(NamedTuple):
+    client_id: Optional[str]
+    client_name: Optional[str]
+    risk_level: Optional[str]
+    max_order_value: Optional[float]
+    restricted: FrozenSet[str]       # 전체 제한 종목 + 고객별 제한 종목
+
+
+def _violation(order: Dict[str, Any], rule_id: str, rule_name: str, value: Any, threshold: Any) -> Dict[str, Any]:
+    # check_compliance 결과와 같은 키
+    return {
+        "order_id": order.get("order_id"),
+        "rule_id": rule_id,
+        "rule_name": rule_name,
+        "violated_value": value,
+        "threshold": threshold,
+    }
+
+
+class RiskLookup:
+    """
+    risk = RiskLookup(Neo4jTradingGraph(driver), refresh_interval=30)
+    risk.check({"trader_id": "TR001", "stock_symbol": "JPM", "quantity": 500, "price": 145.0})
+    # → [CR002 위반, CR003 위반]  (그래프 왕복 없음)
+    risk.set_client_profile("IC001", "Aggressive")   # 그래프에 쓰고 테이블 즉시 재구성
+    """
+
+    def __init__(
+        self,
+        graph: Any,                                      # risk_snapshot() 이 있는 Neo4jTradingGraph / LocalTradingGraph
+        limits: Optional[Dict[str, Optional[float]]] = None,
+        default_restricted: Sequence[str] = RESTRICTED,  # 그래프에 CR002 로 연결된 종목이 없을 때 사용
+        refresh_interval: Optional[float] = None,        # 초 단위, None 이면 백그라운드 갱신 안 함
+    ):
+        self.graph = graph
+        self.limits = dict(RISK_LIMITS if limits is None else limits)
+        self.default_restricted = frozenset(default_restricted)
+        self.version = 0
+        self.refreshed_at = 0.0
+        self._table: Dict[str, TraderRisk] = {}
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.refresh()
+        self._thread: Optional[threading.Thread] = None
+        if refresh_interval:
+            self._thread = threading.Thread(
+                target=self._refresh_loop, args=(refresh_interval,), name="risk-refresh", daemon=True
+            )
+            self._thread.start()
+
+    # -----------------------------
+    # 1) 테이블 구성 / 갱신
+    # -----------------------------
+    def _build(self, snapshot: Dict[str, Any]) -> Dict[str, TraderRisk]:
+        restricted = frozenset(snapshot.get("restricted") or ()) or self.default_restricted
+        table = {}
+        for row in snapshot["traders"]:
+            level = row.get("risk_level")
+            limit = row.get("max_order_value")
+            if limit is None and level is not None:
+                limit = self.limits.get(level)
+            table[row["trader_id"]] = TraderRisk(
+                client_id=row.get("client_id"),
+                client_name=row.get("client_name"),
+                risk_level=level,
+                max_order_value=limit,
+                restricted=restricted | frozenset(row.get("client_restricted") or ()),
+            )
+        return table
+
+    def refresh(self) -> bool:
+        """그래프에서 다시 읽어 내용이 바뀌었으면 교체. 바뀌었으면 True."""
+        with self._refresh_lock:
+            table = self._build(self.graph.risk_snapshot())
+            self.refreshed_at = time.time()
+            if table == self._table:
+                return False
+            self._table = table     # 참조 교체 한 번 → check() 는 잠금 없이 이전 또는 새 테이블을 봄
+            self.version += 1
+            return True
+
+    def _refresh_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # 갱신에 실패하면 마지막 테이블을 계속 사용
+                print(f"Error refreshing risk lookup. Error: {e}")
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    # -----------------------------
+    # 2) 변경 (그래프에 쓰고 즉시 반영)
+    # -----------------------------
+    def set_client_profile(self, client_id: str, level: str) -> None:
+        self.graph.set_client_profile(client_id, level)
+        self.refresh()
+
+    def restrict_symbol(self, client_id: str, symbol: str) -> None:
+        self.graph.restrict_symbol(client_id, symbol)
+        self.refresh()
+
+    # -----------------------------
+    # 3) 조회 / 검사
+    # -----------------------------
+    def get(self, trader_id: str) -> Optional[TraderRisk]:
+        return self._table.get(trader_id)
+
+    def check(self, order: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """주문 1건의 CR002 / CR003 위반 목록 (dict 조회 한 번, 그래프 호출 없음)."""
+        risk = self._table.get(order["trader_id"])
+        violations = []
+        restricted = risk.restricted if risk is not None else self.default_restricted
+        if order["stock_symbol"] in restricted:
+            violations.append(_violation(order, "CR002", "Restricted Stock", order["stock_symbol"], None))
+        if risk is None or risk.risk_level is None:
+            # 고객 또는 위험 성향이 연결되지 않은 트레이더는 거부 (fail closed)
+            violations.append(_violation(order, "CR003", "Risk Profile Match", "no risk profile", None))
+        elif risk.max_order_value is not None:
+            value = order["quantity"] * order["price"]
+            if value > risk.max_order_value:
+                violations.append(_violation(order, "CR003", "Risk Profile Match", value, risk.max_order_value))
+        return violations
+
+    def stats(self) -> Dict[str, Any]:
+        return {"traders": len(self._table), "version": self.version, "refreshed_at": self.refreshed_at}
+
+
+if __name__ == "__main__":
+    from order_intake import LocalTradingGraph, OrderIntake, sample_orders
+
+    graph = LocalTradingGraph(round_trip_ms=1.0)
+    risk = RiskLookup(graph)
+    print(risk.get("TR001"))
+
+    # ① 조회 테이블 검사 속도 (주문당)
+    orders = list(sample_orders(200_000))
+    start = time.perf_counter()
+    rejected = sum(1 for order in orders if risk.check(order))
+    elapsed = time.perf_counter() - start
+    print(f"check      : {len(orders) / elapsed:,.0f} orders/s ({elapsed / len(orders) * 1e6:.2f} µs/order), "
+          f"{rejected:,} with CR002/CR003 violations")
+
+    # ② 주문 접수 스트림에 연결: 그래프 호출 수는 그대로, 규칙 3개 모두 검사
+    for label, lookup in (("CR001+CR002", None), ("CR001-CR003", risk)):
+        graph.calls = 0
+        with OrderIntake(graph, latency_target_ms=50, risk=lookup) as intake:
+            rules: Dict[str, int] = {}
+            for future in intake.consume(sample_orders(20000)):
+                for v in future.result()["violations"]:
+                    rules[v["rule_id"]] = rules.get(v["rule_id"], 0) + 1
+            stats = intake.stats()
+        print(f"{label:<12}: {stats['orders_per_s']:,.0f} orders/s, p99 {stats['p99'] * 1000:.1f} ms, "
+              f"{graph.calls} graph calls, violations {dict(sorted(rules.items()))}")
+
+    # ③ 변경 반영
+    order = {"trader_id": "TR001", "stock_symbol": "AAPL", "quantity": 500, "price": 150.0}
+    print("before     :", [v["rule_id"] for v in risk.check(order)], "version", risk.version)
+    risk.set_client_profile("IC001", "Aggressive")
+    print("Aggressive :", [v["rule_id"] for v in risk.check(order)], "version", risk.version)
+    risk.restrict_symbol("IC001", "AAPL")
+    print("restricted :", [v["rule_id"] for v in risk.check(order)], "version", risk.version)
+    print("unchanged  :", risk.refresh(), "version", risk.version)
@@ -0,0 +1,185 @@
+# pip install langchain-neo4j
+# --------------------------------------------------------------
+# schema_snapshot.py
+#   ① 스키마 스냅샷: graph.refresh_schema() 결과를 로컬 파일에 버전과 함께 저장하고,
+#      DB의 레이블/관계 타입/속성 키 목록이 바뀐 경우에만 다시 introspection
+#   ② 스키마 프루너: 질문과 관련된 레이블·관계만 골라 Cypher 생성 프롬프트의 {schema} 를 축소
+# --------------------------------------------------------------
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+FINGERPRINT_QUERIES = {
+    "labels": "CALL db.labels() YIELD label RETURN label AS name",
+    "relationship_types": "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType AS name",
+    "property_keys": "CALL db.propertyKeys() YIELD propertyKey RETURN propertyKey AS name",
+}
+
+
+def format_schema(structured_schema: Dict[str, Any]) -> str:
+    """Neo4jGraph.schema 와 같은 형식의 스키마 문자열 생성."""
+    def props(items: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+        lines = []
+        for name, plist in items.items():
+            fields = ", ".join(f"{p['property']}: {p['type']}" for p in plist)
+            lines.append(f"{name} {{{fields}}}")
+        return lines
+
+    rels = [f"(:{r['start']})-[:{r['type']}]->(:{r['end']})" for r in structured_schema.get("relationships", [])]
+    return "\n".join([
+        "Node properties:",
+        "\n".join(props(structured_schema.get("node_props", {}))),
+        "Relationship properties:",
+        "\n".join(props(structured_schema.get("rel_props", {}))),
+        "The relationships:",
+        "\n".join(rels),
+    ])
+
+
+# -----------------------------
+# 1) 스키마 스냅샷
+# -----------------------------
+class SchemaSnapshot:
+    """
+    graph = Neo4jGraph(..., refresh_schema=False) 로 연결한 뒤
+    SchemaSnapshot(graph, path).load_or_refresh() 를 호출하면
+    변경이 없을 때는 저장된 스키마를 graph.schema / graph.structured_schema 에 바로 적용한다.
+    """
+
+    def __init__(self, graph: Any, path: str, max_age: Optional[float] = None):
+        self.graph = graph
+        self.path = path
+        self.max_age = max_age          # 초 단위, 지정하면 지문이 같아도 이 시간이 지나면 갱신
+        self.data: Dict[str, Any] = {}
+
+    @property
+    def version(self) -> int:
+        return self.data.get("version", 0)
+
+    @property
+    def schema(self) -> str:
+        return self.data.get("schema", "")
+
+    @property
+    def structured_schema(self) -> Dict[str, Any]:
+        return self.data.get("structured_schema", {})
+
+    def fingerprint(self) -> str:
+        """레이블/관계 타입/속성 키 목록의 해시 (전체 스키마 introspection 보다 훨씬 가벼움)."""
+        parts = []
+        for key, query in FINGERPRINT_QUERIES.items():
+            names = sorted(row["name"] for row in self.graph.query(query))
+            parts.append(f"{key}:{','.join(names)}")
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def load_or_refresh(self) -> bool:
+        """스냅샷을 적용. 스키마를 새로 읽었으면 True."""
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.data = json.load(f)
+
+        current = self.fingerprint()
+        expired = self.max_age is not None and time.time() - self.data.get("created", 0) > self.max_age
+        if self.data and self.data.get("fingerprint") == current and not expired:
+            self._apply()
+            return False
+
+        self.graph.refresh_schema()
+        self.data = {
+            "version": self.version + 1,
+            "fingerprint": current,
+            "created": time.time(),
+            "schema": self.graph.schema,
+            "structured_schema": self.graph.structured_schema,
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2, default=str)
+        return True
+
+    def _apply(self) -> None:
+        self.graph.schema = self.schema
+        self.graph.structured_schema = self.structured_schema
+
+
+# -----------------------------
+# 2) 질문 기반 스키마 프루너
+# -----------------------------
+def _words(name: str) -> List[str]:
+    # "BloodPressure" -> ["bloodpressure", "blood", "pressure"], "HAS_SYMPTOM" -> ["has_symptom", "symptom"]
+    parts = re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+", name)
+    words = [name.lower()] + [p.lower() for p in parts if len(p) > 2 and p.lower() != "has"]
+    return words
+
+
+class SchemaPruner:
+    """
+    질문에 등장하는 레이블/속성/별칭(한국어 키워드)으로 관련 레이블을 고르고,
+    그 레이블에서 hops 단계 이내의 관계만 남긴 스키마 문자열을 만든다.
+    관련 레이블을 하나도 찾지 못하면 전체 스키마를 사용한다.
+    """
+
+    def __init__(
+        self,
+        structured_schema: Dict[str, Any],
+        aliases: Optional[Dict[str, Iterable[str]]] = None,   # 레이블 -> 질문에 나올 수 있는 키워드
+        hops: int = 1,
+    ):
+        self.structured_schema = structured_schema
+        self.hops = hops
+        self.full_schema = format_schema(structured_schema)
+        self._keywords: Dict[str, Set[str]] = {}
+        for label, plist in structured_schema.get("node_props", {}).items():
+            kws = set(_words(label))
+            kws.update(p["property"].lower() for p in plist)
+            kws.update(a.lower() for a in (aliases or {}).get(label, []))
+            self._keywords[label] = kws
+        for label, kws in (aliases or {}).items():
+            self._keywords.setdefault(label, set()).update(a.lower() for a in kws)
+
+    def relevant_labels(self, question: str) -> Set[str]:
+        q = question.lower()
+        seeds = {label for label, kws in self._keywords.items() if any(kw in q for kw in kws)}
+        # 관계 타입 이름이 질문에 나오면 양 끝 레이블도 포함
+        for r in self.structured_schema.get("relationships", []):
+            if any(w in q for w in _words(r["type"])[1:]):
+                seeds.update((r["start"], r["end"]))
+
+        selected = set(seeds)
+        frontier = set(seeds)
+        for _ in range(self.hops):
+            nxt = set()
+            for r in self.structured_schema.get("relationships", []):
+                if r["start"] in frontier and r["end"] not in selected:
+                    nxt.add(r["end"])
+                if r["end"] in frontier and r["start"] not in selected:
+                    nxt.add(r["start"])
+            selected |= nxt
+            frontier = nxt
+        return selected
+
+    def __call__(self, question: str) -> str:
+        labels = self.relevant_labels(question)
+        if not labels:
+            return self.full_schema
+        s = self.structured_schema
+        rels = [r for r in s.get("relationships", []) if r["start"] in labels and r["end"] in labels]
+        rel_types = {r["type"] for r in rels}
+        return format_schema({
+            "node_props": {k: v for k, v in s.get("node_props", {}).items() if k in labels},
+            "rel_props": {k: v for k, v in s.get("rel_props", {}).items() if k in rel_types},
+            "relationships": rels,
+        })
+
+
+def invoke_with_pruned_schema(chain: Any, pruner: SchemaPruner, question: str, **kwargs: Any) -> Dict[str, Any]:
+    """
+    GraphCypherQAChain 을 질문별로 축소한 스키마로 실행.
+    공유 chain 은 그대로 두고 graph_schema 만 바꾼 얕은 복사본으로 호출하므로 동시 호출끼리 섞이지 않는다.
+    """
+    update = {"graph_schema": pruner(question)}
+    copy = getattr(chain, "model_copy", None)   # pydantic v2 (langchain >= 0.3), 아니면 v1 의 copy()
+    pruned = copy(update=update) if copy else chain.copy(update=update)
+    return pruned.invoke({"query": question}, **kwargs)
@@ -0,0 +1,262 @@
+# pip install neo4j openpyxl
+# --------------------------------------------------------------
+# tabular_graph_loader.py
+#   CSV / XLSX 표 데이터를 선언적 매핑(컬럼 → 노드 레이블/키/속성, 관계)에 따라 Neo4j 에 적재
+#     - 행을 청크 단위로 스트리밍 (파일 전체를 메모리에 올리지 않음)
+#     - 이미 쓴 엔터티/관계는 메모리에서 중복 제거
+#     - 키 고유 제약을 먼저 만든 뒤 레이블·관계 타입별 UNWIND + MERGE 배치로 기록
+# --------------------------------------------------------------
+import csv
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+
+def _quote(name: str) -> str:
+    # 레이블/관계 타입/속성 이름은 파라미터로 넘길 수 없으므로 백틱으로 감싸 삽입
+    return "`" + str(name).replace("`", "") + "`"
+
+
+# -----------------------------
+# 1) 매핑 정의
+# -----------------------------
+@dataclass
+class NodeSpec:
+    label: str                                               # 노드 레이블 (예: "Player")
+    key: str                                                 # MERGE 키 속성 이름 (예: "Name")
+    column: str                                              # 키 값을 읽을 컬럼
+    properties: Dict[str, str] = field(default_factory=dict) # 추가 속성 이름 -> 컬럼
+
+
+@dataclass
+class RelSpec:
+    type: str                                                # 관계 타입 (예: "Part_of")
+    start: str                                               # 시작 노드 별칭 (GraphMapping.nodes 의 키)
+    end: str                                                 # 끝 노드 별칭
+    properties: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class GraphMapping:
+    nodes: Dict[str, NodeSpec]                               # 별칭 -> 노드 정의
+    relationships: List[RelSpec] = field(default_factory=list)
+    converters: Dict[str, Callable[[Any], Any]] = field(default_factory=dict)  # 컬럼 -> 값 변환 함수
+
+
+def _to_int(value: Any) -> Optional[int]:
+    return int(float(value)) if value not in (None, "") else None
+
+
+# 7.2 / 7.5 / 7.6 노트북의 스키마에 맞춘 샘플 데이터 매핑
+FOOTBALL_MAPPING = GraphMapping(
+    nodes={
+        "player": NodeSpec("Player", "Name", "short_name", {
+            "Age": "age", "Overall": "overall", "Potential": "potential",
+            "Positions": "player_positions", "PreferredFoot": "preferred_foot",
+        }),
+        "team": NodeSpec("Team", "Name", "club_name"),
+        "league": NodeSpec("League", "Name", "league_name"),
+        "country": NodeSpec("Country", "Name", "nationality"),
+        "wage": NodeSpec("Wage", "Euro", "wage_eur"),
+    },
+    relationships=[
+        RelSpec("Part_of", "player", "team"),
+        RelSpec("Paid", "player", "wage"),
+        RelSpec("PLAYS_IN", "team", "league"),
+        RelSpec("NATIONALITY", "player", "country"),
+    ],
+    converters={"age": _to_int, "overall": _to_int, "potential": _to_int, "wage_eur": _to_int},
+)
+
+CAR_MAPPING = GraphMapping(
+    nodes={
+        "manufacturer": NodeSpec("Manufacturer", "Name", "제조사"),
+        "brand": NodeSpec("Brand", "Name", "모델"),
+        "price": NodeSpec("Price", "Amount", "가격(만원)"),
+    },
+    relationships=[
+        RelSpec("PRODUCES", "manufacturer", "brand"),
+        RelSpec("HAS_PRICE", "brand", "price"),
+    ],
+    converters={"가격(만원)": _to_int},
+)
+
+HEALTH_MAPPING = GraphMapping(
+    nodes={
+        "disease": NodeSpec("Disease", "Name", "Disease"),
+        "fever": NodeSpec("Fever", "Status", "Fever"),
+        "cough": NodeSpec("Cough", "Status", "Cough"),
+        "fatigue": NodeSpec("Fatigue", "Status", "Fatigue"),
+        "breathing": NodeSpec("DifficultyBreathing", "Status", "Difficulty Breathing"),
+        "age": NodeSpec("Age", "Value", "Age"),
+        "gender": NodeSpec("Gender", "Type", "Gender"),
+        "bp": NodeSpec("BloodPressure", "Level", "Blood Pressure"),
+        "cholesterol": NodeSpec("CholesterolLevel", "Level", "Cholesterol Level"),
+        "outcome": NodeSpec("Outcome", "Result", "Outcome Variable"),
+    },
+    relationships=[
+        RelSpec("HAS_SYMPTOM", "disease", "fever"),
+        RelSpec("HAS_SYMPTOM", "disease", "cough"),
+        RelSpec("HAS_SYMPTOM", "disease", "fatigue"),
+        RelSpec("HAS_SYMPTOM", "disease", "breathing"),
+        RelSpec("HAS_DEMOGRAPHIC", "disease", "age"),
+        RelSpec("HAS_DEMOGRAPHIC", "disease", "gender"),
+        RelSpec("HAS_HEALTH_INDICATOR", "disease", "bp"),
+        RelSpec("HAS_HEALTH_INDICATOR", "disease", "cholesterol"),
+        RelSpec("HAS_OUTCOME", "disease", "outcome"),
+    ],
+    converters={"Age": _to_int},
+)
+
+
+# -----------------------------
+# 2) 행 스트리밍
+# -----------------------------
+def iter_row_chunks(path: str, chunk_size: int = 10000, sheet_name: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+    """CSV / XLSX 파일을 chunk_size 행씩 dict 목록으로 반환."""
+    ext = os.path.splitext(path)[1].lower()
+    chunk: List[Dict[str, Any]] = []
+    if ext in (".xlsx", ".xlsm"):
+        import openpyxl
+
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+            rows = ws.iter_rows(values_only=True)
+            header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+            for values in rows:
+                chunk.append(dict(zip(header, values)))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+# -----------------------------
+# 3) 로더
+# -----------------------------
+class TabularGraphLoader:
+    def __init__(
+        self,
+        driver: Any,                     # neo4j.GraphDatabase.driver(...)
+        mapping: GraphMapping,
+        database: Optional[str] = None,
+        batch_size: int = 5000,          # UNWIND 한 번에 보낼 행 수
+    ):
+        self.driver = driver
+        self.mapping = mapping
+        self.database = database
+        self.batch_size = batch_size
+        # 이미 기록한 (레이블, 키 속성) 별 키 값 / 관계별 (시작 키, 끝 키)
+        self._seen_nodes: Dict[Tuple[str, str], Set[Any]] = defaultdict(set)
+        self._seen_rels: Dict[Tuple[str, str, str], Set[Tuple[Any, Any]]] = defaultdict(set)
+
+    def create_constraints(self) -> None:
+        """MERGE 가 인덱스를 사용하도록 (레이블, 키) 고유 제약을 먼저 생성."""
+        pairs = {(spec.label, spec.key) for spec in self.mapping.nodes.values()}
+        with self.driver.session(database=self.database) as s:
+            for label, key in sorted(pairs):
+                s.run(
+                    f"CREATE CONSTRAINT IF NOT EXISTS FOR (n:{_quote(label)}) REQUIRE n.{_quote(key)} IS UNIQUE"
+                ).consume()
+
+    def _convert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        converters = self.mapping.converters
+        out = {}
+        for col, value in row.items():
+            if isinstance(value, str):
+                value = value.strip()
+            if value in (None, ""):
+                continue
+            out[col] = converters[col](value) if col in converters else value
+        return out
+
+    def _collect(self, rows: List[Dict[str, Any]]) -> Tuple[Dict[Tuple[str, str], List[dict]], Dict[Tuple[str, str, str], List[dict]]]:
+        """청크에서 아직 쓰지 않은 노드/관계만 모아 (레이블, 키)·(시작, 타입, 끝) 별로 그룹화."""
+        nodes: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+        rels: Dict[Tuple[str, str, str], List[dict]] = defaultdict(list)
+        specs = self.mapping.nodes
+        for raw in rows:
+            row = self._convert(raw)
+            keys: Dict[str, Any] = {}
+            for alias, spec in specs.items():
+                value = row.get(spec.column)
+                if value is None:
+                    continue
+                keys[alias] = value
+                seen = self._seen_nodes[(spec.label, spec.key)]
+                if value in seen:
+                    continue
+                seen.add(value)
+                props = {p: row[c] for p, c in spec.properties.items() if c in row}
+                nodes[(spec.label, spec.key)].append({"key": value, "props": props})
+            for rel in self.mapping.relationships:
+                if rel.start not in keys or rel.end not in keys:
+                    continue
+                pair = (keys[rel.start], keys[rel.end])
+                group = (rel.start, rel.type, rel.end)
+                if pair in self._seen_rels[group]:
+                    continue
+                self._seen_rels[group].add(pair)
+                props = {p: row[c] for p, c in rel.properties.items() if c in row}
+                rels[group].append({"start": pair[0], "end": pair[1], "props": props})
+        return nodes, rels
+
+    def _write_batches(self, session: Any, query: str, rows: List[dict]) -> None:
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+
+    def write_chunk(self, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """한 청크를 적재하고 (새 노드 수, 새 관계 수) 반환. 노드를 먼저 쓰고 관계를 쓴다."""
+        nodes, rels = self._collect(rows)
+        specs = self.mapping.nodes
+        with self.driver.session(database=self.database) as s:
+            for (label, key), batch in nodes.items():
+                query = (
+                    f"UNWIND $rows AS row "
+                    f"MERGE (n:{_quote(label)} {{{_quote(key)}: row.key}}) SET n += row.props"
+                )
+                self._write_batches(s, query, batch)
+            for (start, rel_type, end), batch in rels.items():
+                a, b = specs[start], specs[end]
+                query = (
+                    f"UNWIND $rows AS row "
+                    f"MATCH (a:{_quote(a.label)} {{{_quote(a.key)}: row.start}}) "
+                    f"MATCH (b:{_quote(b.label)} {{{_quote(b.key)}: row.end}}) "
+                    f"MERGE (a)-[r:{_quote(rel_type)}]->(b) SET r += row.props"
+                )
+                self._write_batches(s, query, batch)
+        return sum(len(v) for v in nodes.values()), sum(len(v) for v in rels.values())
+
+    def load(
+        self,
+        path: str,
+        chunk_size: int = 10000,
+        sheet_name: Optional[str] = None,
+        create_constraints: bool = True,
+    ) -> Dict[str, Any]:
+        """파일 전체를 적재하고 통계(rows, nodes, relationships, seconds) 반환."""
+        start = time.perf_counter()
+        if create_constraints:
+            self.create_constraints()
+        stats = {"rows": 0, "nodes": 0, "relationships": 0}
+        for chunk in iter_row_chunks(path, chunk_size, sheet_name):
+            n_nodes, n_rels = self.write_chunk(chunk)
+            stats["rows"] += len(chunk)
+            stats["nodes"] += n_nodes
+            stats["relationships"] += n_rels
+        stats["seconds"] = round(time.perf_counter() - start, 2)
+        return stats
@@ -0,0 +1,410 @@
+# pip install neo4j
+# --------------------------------------------------------------
+# task_planner.py
+#   태스크 온톨로지(Task -HAS_PRECONDITION/HAS_POSTCONDITION-> 조건)에서 목표까지의 전체 계획을 미리 계산
+#     - testLLMTaskRunner.py / testNonLLMTaskRunner.py 의 단계별 선택(range(5) + 하드코딩 종료 조건) 대체
+#     - 목표 조건 집합을 받아 A* 탐색 (비용 = Task.priority, 낮을수록 우선)
+#     - 선행 조건 의존성으로 단계(stage)를 나눠 같은 단계의 태스크는 동시에 실행 가능
+#     - (시작 상태, 목표, 보유 입력) 별 계획 캐시 → 실행 중 단계별 계획 호출 0회
+#     - 목표에 필요한 조건을 만들 수 있는 태스크가 없으면 탐색 전에 GoalUnreachable
+# --------------------------------------------------------------
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+DEFAULT_PRIORITY = 1000    # 러너의 t.get("priority", 1000) 과 같은 기본값
+
+FETCH_TASKS = """
+MATCH (t:Task)
+OPTIONAL MATCH (t)-[:HAS_PRECONDITION]->(pre:Precondition)
+OPTIONAL MATCH (t)-[:HAS_POSTCONDITION]->(post:Postcondition)
+OPTIONAL MATCH (t)-[:REQUIRES_INPUT]->(inp:InputSlot)
+OPTIONAL MATCH (t)-[:USES_TOOL]->(tool:Tool)
+RETURN t {.*,
+  preconditions: collect(DISTINCT pre.name),
+  postconditions: collect(DISTINCT post.name),
+  inputs: collect(DISTINCT inp.name),
+  tools: collect(DISTINCT tool.name)
+} AS task
+"""
+
+
+class GoalUnreachable(ValueError):
+    """시작 상태와 보유 입력으로는 목표 조건을 만들 수 없음."""
+
+
+class Plan(NamedTuple):
+    steps: Tuple[str, ...]                 # 순차 실행 순서
+    stages: Tuple[Tuple[str, ...], ...]    # 동시에 실행 가능한 태스크 묶음 (앞 단계부터)
+    cost: float                            # priority 합
+    final_state: FrozenSet[str]
+
+
+def fetch_tasks(driver: Any, database: Optional[str] = None) -> List[Dict[str, Any]]:
+    """KGClient.fetch_tasks 와 같은 쿼리 (fetch_tasks 가 없는 testLLMTaskRunner 의 KGClient 용)."""
+    with driver.session(database=database) as s:
+        return [r["task"] for r in s.run(FETCH_TASKS).data()]
+
+
+class _Task(NamedTuple):
+    name: str
+    cost: float
+    pre: FrozenSet[str]
+    post: FrozenSet[str]
+    inputs: FrozenSet[str]
+
+
+# -----------------------------
+# 1) 플래너
+# -----------------------------
+class TaskPlanner:
+    """
+    planner = TaskPlanner.from_kg(kg)                      # 태스크 전체를 한 번만 조회
+    plan = planner.plan(["PortfolioUpdatedWithin7Days"], goal=["WeightsOptimized"],
+                        available_inputs=["HoldingsData", "MarketVolatilityIndex"])
+    plan.stages   # (("AssessRisk", "StressTest"), ("RebalancePortfolio",))
+    execute_plan(planner, plan, shared_context, TOOL_REGISTRY)
+    """
+
+    def __init__(
+        self,
+        tasks: Iterable[Dict[str, Any]],      # fetch_tasks() 결과 형식
+        cache_size: int = 1024,               # 보관할 (시작 상태, 목표, 입력) 조합 수
+        max_expansions: int = 200_000,        # 탐색할 최대 상태 수
+        weight: float = 1.0,                  # 1.0 = 최소 비용 계획, >1 이면 더 빠르지만 비용 ≤ weight × 최소 비용
+    ):
+        self.cache_size = cache_size
+        self.weight = weight
+        self.max_expansions = max_expansions
+        self._cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.load(tasks)
+
+    @classmethod
+    def from_kg(cls, kg: Any, **kwargs: Any) -> "TaskPlanner":
+        tasks = kg.fetch_tasks() if hasattr(kg, "fetch_tasks") else fetch_tasks(kg.driver)
+        return cls(tasks, **kwargs)
+
+    def load(self, tasks: Iterable[Dict[str, Any]]) -> None:
+        """태스크 목록 교체 (온톨로지가 바뀌면 호출). 캐시된 계획은 모두 버린다."""
+        self.tasks: Dict[str, Dict[str, Any]] = {}
+        self._tasks: List[_Task] = []
+        self._producers: Dict[str, List[_Task]] = {}
+        for t in tasks:
+            priority = t.get("priority")
+            task = _Task(
+                name=t["name"],
+                cost=float(priority if priority is not None else DEFAULT_PRIORITY),
+                pre=frozenset(p for p in t.get("preconditions", []) if p),
+                post=frozenset(p for p in t.get("postconditions", []) if p),
+                inputs=frozenset(i for i in t.get("inputs", []) if i),
+            )
+            if task.cost <= 0:
+                raise ValueError(f"Task {task.name} has non-positive priority {priority}; A* needs positive costs")
+            self.tasks[task.name] = t
+            self._tasks.append(task)
+            for condition in task.post:
+                self._producers.setdefault(condition, []).append(task)
+        with self._lock:
+            self._cache.clear()
+
+    # -----------------------------
+    # 탐색 준비: 도달 가능성 / 관련 태스크 / 휴리스틱
+    # -----------------------------
+    def _reachable(self, start: FrozenSet[str], tasks: List[_Task]) -> Set[str]:
+        # 조건이 지워지지 않으므로 적용 가능한 태스크를 반복 적용한 고정점이 도달 가능한 전체 조건
+        reached = set(start)
+        pending = list(tasks)
+        changed = True
+        while changed:
+            changed = False
+            rest = []
+            for task in pending:
+                if task.pre <= reached:
+                    if not task.post <= reached:
+                        reached |= task.post
+                        changed = True
+                else:
+                    rest.append(task)
+            pending = rest
+        return reached
+
+    def _relevant(self, goal: FrozenSet[str], tasks: List[_Task]) -> Tuple[List[_Task], Set[str]]:
+        # 목표 조건 또는 관련 태스크의 선행 조건을 만드는 태스크만 남김 (역방향 도달)
+        allowed = set(tasks)
+        needed, queue, relevant = set(goal), list(goal), set()
+        while queue:
+            condition = queue.pop()
+            for task in self._producers.get(condition, ()):
+                if task in allowed and task not in relevant:
+                    relevant.add(task)
+                    for p in task.pre - needed:
+                        needed.add(p)
+                        queue.append(p)
+        return [t for t in tasks if t in relevant], needed
+
+    @staticmethod
+    def _h_max(
+        state: FrozenSet[str],
+        goal: FrozenSet[str],
+        tasks: List[_Task],
+        consumers: Dict[str, List[_Task]],
+    ) -> float:
+        """
+        h_max: 남은 목표 조건 중 가장 비싼 조건의 (선행 조건을 무시하지 않은) 최소 달성 비용.
+        조건이 지워지지 않는 문제에서 허용 가능한(admissible) 휴리스틱 – 비용 순 Dijkstra 로 계산.
+        """
+        left = set(goal - state)
+        if not left:
+            return 0.0
+        cost: Dict[str, float] = {c: 0.0 for c in state}
+        heap = [(0.0, c) for c in state if c in consumers]
+        waiting = {task: len(task.pre) for task in tasks}
+        for task in tasks:
+            if not task.pre:
+                for c in task.post:
+                    if task.cost < cost.get(c, float("inf")):
+                        cost[c] = task.cost
+                        heap.append((task.cost, c))
+        heapq.heapify(heap)
+        h = 0.0
+        while heap:
+            d, c = heapq.heappop(heap)
+            if d > cost[c]:
+                continue
+            if c in left:
+                left.discard(c)
+                h = d      # 비용 순으로 꺼내므로 마지막 목표 조건의 비용이 최댓값
+                if not left:
+                    return h
+            for task in consumers.get(c, ()):
+                waiting[task] -= 1
+                if waiting[task] == 0:
+                    base = d + task.cost
+                    for p in task.post:
+                        if base < cost.get(p, float("inf")):
+                            cost[p] = base
+                            heapq.heappush(heap, (base, p))
+        return float("inf")
+
+    # -----------------------------
+    # 계획
+    # -----------------------------
+    def plan(
+        self,
+        start: Iterable[str],
+        goal: Iterable[str],
+        available_inputs: Optional[Iterable[str]] = None,   # None 이면 입력 제약 없음
+    ) -> Plan:
+        start_set = frozenset(start)
+        goal_set = frozenset(goal)
+        inputs = frozenset(available_inputs) if available_inputs is not None else None
+        key = (start_set, goal_set, inputs)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                cached = self._cache[key]
+                if isinstance(cached, GoalUnreachable):
+                    raise cached
+                return cached
+            self.misses += 1
+        try:
+            result: Any = self._search(start_set, goal_set, inputs)
+        except GoalUnreachable as e:
+            result = e
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        if isinstance(result, GoalUnreachable):
+            raise result
+        return result
+
+    def _search(self, start: FrozenSet[str], goal: FrozenSet[str], inputs: Optional[FrozenSet[str]]) -> Plan:
+        if goal <= start:
+            return Plan((), (), 0.0, start)
+        usable = [t for t in self._tasks if inputs is None or t.inputs <= inputs]
+        reachable = self._reachable(start, usable)
+        missing = goal - reachable
+        if missing:
+            blocked = sorted(
+                t.name for c in missing for t in self._producers.get(c, ())
+                if inputs is not None and not t.inputs <= inputs
+            )
+            detail = f"; producers missing inputs: {blocked}" if blocked else ""
+            raise GoalUnreachable(f"Cannot reach {sorted(missing)} from {sorted(start)}{detail}")
+
+        tasks, needed = self._relevant(goal, [t for t in usable if t.pre <= reachable])
+        order = {task: i for i, task in enumerate(tasks)}
+        consumers: Dict[str, List[_Task]] = {}
+        for task in tasks:
+            for p in task.pre:
+                consumers.setdefault(p, []).append(task)
+
+        def h(state: FrozenSet[str]) -> float:
+            return self.weight * self._h_max(state, goal, tasks, consumers)
+
+        counter = itertools.count()
+        frontier: List[Tuple[float, int, float, FrozenSet[str], Tuple[_Task, ...]]] = [(h(start), next(counter), 0.0, start, ())]
+        best: Dict[Tuple[FrozenSet[str], Any], float] = {(start, None): 0.0}
+        expansions = 0
+        while frontier:
+            _, _, g, state, steps = heapq.heappop(frontier)
+            if goal <= state:
+                return Plan(tuple(t.name for t in steps), _stages(steps, start), g, state)
+            last = steps[-1] if steps else None
+            if g > best.get((state, last), float("inf")):
+                continue
+            expansions += 1
+            if expansions > self.max_expansions:
+                raise RuntimeError(f"Planner gave up after {self.max_expansions} expansions")
+            for task in tasks:
+                if not task.pre <= state or not (task.post & needed) - state:
+                    continue    # 실행할 수 없거나, 필요한 조건을 새로 만들지 않는 태스크
+                if last is not None and order[task] < order[last] and not task.pre & last.post:
+                    # 조건이 지워지지 않으므로 서로 의존하지 않는 태스크는 순서를 바꿔도 같은 결과
+                    # → 인덱스 순서로만 이어 붙여 같은 집합의 다른 순열을 중복 탐색하지 않음
+                    continue
+                nxt = state | task.post
+                cost = g + task.cost
+                # 마지막 태스크에 따라 이어 붙일 수 있는 태스크가 다르므로 (상태, 마지막 태스크) 별로 최소 비용 유지
+                if cost < best.get((nxt, task), float("inf")):
+                    best[(nxt, task)] = cost
+                    estimate = h(nxt)
+                    if estimate != float("inf"):    # 이 상태에서는 목표에 도달할 수 없음
+                        heapq.heappush(frontier, (cost + estimate, next(counter), cost, nxt, steps + (task,)))
+        raise GoalUnreachable(f"Cannot reach {sorted(goal)} from {sorted(start)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"tasks": len(self._tasks), "cached": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+def _stages(steps: Tuple[_Task, ...], start: FrozenSet[str]) -> Tuple[Tuple[str, ...], ...]:
+    # 태스크의 단계 = 선행 조건을 처음 만든 태스크들의 단계 + 1
+    made_at: Dict[str, int] = {c: -1 for c in start}
+    levels: List[List[str]] = []
+    for task in steps:
+        level = max((made_at.get(p, -1) for p in task.pre), default=-1) + 1
+        for c in task.post:
+            made_at.setdefault(c, level)
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(task.name)
+    return tuple(tuple(names) for names in levels if names)
+
+
+# -----------------------------
+# 2) 실행기
+# -----------------------------
+def execute_plan(
+    planner: TaskPlanner,
+    plan: Plan,
+    context: Dict[str, Any],
+    registry: Dict[str, Callable[..., Dict[str, Any]]],
+    current_state: Optional[List[str]] = None,   # 주면 실행하면서 postcondition 을 추가
+    max_workers: int = 4,                        # 한 단계 안에서 동시에 실행할 태스크 수
+    tool_budget: Optional[float] = None,         # 툴 호출별 예산(초), deadline.call_tool 사용
+) -> Dict[str, Dict[str, Any]]:
+    """
+    단계 순서대로 실행 (같은 단계의 태스크는 스레드 풀에서 동시에).
+    태스크 안의 툴은 execute_task 와 같이 순서대로 fn(context) 호출. 반환: {태스크: {툴: 출력}}
+    """
+    import contextvars
+
+    missing = [t for t in plan.steps if any(tool not in registry for tool in planner.tasks[t].get("tools", []) if tool)]
+    if missing:
+        raise RuntimeError(f"Tools not registered for tasks: {missing}")
+
+    def run_task(name: str) -> Dict[str, Any]:
+        outputs = {}
+        for tool_name in [u for u in planner.tasks[name].get("tools", []) if u]:
+            fn = registry[tool_name]
+            if tool_budget is not None:
+                from deadline import call_tool
+
+                out = call_tool(fn, context, budget=tool_budget)
+            else:
+                out = fn(context)
+            outputs[tool_name] = out
+            context[f"{tool_name}_output"] = out
+        return outputs
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task") as pool:
+        for stage in plan.stages:
+            # 현재 deadline scope 를 작업 스레드에도 전달
+            futures = {name: pool.submit(contextvars.copy_context().run, run_task, name) for name in stage}
+            for name, future in futures.items():
+                results[name] = future.result()
+                if current_state is not None:
+                    for p in sorted(planner.tasks[name].get("postconditions", [])):
+                        if p and p not in current_state:
+                            current_state.append(p)
+    return results
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    # testNonLLMTaskRunner.py 시나리오를 확장한 예시 온톨로지
+    tasks = [
+        {"name": "AssessRisk", "priority": 1, "preconditions": ["PortfolioUpdatedWithin7Days"],
+         "postconditions": ["RiskScoreUpdated"], "inputs": ["HoldingsData", "MarketVolatilityIndex"], "tools": ["VaR_Calculator"]},
+        {"name": "StressTest", "priority": 3, "preconditions": ["PortfolioUpdatedWithin7Days"],
+         "postconditions": ["StressScenariosEvaluated"], "inputs": ["HoldingsData"], "tools": ["VaR_Calculator"]},
+        {"name": "RebalancePortfolio", "priority": 2, "preconditions": ["RiskScoreUpdated"],
+         "postconditions": ["WeightsOptimized"], "inputs": ["HoldingsData"], "tools": ["OptimizationEngine"]},
+        {"name": "ManualReview", "priority": 50, "preconditions": [],
+         "postconditions": ["WeightsOptimized"], "inputs": ["AnalystNotes"], "tools": []},
+        {"name": "ReportToClient", "priority": 5, "preconditions": ["WeightsOptimized", "StressScenariosEvaluated"],
+         "postconditions": ["ClientReported"], "inputs": [], "tools": []},
+    ]
+    registry = {
+        "VaR_Calculator": lambda context: {"risk_score": 0.97, "method": "historical"},
+        "OptimizationEngine": lambda context: {"new_weights": {"SPY": 0.45, "IEF": 0.35, "GLD": 0.20}},
+    }
+    planner = TaskPlanner(tasks)
+    start = ["PortfolioUpdatedWithin7Days"]
+    inputs = ["HoldingsData", "MarketVolatilityIndex"]
+    plan = planner.plan(start, ["ClientReported"], inputs)
+    print(plan)
+    state = list(start)
+    execute_plan(planner, plan, {"portfolio_id": "A123"}, registry, current_state=state)
+    print("final state:", state)
+    try:
+        planner.plan(start, ["WeightsOptimized"], ["MarketVolatilityIndex"])
+    except GoalUnreachable as e:
+        print("GoalUnreachable:", e)
+
+    # 큰 합성 온톨로지: 계층형 조건 그래프 (층마다 여러 대안 태스크)
+    rng = random.Random(0)
+    layers, width = 10, 30
+    synthetic = []
+    for layer in range(layers):
+        for i in range(width):
+            pre = [f"C{layer - 1}_{rng.randrange(width)}"] if layer else ["Start"]
+            synthetic.append({
+                "name": f"T{layer}_{i}", "priority": rng.randint(1, 20), "preconditions": pre,
+                "postconditions": [f"C{layer}_{rng.randrange(width)}" for _ in range(rng.randint(1, 2))],
+            })
+    planner = TaskPlanner(synthetic)
+    goals = [[f"C{layers - 1}_{i}"] for i in range(width)]
+    for label in ("cold", "cached"):
+        begin = time.perf_counter()
+        found = 0
+        for goal in goals:
+            try:
+                planner.plan(["Start"], goal)
+                found += 1
+            except GoalUnreachable:
+                pass
+        elapsed = time.perf_counter() - begin
+        print(f"{label:<6}: {len(goals)} goals in {elapsed * 1000:.1f} ms ({found} reachable), {planner.stats()}")
@@ -3,6 +3,8 @@ from typing import List, Dict, Any, Optional, Tuple, Callable
 from neo4j import GraphDatabase
 from openai import OpenAI
 
+from deadline import Cancelled, DeadlineExceeded, call_tool, chat_completion, graph_query, scope
+
 # -----------------------------
 # 0) 환경설정
 # -----------------------------
@@ -13,6 +15,12 @@ NEO4J_PASS = "M-5hZ5h6Q197RrlzPBI4LaEoiblCblaXfM1ZtsfuRhE"
 OPENAI_MODEL = "gpt-4o-mini" # 필요시 변경
 client = OpenAI(api_key=api_key)
 
+# 마감 시간(초): 워크플로 전체 / 호출 1회. 호출은 워크플로에 남은 시간과 자기 예산 중 짧은 쪽 안에서만 실행
+WORKFLOW_BUDGET_S = 120
+LLM_BUDGET_S = 30
+GRAPH_BUDGET_S = 5
+TOOL_BUDGET_S = 10
+
 # 툴 레지스트리: Tool.name -> 파이썬 함수
 def VaR_Calculator(context: Dict[str, Any], **tool_args) -> Dict[str, Any]:
   print("[Tool] VaR_Calculator", tool_args)
@@ -59,8 +67,7 @@ class KGClient:
       tools: tools
       } AS task
       """
-      with self.driver.session() as s:
-        recs = s.run(q, state=current_state).data()
+      recs = graph_query(self.driver, q, {"state": current_state}, budget=GRAPH_BUDGET_S)
       return [r["task"] for r in recs]
 
 
@@ -117,7 +124,9 @@ def llm_choose_task(
     ),
   }
 
-  resp = client.chat.completions.create(
+  resp = chat_completion(
+    client,
+    budget=LLM_BUDGET_S,
     model=OPENAI_MODEL,
     temperature=0,
     response_format={"type": "json_object"},
@@ -191,7 +200,7 @@ def execute_task_with_plan(
     fn = TOOL_REGISTRY.get(tool_name)
     if fn is None:
       raise RuntimeError(f"Tool not registered: {tool_name}")
-    out = fn(context, **tool_args)
+    out = call_tool(fn, context, tool_args, budget=TOOL_BUDGET_S)
     tool_outputs[tool_name] = out
     # 결과를 컨텍스트에 축적
     context[f"{tool_name}_output"] = out
@@ -213,38 +222,44 @@ shared_context = {
 
 kg = KGClient(NEO4J_URI, NEO4J_USER, NEO4J_PASS)
 try:
-  for step in range(5):
-    runnable = kg.fetch_runnable_tasks(current_state)
-    if not runnable:
-      print("[Engine] No runnable tasks.")
-      break
-
-    # 1) LLM에 선택 요청
-    proposal = llm_choose_task(runnable, current_state, available_inputs, shared_context)
-    print(f"[LLM] Proposal: {json.dumps(proposal, ensure_ascii=False)}")
-
-    # 2) 온톨로지 제약으로 검증
-    validated = validate_llm_plan(proposal, runnable, current_state, available_inputs)
-
-    # 3) 실행
-    task = validated["task"]
-    plan = validated["tool_plan"]
-    print(f"[Engine] Execute Task: {task['name']} | Plan: {plan}")
-    outputs, new_posts = execute_task_with_plan(task, plan, shared_context)
-    print(f"[Engine] Tool outputs: {outputs}")
-    print(f"[Engine] New postconditions: {new_posts}")
-
-    # 4) 상태 갱신
-    for p in new_posts:
-      if p not in current_state:
-        current_state.append(p)
-
-    # 5) 간단한 종료 조건 예시
-    if "WeightsOptimized" in current_state:
-      print("[Engine] Terminal state reached.")
-      break
-
-  print("[Engine] Final state:", current_state)
+  with scope(WORKFLOW_BUDGET_S, name="workflow"):
+    for step in range(5):
+      runnable = kg.fetch_runnable_tasks(current_state)
+      if not runnable:
+        print("[Engine] No runnable tasks.")
+        break
+
+      # 1) LLM에 선택 요청
+      proposal = llm_choose_task(runnable, current_state, available_inputs, shared_context)
+      print(f"[LLM] Proposal: {json.dumps(proposal, ensure_ascii=False)}")
+
+      # 2) 온톨로지 제약으로 검증
+      validated = validate_llm_plan(proposal, runnable, current_state, available_inputs)
+
+      # 3) 실행
+      task = validated["task"]
+      plan = validated["tool_plan"]
+      print(f"[Engine] Execute Task: {task['name']} | Plan: {plan}")
+      outputs, new_posts = execute_task_with_plan(task, plan, shared_context)
+      print(f"[Engine] Tool outputs: {outputs}")
+      print(f"[Engine] New postconditions: {new_posts}")
+
+      # 4) 상태 갱신
+      for p in new_posts:
+        if p not in current_state:
+          current_state.append(p)
+
+      # 5) 간단한 종료 조건 예시
+      if "WeightsOptimized" in current_state:
+        print("[Engine] Terminal state reached.")
+        break
+
+    print("[Engine] Final state:", current_state)
+
+except (DeadlineExceeded, Cancelled) as e:
+  # 마감 시각 안에 끝나지 않은 워크플로는 멈춘 호출을 기다리지 않고 중단
+  print(f"[Engine] Workflow stopped: {type(e).__name__}: {e}")
+  print("[Engine] State so far:", current_state)
 
 finally:
   kg.close()
@@ -89,6 +89,11 @@ from neo4j import GraphDatabase
 import pandas as pd
 from tqdm import tqdm   # 진행 표시용 (선택)
 
+from deadline import graph_query, scope
+
+GRAPH_BUDGET_S = 5      # 조회 1회 마감 시간(초)
+REPORT_BUDGET_S = 30    # main() 전체 마감 시간(초)
+
 # ------------------- Neo4j 연결 ------------------------------
 # URI      = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 # USER     = os.getenv("NEO4J_USER", "neo4j")
@@ -123,8 +128,7 @@ def client_orders(client_id: str) -> pd.DataFrame:
            o.timestamp      AS ts
     ORDER BY ts DESC
     """
-    with driver.session() as s:
-        rows = s.execute_read(run_query, cypher, {"cid": client_id})
+    rows = graph_query(driver, cypher, {"cid": client_id}, budget=GRAPH_BUDGET_S)
     return pd.DataFrame(rows)
 
 
@@ -157,8 +161,7 @@ def compliance_violations() -> pd.DataFrame:
            s.symbol  AS violated_value,
            null      AS threshold
     """
-    with driver.session() as s:
-        rows = s.execute_read(run_query, cypher)
+    rows = graph_query(driver, cypher, budget=GRAPH_BUDGET_S)
     return pd.DataFrame(rows)
 
 
@@ -175,27 +178,28 @@ def market_exposure() -> pd.DataFrame:
     RETURN market, sector, total_value
     ORDER BY total_value DESC
     """
-    with driver.session() as s:
-        rows = s.execute_read(run_query, cypher)
+    rows = graph_query(driver, cypher, budget=GRAPH_BUDGET_S)
     return pd.DataFrame(rows)
 
 
 # ------------------- 메인 실행 흐름 -----------------------
 def main():
-    print("\n=== ① 클라이언트별 주문 현황 (IC001) ===")
-    df_client = client_orders('IC001')
-    print(df_client.head())
-
-    print("\n=== ② 현재 위반 중인 컴플라이언스 규칙 ===")
-    df_viol = compliance_violations()
-    if df_viol.empty:
-        print("⚡️ 위반 건이 없습니다.")
-    else:
-        print(df_viol)
-
-    print("\n=== ③ 마켓·섹터 노출도 ===")
-    df_market = market_exposure()
-    print(df_market)
+    # 세 조회가 모두 REPORT_BUDGET_S 안에서 끝나야 함 (각 조회는 GRAPH_BUDGET_S 와 남은 시간 중 짧은 쪽)
+    with scope(REPORT_BUDGET_S, name="report"):
+        print("\n=== ① 클라이언트별 주문 현황 (IC001) ===")
+        df_client = client_orders('IC001')
+        print(df_client.head())
+
+        print("\n=== ② 현재 위반 중인 컴플라이언스 규칙 ===")
+        df_viol = compliance_violations()
+        if df_viol.empty:
+            print("⚡️ 위반 건이 없습니다.")
+        else:
+            print(df_viol)
+
+        print("\n=== ③ 마켓·섹터 노출도 ===")
+        df_market = market_exposure()
+        print(df_market)
 
 # if __name__ == "__main__":
 main()
@@ -208,6 +212,12 @@ main()
 import os
 from datetime import datetime, timezone
 from neo4j import GraphDatabase
+from neo4j.exceptions import ClientError
+
+from deadline import graph_query, scope
+
+WORKFLOW_BUDGET_S = 10  # 주문 1건 (생성 → 검사 → 상태 변경) 마감 시간(초)
+CALL_BUDGET_S = 3       # 그래프 호출 1회 마감 시간(초)
 
 # --------------------------------------------------------------
 # ① Neo4j 연결
@@ -222,23 +232,14 @@ driver = GraphDatabase.driver(URI, auth=(USER, PASSWORD))
 # --------------------------------------------------------------
 # ② 헬퍼 (쓰기 / 읽기) – **결과를 즉시 리스트화**  
 # --------------------------------------------------------------
-def _run_write(cypher: str, params: dict | None = None) -> list[dict]:
-    """Write‑transaction → consume Result → return list of dicts."""
-    with driver.session() as s:
-        def tx_work(tx):
-            result = tx.run(cypher, params or {})
-            return [record.data() for record in result]   # ← 여기서 바로 소비
-        # Neo4j 5.x+ uses execute_write, older versions have write_transaction
-        return s.execute_write(tx_work) if hasattr(s, "execute_write") else s.write_transaction(tx_work)
+def _run_write(cypher: str, params: dict | None = None, retries: int = 0) -> list[dict]:
+    """Auto-commit write (서버 쪽 timeout = 남은 시간) → return list of dicts. 멱등인 쓰기만 retries 지정."""
+    return graph_query(driver, cypher, params, budget=CALL_BUDGET_S, write=True, retries=retries)
 
 
 def _run_read(cypher: str, params: dict | None = None) -> list[dict]:
-    """Read‑transaction → consume Result → return list of dicts."""
-    with driver.session() as s:
-        def tx_work(tx):
-            result = tx.run(cypher, params or {})
-            return [record.data() for record in result]
-        return s.execute_read(tx_work) if hasattr(s, "execute_read") else s.read_transaction(tx_work)
+    """Auto-commit read (서버 쪽 timeout = 남은 시간, 일시 오류는 남은 시간 안에서 재시도) → return list of dicts."""
+    return graph_query(driver, cypher, params, budget=CALL_BUDGET_S)
 
 
 # --------------------------------------------------------------
@@ -355,11 +356,13 @@ def update_order_status(order_id: str, new_status: str, comment: str | None = No
 
     params = {"oid": order_id, "status": new_status, "comment": comment}
     try:
-        # APOC 존재 여부와 관계없이 _run_write가 결과를 리스트화해 반환한다.
-        return _run_write(cypher_with_apoc, params)[0]
-    except Exception:
-        # APOC가 없거나 실행 중 오류가 난 경우 fallback 사용
-        return _run_write(cypher_fallback, {"oid": order_id, "status": new_status})[0]
+        # 같은 값을 다시 SET 하므로 멱등 → 일시 오류는 남은 시간 안에서 한 번 재시도
+        return _run_write(cypher_with_apoc, params, retries=1)[0]
+    except ClientError as e:
+        # APOC 가 설치되지 않은 경우에만 fallback (timeout / 그 밖의 오류는 그대로 전달)
+        if e.code != "Neo.ClientError.Procedure.ProcedureNotFound":
+            raise
+        return _run_write(cypher_fallback, {"oid": order_id, "status": new_status}, retries=1)[0]
 
 
 # --------------------------------------------------------------
@@ -372,23 +375,25 @@ def place_order_workflow(
     quantity: int,
     price: float,
 ) -> dict:
-    # ① 주문 생성
-    order_id = create_order(trader_id, stock_symbol, order_type, quantity, price)
-    print(f"✅ 주문 생성 – order_id={order_id}")
-
-    # ② 컴플라이언스 검사
-    violations = check_compliance(order_id)
-
-    # ③ 결과에 따라 상태 업데이트 & 반환값 구성
-    if violations:
-        reason = "; ".join(v["rule_name"] for v in violations)
-        update_order_status(order_id, "Rejected", comment=reason)
-        print(f"❌ 위반 – {reason}")
-        return {"order_id": order_id, "status": "Rejected", "violations": violations}
-    else:
-        update_order_status(order_id, "Accepted")
-        print("✅ 검증 통과 – Accepted")
-        return {"order_id": order_id, "status": "Accepted", "violations": []}
+    # 생성 → 검사 → 상태 변경 전체가 WORKFLOW_BUDGET_S 안에서 끝나야 함 (넘기면 DeadlineExceeded)
+    with scope(WORKFLOW_BUDGET_S, name="place-order"):
+        # ① 주문 생성
+        order_id = create_order(trader_id, stock_symbol, order_type, quantity, price)
+        print(f"✅ 주문 생성 – order_id={order_id}")
+
+        # ② 컴플라이언스 검사
+        violations = check_compliance(order_id)
+
+        # ③ 결과에 따라 상태 업데이트 & 반환값 구성
+        if violations:
+            reason = "; ".join(v["rule_name"] for v in violations)
+            update_order_status(order_id, "Rejected", comment=reason)
+            print(f"❌ 위반 – {reason}")
+            return {"order_id": order_id, "status": "Rejected", "violations": violations}
+        else:
+            update_order_status(order_id, "Accepted")
+            print("✅ 검증 통과 – Accepted")
+            return {"order_id": order_id, "status": "Accepted", "violations": []}
 
 
 # --------------------------------------------------------------
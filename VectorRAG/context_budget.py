@@ -0,0 +1,190 @@
+# pip install tiktoken langchain-core
+# --------------------------------------------------------------
+# context_budget.py
+#   검색된 청크를 LLM에 넣기 전에 정리하는 단계
+#     ① 같은 문서·같은 페이지의 인접 청크 병합
+#     ② 거의 같은 청크 제거
+#     ③ 점수가 높은 청크부터 토큰 예산(tiktoken 기준) 안에 담기
+# --------------------------------------------------------------
+from typing import Any, Dict, List, Optional, Tuple
+
+import tiktoken
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+SCORE_KEYS = ("hybrid_score", "score", "relevance_score")
+
+
+def _get_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def _shingles(text: str, n: int = 3) -> set:
+    t = "".join(text.split())
+    return {t[i:i + n] for i in range(max(len(t) - n + 1, 1))}
+
+
+def _containment(a: set, b: set) -> float:
+    """a 의 3-gram 중 b 에 포함된 비율 (짧은 청크가 병합된 긴 청크에 들어 있는 경우도 탐지)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a)
+
+
+def _overlap_len(left: str, right: str, max_overlap: int, min_overlap: int = 1) -> int:
+    """left 의 끝과 right 의 시작이 겹치는 길이 (chunk_overlap 으로 생긴 중복). min_overlap 미만이면 0."""
+    for n in range(min(max_overlap, len(left), len(right)), max(min_overlap, 1) - 1, -1):
+        if left.endswith(right[:n]):
+            return n
+    return 0
+
+
+class ContextBudgeter:
+    """
+    retriever 결과(관련도 순)를 받아 병합·중복 제거·토큰 패킹을 수행.
+    점수는 metadata 의 hybrid_score/score 를 사용하고, 없으면 검색 순위로 대신한다.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,          # 컨텍스트에 사용할 최대 토큰 수
+        model: str = "gpt-4o",
+        dedup_threshold: float = 0.8,    # 글자 3-gram 포함 비율이 이 이상이면 중복으로 간주
+        max_overlap: int = 50,           # 인접 청크 판단 시 확인할 최대 겹침 길이 (chunk_overlap 이상)
+        min_overlap: int = 3,            # 위치 정보가 없을 때 이보다 짧은 겹침은 우연으로 보고 병합하지 않음
+                                         # (chunk_overlap=10 분할기의 실제 겹침은 10자 미만이므로 그보다 작게)
+        separator: str = "\n",
+    ):
+        self.max_tokens = max_tokens
+        self.dedup_threshold = dedup_threshold
+        self.max_overlap = max_overlap
+        self.min_overlap = min_overlap
+        self.separator = separator
+        self.encoding = _get_encoding(model)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text))
+
+    def __call__(self, docs: List[Document]) -> List[Document]:
+        scored = [(self._score(doc, rank), rank, doc) for rank, doc in enumerate(docs)]
+        merged = self._merge_adjacent(scored)
+        unique = self._dedup(merged)
+        return self._pack(unique)
+
+    # ① 인접 청크 병합 -------------------------------------------
+    def _merge_adjacent(self, scored: List[Tuple[float, int, Document]]) -> List[Tuple[float, int, Document]]:
+        groups: Dict[Tuple[Any, Any], List[Tuple[float, int, Document]]] = {}
+        for item in scored:
+            meta = item[2].metadata
+            groups.setdefault((meta.get("source"), meta.get("page")), []).append(item)
+
+        out = []
+        for items in groups.values():
+            if all("start_index" in d.metadata for _, _, d in items):
+                # 위치 정보가 있으면 문서 순서로 정렬한 뒤 이웃끼리 병합
+                items.sort(key=lambda it: it[2].metadata["start_index"])
+                current = items[0]
+                for nxt in items[1:]:
+                    merged = self._merge(current, nxt)
+                    if merged is None:
+                        out.append(current)
+                        current = nxt
+                    else:
+                        current = merged
+                out.append(current)
+            else:
+                out.extend(self._chain(items))
+        return out
+
+    def _chain(self, items: List[Tuple[float, int, Document]]) -> List[Tuple[float, int, Document]]:
+        """위치 정보가 없으면 검색 순서와 무관하게 앞뒤로 겹치는 청크를 찾아 이어 붙임."""
+        remaining = list(items)
+        out = []
+        while remaining:
+            current = remaining.pop(0)
+            extended = True
+            while extended:
+                extended = False
+                for i, other in enumerate(remaining):
+                    merged = self._merge(current, other) or self._merge(other, current)
+                    if merged is not None:
+                        current = merged
+                        del remaining[i]
+                        extended = True
+                        break
+            out.append(current)
+        return out
+
+    def _merge(
+        self, left: Tuple[float, int, Document], right: Tuple[float, int, Document]
+    ) -> Optional[Tuple[float, int, Document]]:
+        joined = self._join(left[2], right[2])
+        if joined is None:
+            return None
+        return (max(left[0], right[0]), min(left[1], right[1]), joined)
+
+    def _join(self, left: Document, right: Document) -> Optional[Document]:
+        a, b = left.page_content, right.page_content
+        if "start_index" in left.metadata and "start_index" in right.metadata:
+            # 위치 정보가 있으면 범위가 붙어 있거나 겹칠 때만 병합
+            a_end = left.metadata["start_index"] + len(a)
+            gap = right.metadata["start_index"] - a_end
+            if gap > len(self.separator):
+                return None
+            overlap = max(-gap, 0)
+            text = a + (b[overlap:] if overlap else self.separator + b)
+        else:
+            overlap = _overlap_len(a, b, self.max_overlap, self.min_overlap)
+            if overlap == 0:
+                return None
+            text = a + b[overlap:]
+        return Document(page_content=text, metadata=dict(left.metadata))
+
+    # ② 중복 제거 ------------------------------------------------
+    def _dedup(self, items: List[Tuple[float, int, Document]]) -> List[Tuple[float, int, Document]]:
+        kept: List[Tuple[float, int, Document]] = []
+        kept_shingles: List[set] = []
+        for item in sorted(items, key=lambda it: (-it[0], it[1])):
+            sh = _shingles(item[2].page_content)
+            if any(_containment(sh, other) >= self.dedup_threshold for other in kept_shingles):
+                continue
+            kept.append(item)
+            kept_shingles.append(sh)
+        return kept
+
+    # ③ 토큰 예산 패킹 -------------------------------------------
+    def _pack(self, items: List[Tuple[float, int, Document]]) -> List[Document]:
+        budget = self.max_tokens
+        sep_tokens = self.count_tokens(self.separator)
+        chosen = []
+        for score, rank, doc in items:  # 점수 내림차순
+            cost = self.count_tokens(doc.page_content) + sep_tokens
+            if cost <= budget:
+                chosen.append((rank, doc))
+                budget -= cost
+        # 원래 검색 순서대로 돌려줌
+        return [doc for _, doc in sorted(chosen, key=lambda it: it[0])]
+
+    @staticmethod
+    def _score(doc: Document, rank: int) -> float:
+        for key in SCORE_KEYS:
+            if key in doc.metadata:
+                return float(doc.metadata[key])
+        return 1.0 / (rank + 1)
+
+
+class BudgetedRetriever(BaseRetriever):
+    """기존 retriever 결과에 ContextBudgeter 를 적용하는 래퍼."""
+
+    retriever: BaseRetriever
+    budgeter: ContextBudgeter
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        docs = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return self.budgeter(docs)
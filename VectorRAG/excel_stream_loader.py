@@ -0,0 +1,191 @@
+# pip install openpyxl langchain-core
+# --------------------------------------------------------------
+# excel_stream_loader.py
+#   대용량 엑셀(.xlsx) 스트리밍 로더 (pd.ExcelFile(...).parse + df.values.ravel() 대체)
+#     - openpyxl read_only 모드로 행을 하나씩 읽음 → 통합 문서 크기와 무관하게 메모리 일정
+#       (단, 엑셀의 공유 문자열 표는 openpyxl 이 한 번에 읽으므로 고유 문자열 수만큼은 메모리 사용)
+#     - 각 행을 "열 이름: 값" 형태로 기록해 헤더 정보 유지
+#     - 여러 행을 묶은 청크(행 그룹) 단위로 Document 생성, metadata 에 시트 이름 / 행 번호
+# --------------------------------------------------------------
+import datetime
+import os
+from typing import Any, Iterator, List, Optional, Sequence
+
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def _header(values: Sequence[Any]) -> List[str]:
+    # 빈 열 이름은 "열{번호}", 중복 열 이름은 "_2", "_3" 을 붙여 구분
+    names, seen = [], {}
+    for i, value in enumerate(values, start=1):
+        name = _format(value) if value is not None else ""
+        name = name or f"열{i}"
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return names
+
+
+class ExcelStreamLoader(BaseLoader):
+    """
+    loader = ExcelStreamLoader("d:/data/files/car_reviews.xlsx", rows_per_chunk=20)
+    for doc in loader.lazy_load():   # 행 그룹 하나씩 생성 (전체를 메모리에 올리지 않음)
+        ...
+    doc.page_content  # "제조사: 폴스타 | 모델: 폴스타 2 | 리뷰: 소음이 거의 없어 ... | 평점: 1.8\n..."
+    doc.metadata      # {"source", "sheet", "row_start", "row_end", "columns"}
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sheet_names: Optional[Sequence[str]] = None,   # None 이면 모든 시트
+        rows_per_chunk: int = 20,                      # 청크 하나에 넣을 최대 행 수
+        max_chars: int = 2000,                         # 청크 최대 글자 수 (초과 전 새 청크 시작)
+        columns: Optional[Sequence[str]] = None,       # 지정하면 해당 열만 사용 (예: ["모델", "리뷰"])
+        skip_empty: bool = True,                       # 값이 비어 있는 셀은 "열: " 로 기록하지 않음
+        separator: str = " | ",
+    ):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in (".xlsx", ".xlsm"):
+            raise ValueError(f"Unsupported spreadsheet format '{ext}'. Save the file as .xlsx first.")
+        self.path = path
+        self.sheet_names = list(sheet_names) if sheet_names else None
+        self.rows_per_chunk = rows_per_chunk
+        self.max_chars = max_chars
+        self.columns = list(columns) if columns else None
+        self.skip_empty = skip_empty
+        self.separator = separator
+
+    def _row_text(self, header: List[str], values: Sequence[Any], keep: List[int]) -> str:
+        cells = []
+        for i in keep:
+            value = values[i] if i < len(values) else None
+            text = _format(value) if value is not None else ""
+            if text or not self.skip_empty:
+                cells.append(f"{header[i]}: {text}")
+        return self.separator.join(cells)
+
+    def _chunk(self, sheet: str, header: List[str], keep: List[int], lines: List[str], rows: List[int]) -> Document:
+        return Document(
+            page_content="\n".join(lines),
+            metadata={
+                "source": self.path,
+                "sheet": sheet,
+                "row_start": rows[0],                   # 엑셀 행 번호 (1부터, 헤더 포함)
+                "row_end": rows[-1],
+                "columns": ", ".join(header[i] for i in keep),
+            },
+        )
+
+    def _iter_sheet(self, ws: Any) -> Iterator[Document]:
+        rows = ws.iter_rows(values_only=True)
+        header: Optional[List[str]] = None
+        keep: List[int] = []
+        lines: List[str] = []
+        row_numbers: List[int] = []
+        size = 0
+        for row_number, values in enumerate(rows, start=1):
+            if not any(v is not None and str(v).strip() for v in values):
+                continue
+            if header is None:
+                # 처음 나오는 비어 있지 않은 행을 헤더로 사용
+                header = _header(values)
+                keep = [i for i, name in enumerate(header) if self.columns is None or name in self.columns]
+                continue
+            line = self._row_text(header, values, keep)
+            if not line:
+                continue
+            if lines and (len(lines) >= self.rows_per_chunk or size + len(line) + 1 > self.max_chars):
+                yield self._chunk(ws.title, header, keep, lines, row_numbers)
+                lines, row_numbers, size = [], [], 0
+            lines.append(line)
+            row_numbers.append(row_number)
+            size += len(line) + 1
+        if lines:
+            yield self._chunk(ws.title, header, keep, lines, row_numbers)
+
+    def lazy_load(self) -> Iterator[Document]:
+        import openpyxl
+
+        # read_only: 시트 XML 을 스트리밍으로 읽음 / data_only: 수식 대신 저장된 결괏값
+        wb = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                if self.sheet_names and ws.title not in self.sheet_names:
+                    continue
+                if not hasattr(ws, "iter_rows"):   # 차트 시트 등
+                    continue
+                yield from self._iter_sheet(ws)
+        finally:
+            wb.close()   # read_only 모드는 파일 핸들을 직접 닫아야 함
+
+
+def stream_excel_folder(folder: str, **kwargs: Any) -> Iterator[Document]:
+    """폴더(하위 폴더 포함)의 모든 .xlsx / .xlsm 파일을 차례로 스트리밍."""
+    for subdir, _, files in os.walk(folder):
+        for file in sorted(files):
+            if os.path.splitext(file)[1].lower() in (".xlsx", ".xlsm") and not file.startswith("~$"):
+                path = os.path.join(subdir, file)
+                try:
+                    yield from ExcelStreamLoader(path, **kwargs).lazy_load()
+                except Exception as e:
+                    print(f"Error processing file {path}. Error: {e}")
+
+
+if __name__ == "__main__":
+    # 큰 통합 문서를 만들어 pandas 방식과 메모리 사용량 비교
+    import sys
+    import tempfile
+    import time
+    import tracemalloc
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    for doc in ExcelStreamLoader(os.path.join(here, "files", "car_reviews.xlsx"), rows_per_chunk=3).lazy_load():
+        print(doc.metadata, "\n" + doc.page_content)
+        break
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    import openpyxl
+
+    path = os.path.join(tempfile.mkdtemp(), "big.xlsx")
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("reviews")
+    ws.append(["제조사", "모델", "리뷰", "평점"])
+    for i in range(n_rows):
+        ws.append([f"제조사{i % 50}", f"모델{i % 700}", f"리뷰 내용 {i} 주행감이 좋고 조용합니다.", (i % 50) / 10])
+    wb.save(path)
+    print(f"\n{n_rows:,} rows, {os.path.getsize(path) / 2**20:.1f} MB xlsx")
+
+    def measure(fn: Any) -> Any:
+        # 시간은 tracemalloc 없이, 최대 메모리는 tracemalloc 으로 따로 측정
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, elapsed, peak / 2**20
+
+    chunks, elapsed, peak = measure(lambda: sum(1 for _ in ExcelStreamLoader(path, rows_per_chunk=20).lazy_load()))
+    print(f"stream : {elapsed:.1f}s, {chunks:,} chunks, peak {peak:.1f} MB")
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        def pandas_load() -> str:
+            xls = pd.ExcelFile(path)
+            return "\n".join("\n".join(map(str, xls.parse(s).values.ravel())) for s in xls.sheet_names)
+
+        text, elapsed, peak = measure(pandas_load)
+        print(f"pandas : {elapsed:.1f}s, {len(text):,} chars, peak {peak:.1f} MB")
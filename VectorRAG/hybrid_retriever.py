@@ -0,0 +1,242 @@
+# pip install langchain-core
+# --------------------------------------------------------------
+# hybrid_retriever.py
+#   BM25(키워드) + 벡터 검색을 RRF(Reciprocal Rank Fusion)로 결합하는 리트리버
+# --------------------------------------------------------------
+import math
+import re
+import heapq
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+
+# -----------------------------
+# 1) 토크나이저
+# -----------------------------
+_TOKEN_RE = re.compile(r"[0-9A-Za-z]+|[가-힣]+")
+_HANGUL_RE = re.compile(r"[가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어/영문 혼합 텍스트를 BM25용 토큰으로 분리.
+    한글 어절은 조사가 붙어 있으므로("아반떼의") 어절 자체와 글자 bigram을 함께 사용.
+    """
+    tokens: List[str] = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        tokens.append(word)
+        if _HANGUL_RE.fullmatch(word) and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+# -----------------------------
+# 2) 배열 기반 역색인 (BM25)
+# -----------------------------
+class InvertedIndex:
+    """
+    term -> (문서번호 배열, 빈도 배열) 형태로 postings 를 저장하는 압축 역색인.
+    문서번호는 추가 순서대로 증가하므로 postings 는 항상 정렬된 상태로 유지된다.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocab: Dict[str, int] = {}
+        self._doc_ids: List[array] = []   # term_id -> array('I') 문서번호
+        self._tfs: List[array] = []       # term_id -> array('H') 단어 빈도
+        self._doc_len = array("I")        # 문서번호 -> 토큰 수
+        self._deleted: set = set()
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_len) - len(self._deleted)
+
+    def add(self, text: str) -> int:
+        """문서를 색인하고 부여된 문서번호를 반환."""
+        doc_id = len(self._doc_len)
+        counts: Dict[str, int] = {}
+        tokens = tokenize(text)
+        for tok in tokens:
+            counts[tok] = counts.get(tok, 0) + 1
+
+        for tok, tf in counts.items():
+            term_id = self.vocab.get(tok)
+            if term_id is None:
+                term_id = len(self._doc_ids)
+                self.vocab[tok] = term_id
+                self._doc_ids.append(array("I"))
+                self._tfs.append(array("H"))
+            self._doc_ids[term_id].append(doc_id)
+            self._tfs[term_id].append(min(tf, 0xFFFF))
+
+        self._doc_len.append(len(tokens))
+        self._total_len += len(tokens)
+        return doc_id
+
+    def delete(self, doc_id: int) -> None:
+        """문서를 삭제 표시(tombstone). postings 는 그대로 두고 검색에서 제외."""
+        if doc_id < len(self._doc_len) and doc_id not in self._deleted:
+            self._deleted.add(doc_id)
+            self._total_len -= self._doc_len[doc_id]
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """BM25 점수 상위 k개의 (문서번호, 점수) 반환."""
+        n_docs = len(self)
+        if n_docs == 0:
+            return []
+        avgdl = self._total_len / n_docs or 1.0
+        k1, b = self.k1, self.b
+
+        scores: Dict[int, float] = {}
+        for tok in set(tokenize(query)):
+            term_id = self.vocab.get(tok)
+            if term_id is None:
+                continue
+            doc_ids, tfs = self._doc_ids[term_id], self._tfs[term_id]
+            df = len(doc_ids)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in zip(doc_ids, tfs):
+                if doc_id in self._deleted:
+                    continue
+                norm = k1 * (1.0 - b + b * self._doc_len[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+# -----------------------------
+# 3) RRF 결합
+# -----------------------------
+def reciprocal_rank_fusion(
+    rankings: Iterable[List[str]],
+    weights: Optional[List[float]] = None,
+    rrf_k: int = 60,
+) -> List[Tuple[str, float]]:
+    """여러 순위 목록(문서 키 리스트)을 RRF 점수로 결합해 내림차순 반환."""
+    fused: Dict[str, float] = {}
+    for i, ranking in enumerate(rankings):
+        w = weights[i] if weights else 1.0
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + w / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def _doc_key(doc: Document) -> str:
+    # 벡터 저장소 결과와 역색인 결과를 같은 청크로 맞추기 위한 키
+    chunk_id = doc.metadata.get("chunk_id")
+    return str(chunk_id) if chunk_id is not None else doc.page_content
+
+
+# -----------------------------
+# 4) 하이브리드 리트리버
+# -----------------------------
+class HybridRetriever(BaseRetriever):
+    """
+    벡터 저장소(FAISS, Chroma 등)와 BM25 역색인을 함께 조회하고 RRF로 결합.
+    RetrievalQA.from_chain_type(retriever=...) 에 그대로 전달할 수 있다.
+    """
+
+    vectorstore: VectorStore
+    index: InvertedIndex
+    documents: List[Document]
+    k: int = 4                   # 최종 반환 문서 수
+    fetch_k: int = 20            # 각 검색기에서 가져올 후보 수
+    rrf_k: int = 60
+    dense_weight: float = 1.0
+    lexical_weight: float = 1.0
+    key_to_doc_id: Dict[str, int] = {}
+
+    @classmethod
+    def from_vectorstore(
+        cls,
+        vectorstore: VectorStore,
+        documents: List[Document],
+        **kwargs: Any,
+    ) -> "HybridRetriever":
+        """이미 documents 로 만들어진 벡터 저장소에 역색인만 추가로 구성."""
+        retriever = cls(vectorstore=vectorstore, index=InvertedIndex(), documents=[], **kwargs)
+        retriever._index_documents(documents)
+        return retriever
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: List[Document],
+        embedding: Any,
+        vectorstore_cls: Any,
+        **kwargs: Any,
+    ) -> "HybridRetriever":
+        """벡터 저장소와 역색인을 같은 청크로 동시에 생성. (예: vectorstore_cls=FAISS)"""
+        documents = _with_chunk_ids(documents, start=0)
+        vectorstore = vectorstore_cls.from_documents(documents, embedding)
+        return cls.from_vectorstore(vectorstore, documents, **kwargs)
+
+    def add_documents(self, documents: List[Document]) -> List[str]:
+        """새 청크를 벡터 저장소와 역색인에 함께 추가 (증분 업데이트)."""
+        documents = _with_chunk_ids(documents, start=len(self.documents))
+        ids = [d.metadata["chunk_id"] for d in documents]
+        self.vectorstore.add_documents(documents, ids=ids)
+        self._index_documents(documents)
+        return ids
+
+    def delete(self, ids: List[str]) -> None:
+        """chunk_id 로 청크를 벡터 저장소와 역색인에서 함께 삭제."""
+        self.vectorstore.delete(ids)
+        for chunk_id in ids:
+            doc_id = self.key_to_doc_id.pop(str(chunk_id), None)
+            if doc_id is not None:
+                self.index.delete(doc_id)
+
+    def _index_documents(self, documents: List[Document]) -> None:
+        for doc in documents:
+            doc_id = self.index.add(doc.page_content)
+            self.documents.append(doc)
+            self.key_to_doc_id[_doc_key(doc)] = doc_id
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        dense_docs = self.vectorstore.similarity_search(query, k=self.fetch_k)
+        lexical_hits = self.index.search(query, k=self.fetch_k)
+
+        by_key: Dict[str, Document] = {}
+        dense_rank = []
+        for doc in dense_docs:
+            key = _doc_key(doc)
+            by_key.setdefault(key, doc)
+            dense_rank.append(key)
+        lexical_rank = []
+        for doc_id, _ in lexical_hits:
+            doc = self.documents[doc_id]
+            key = _doc_key(doc)
+            by_key.setdefault(key, doc)
+            lexical_rank.append(key)
+
+        fused = reciprocal_rank_fusion(
+            [dense_rank, lexical_rank],
+            weights=[self.dense_weight, self.lexical_weight],
+            rrf_k=self.rrf_k,
+        )
+        results = []
+        for key, score in fused[: self.k]:
+            doc = by_key[key]
+            results.append(
+                Document(page_content=doc.page_content, metadata={**doc.metadata, "hybrid_score": score})
+            )
+        return results
+
+
+def _with_chunk_ids(documents: List[Document], start: int) -> List[Document]:
+    # chunk_id 가 없는 문서에는 순번 기반 id 부여 (벡터 저장소 id 로도 사용)
+    out = []
+    for i, doc in enumerate(documents, start=start):
+        if "chunk_id" in doc.metadata:
+            out.append(doc)
+        else:
+            out.append(Document(page_content=doc.page_content, metadata={**doc.metadata, "chunk_id": str(i)}))
+    return out
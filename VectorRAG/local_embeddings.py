@@ -0,0 +1,150 @@
+# pip install sentence-transformers langchain-core
+# --------------------------------------------------------------
+# local_embeddings.py
+#   네트워크 없이 CPU 에서 동작하는 임베딩 (OpenAIEmbeddings 대체)
+#     - sentence-transformers 모델을 로컬에서 실행 (한 번 내려받은 뒤에는 오프라인)
+#     - 배치 추론 + 스레드 수 지정, 선택적으로 int8 동적 양자화
+#     - 같은 질의는 LRU 캐시에서 바로 반환
+#   FAISS.from_texts(texts, LocalEmbeddings()) / FAISS.load_local(path, LocalEmbeddings(), ...) 처럼
+#   OpenAIEmbeddings() 자리에 그대로 사용
+# --------------------------------------------------------------
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+# 한국어를 지원하는 작은 다국어 모델 (384차원)
+DEFAULT_MODEL = "intfloat/multilingual-e5-small"
+
+
+class LocalEmbeddings(Embeddings):
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,   # 허브 모델 이름 또는 로컬 폴더 경로
+        batch_size: int = 32,
+        num_threads: Optional[int] = None, # 지정하면 torch 연산 스레드 수 설정 (프로세스 전체에 적용), None 이면 torch 기본값
+        quantize: bool = False,            # True 이면 Linear 층을 int8 로 동적 양자화 (CPU 추론 가속)
+        normalize: bool = True,            # 코사인 유사도용 L2 정규화
+        query_prefix: Optional[str] = None,
+        passage_prefix: Optional[str] = None,
+        cache_folder: Optional[str] = None,
+        offline: bool = True,              # True 이면 허브에 접속하지 않고 로컬 캐시만 사용
+        query_cache_size: int = 1024,
+    ):
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(
+                "Could not import sentence_transformers. "
+                "Please install it with `pip install sentence-transformers`."
+            )
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.normalize = normalize
+        # e5 계열은 질의/문서 앞에 접두어를 붙여야 성능이 나옴
+        is_e5 = "e5" in model_name.lower()
+        self.query_prefix = query_prefix if query_prefix is not None else ("query: " if is_e5 else "")
+        self.passage_prefix = passage_prefix if passage_prefix is not None else ("passage: " if is_e5 else "")
+
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+        # HF_HUB_OFFLINE 환경 변수는 huggingface_hub import 시점에만 읽히므로 호출 단위 옵션 사용
+        self.model = SentenceTransformer(
+            model_name, device="cpu", cache_folder=cache_folder, local_files_only=offline and not os.path.isdir(model_name)
+        )
+        if quantize:
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model.eval()
+
+        self._lock = threading.Lock()   # 모델 하나를 여러 스레드가 동시에 호출하지 않도록
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.query_cache_size = query_cache_size
+
+    @property
+    def dimensions(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            vectors = self.model.encode(
+                texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=self.normalize,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        return vectors.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode([self.passage_prefix + t for t in texts])
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._lock:
+            cached = self._query_cache.get(text)
+            if cached is not None:
+                self._query_cache.move_to_end(text)
+                return cached
+        vector = self._encode([self.query_prefix + text])[0]
+        with self._lock:
+            self._query_cache[text] = vector
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 질의를 한 번의 배치 추론으로 임베딩 (질의 서비스의 마이크로 배치용)."""
+        return self._encode([self.query_prefix + t for t in texts])
+
+
+class HashEmbeddings(Embeddings):
+    """
+    테스트용 결정적 임베딩 (모델·네트워크 없음).
+    글자 2-gram 을 해시해 dim 차원에 누적 후 정규화 → 글자가 많이 겹치는 문장끼리 가까움.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        text = " ".join(text.split())
+        for i in range(max(len(text) - 1, 1)):
+            h = hashlib.blake2b(text[i:i + 2].encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(h[:4], "little") % self.dim] += 1.0 if h[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def get_embeddings(backend: str = "local", **kwargs: Any) -> Embeddings:
+    """
+    노트북에서 임베딩 백엔드를 한 줄로 교체하기 위한 함수.
+      "local"  : LocalEmbeddings (CPU, 오프라인)
+      "ollama" : OllamaEmbeddings (로컬 Ollama 서버, 예: model="bge-m3")
+      "openai" : OpenAIEmbeddings (네트워크 필요)
+      "stub"   : HashEmbeddings (테스트용, 의미 없는 결정적 벡터)
+    """
+    if backend == "local":
+        return LocalEmbeddings(**kwargs)
+    if backend == "ollama":
+        from langchain_ollama import OllamaEmbeddings
+
+        return OllamaEmbeddings(**{"model": "bge-m3", **kwargs})
+    if backend == "openai":
+        from langchain_openai import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(**kwargs)
+    if backend == "stub":
+        return HashEmbeddings(**kwargs)
+    raise ValueError(f"Unknown embedding backend: {backend}")
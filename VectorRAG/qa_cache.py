@@ -0,0 +1,177 @@
+# pip install numpy langchain-core
+# --------------------------------------------------------------
+# qa_cache.py
+#   RetrievalQA 체인용 2단계 답변 캐시
+#     1단계: 정규화된 질문 문자열 완전 일치
+#     2단계: 질문 임베딩 코사인 유사도 기반 유사 질문 일치
+# --------------------------------------------------------------
+import re
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+_SPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.。？！~]+$")
+
+
+def normalize_query(query: str) -> str:
+    """공백/대소문자/끝 문장부호 차이를 제거한 캐시 키 생성."""
+    q = unicodedata.normalize("NFKC", query).lower().strip()
+    q = _TRAILING_PUNCT_RE.sub("", q)
+    return _SPACE_RE.sub(" ", q)
+
+
+# -----------------------------
+# 1) 2단계 캐시
+# -----------------------------
+class QACache:
+    """
+    TTL + LRU 방식의 2단계 캐시.
+    embeddings 를 주지 않으면 1단계(완전 일치)만 사용한다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any = None,          # OpenAIEmbeddings 등 embed_query 를 가진 객체
+        threshold: float = 0.92,         # 2단계 채택 기준 코사인 유사도
+        ttl: float = 3600.0,             # 항목 유효 시간(초)
+        max_entries: int = 1000,
+    ):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._exact: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._semantic: "OrderedDict[str, Tuple[float, np.ndarray, Any]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None   # 2단계 검색용 임베딩 행렬 (지연 생성)
+        self._matrix_keys: list = []
+        self._lock = threading.Lock()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def get(self, query: str) -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """
+        (캐시된 값 또는 None, 질문 임베딩) 반환.
+        임베딩은 미스일 때 put() 에 다시 넘겨 중복 계산을 피한다.
+        """
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            hit = self._exact.get(key)
+            if hit is not None:
+                if now - hit[0] <= self.ttl:
+                    self._exact.move_to_end(key)
+                    self.stats["exact_hits"] += 1
+                    return hit[1], None
+                del self._exact[key]
+
+        if self.embeddings is None:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None, None
+
+        vec = _unit(self.embeddings.embed_query(key))
+        with self._lock:
+            self._evict_expired(now)
+            if self._semantic:
+                if self._matrix is None:
+                    self._matrix_keys = list(self._semantic)
+                    self._matrix = np.stack([self._semantic[k][1] for k in self._matrix_keys])
+                sims = self._matrix @ vec
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    best_key = self._matrix_keys[best]
+                    self._semantic.move_to_end(best_key)
+                    self.stats["semantic_hits"] += 1
+                    return self._semantic[best_key][2], vec
+            self.stats["misses"] += 1
+        return None, vec
+
+    def put(self, query: str, value: Any, vec: Optional[np.ndarray] = None) -> None:
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            self._exact[key] = (now, value)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.max_entries:
+                self._exact.popitem(last=False)
+
+            if self.embeddings is None:
+                return
+        if vec is None:
+            vec = _unit(self.embeddings.embed_query(key))
+        with self._lock:
+            self._semantic[key] = (now, vec, value)
+            self._semantic.move_to_end(key)
+            while len(self._semantic) > self.max_entries:
+                self._semantic.popitem(last=False)
+            self._matrix = None
+
+    def invalidate(self) -> None:
+        """인덱스가 바뀌었을 때 모든 캐시 항목 삭제."""
+        with self._lock:
+            self._exact.clear()
+            self._semantic.clear()
+            self._matrix = None
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [k for k, (ts, _, _) in self._semantic.items() if now - ts > self.ttl]
+        for k in expired:
+            del self._semantic[k]
+        if expired:
+            self._matrix = None
+
+
+def _unit(vec) -> np.ndarray:
+    v = np.asarray(vec, dtype=np.float32)
+    n = np.linalg.norm(v)
+    return v / n if n else v
+
+
+# -----------------------------
+# 2) RetrievalQA 래퍼
+# -----------------------------
+class CachedRetrievalQA:
+    """
+    qa_chain.invoke(...) 앞단에 QACache 를 두는 래퍼.
+    index_version 함수의 반환값이 바뀌면(문서 추가/삭제 등) 캐시를 비운다.
+    """
+
+    def __init__(
+        self,
+        chain: Any,
+        cache: QACache,
+        index_version: Optional[Callable[[], Any]] = None,
+    ):
+        self.chain = chain
+        self.cache = cache
+        self.index_version = index_version
+        self._version = index_version() if index_version else None
+
+    def invoke(self, inputs: Any, **kwargs: Any) -> Any:
+        query = inputs["query"] if isinstance(inputs, dict) else inputs
+        self._check_version()
+
+        cached, vec = self.cache.get(query)
+        if cached is not None:
+            # 유사 질문으로 찾은 경우에도 현재 질문을 그대로 돌려준다
+            return {**cached, "query": query} if isinstance(cached, dict) else cached
+
+        result = self.chain.invoke(inputs, **kwargs)
+        self.cache.put(query, result, vec)
+        return result
+
+    def _check_version(self) -> None:
+        if self.index_version is None:
+            return
+        current = self.index_version()
+        if current != self._version:
+            self.cache.invalidate()
+            self._version = current
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.cache.stats)
@@ -0,0 +1,295 @@
+# pip install faiss-cpu numpy langchain-community
+# --------------------------------------------------------------
+# quantized_index.py
+#   대용량 코퍼스용 압축 FAISS 인덱스 (FAISS.from_texts 의 Flat 인덱스 대체)
+#     - IVF / HNSW + PQ(곱 양자화) / SQ(스칼라 양자화) 인덱스를 학습 후 구축
+#     - PQ 인덱스는 후보를 넉넉히 찾은 뒤 SQ8 벡터로 재순위 (IndexRefine, 원본 float32 재순위는 Flat 보다 커짐)
+#     - 학습 데이터가 부족한 작은 코퍼스는 Flat / SQ8 로 대체
+#     - Flat 인덱스 대비 recall@k / 지연 시간 / 메모리 리포트
+#   결과는 langchain FAISS 벡터 저장소이므로 as_retriever(), save_local(), load_local() 그대로 사용
+#
+#   1536차원 OpenAI 임베딩 기준 청크당 메모리: Flat 6,144B / SQ8 1,536B / PQ384 384B (+ SQ8 재순위 1,536B)
+# --------------------------------------------------------------
+import math
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+def _faiss():
+    try:
+        import faiss
+    except ImportError:
+        raise ImportError("Could not import faiss. Please install it with `pip install faiss-cpu`.")
+    return faiss
+
+
+MIN_POINTS_PER_CENTROID = 39   # faiss k-means 가 클러스터당 요구하는 최소 학습 벡터 수
+TINY_CORPUS = 39 * 16          # 이보다 작으면 IVF 를 만들 수 없으므로 Flat 사용
+
+
+# -----------------------------
+# 1) 인덱스 구성
+# -----------------------------
+def min_train_size(factory: str) -> int:
+    """index_factory 문자열이 학습에 필요로 하는 최소 벡터 수 (IVF: 39·nlist, PQ/nbits: 2^nbits)."""
+    needed = 0
+    m = re.search(r"IVF(\d+)", factory)
+    if m:
+        needed = max(needed, MIN_POINTS_PER_CENTROID * int(m.group(1)))
+    m = re.search(r"PQ\d+(?:x(\d+))?", factory)
+    if m:
+        needed = max(needed, 2 ** int(m.group(1) or 8))
+    return needed
+
+
+def suggest_factory(n_vectors: int, dim: int, kind: str = "ivfsq") -> str:
+    """
+    데이터 규모에 맞는 faiss index_factory 문자열.
+      ivfsq  : IVF + 8bit 스칼라 양자화 (메모리 1/4, 재순위 없이도 높은 recall) - 기본값
+      ivfpq  : 가장 작은 메모리 (수천만 건), 코드가 거칠어 SQ8 재순위(refine="auto")와 함께 사용
+      hnswsq : HNSW + 8bit 스칼라 양자화 (학습 데이터가 적게 필요, 빠른 검색, 메모리는 더 사용)
+    벡터가 TINY_CORPUS 개 미만이면 IVF 를 학습할 수 없으므로 "Flat".
+    """
+    if n_vectors < TINY_CORPUS and kind != "hnswsq":
+        return "Flat"
+    # 클러스터 수 ≈ 4·√N (2의 거듭제곱), 클러스터당 최소 39개 학습 벡터가 필요하므로 상한 적용
+    nlist = 2 ** max(4, round(math.log2(4 * math.sqrt(max(n_vectors, 1)))))
+    nlist = max(16, min(nlist, n_vectors // 39 or 16))
+    if kind == "ivfpq":
+        # 서브벡터 하나가 4차원이 되도록 m 선택 (dim 의 약수). 8~16차원으로 나누면 재순위를 해도 recall@10 이 0.5 안팎
+        m = next((m for m in (dim // 4, dim // 2, dim // 8) if m and dim % m == 0), dim)
+        return f"IVF{nlist},PQ{m}x8"
+    if kind == "ivfsq":
+        return f"IVF{nlist},SQ8"
+    if kind == "hnswsq":
+        return "HNSW32,SQ8"
+    raise ValueError(f"Unknown index kind: {kind}")
+
+
+def _refine_for(factory: str, refine: Optional[str]) -> Optional[str]:
+    # "auto": PQ 코드만 SQ8 로 재순위 (SQ8/Flat 은 이미 충분히 정확하고, 재순위 벡터는 코드보다 큼)
+    if factory == "Flat":
+        return None
+    if refine == "auto":
+        return "SQ8" if "PQ" in factory else None
+    return refine
+
+
+def train_index(
+    vectors: np.ndarray,
+    factory: Optional[str] = None,
+    refine: Optional[str] = "auto",       # 재순위용 벡터: "auto" | "SQ8"(원본의 1/4) | "Flat"(원본 float32, Flat 보다 커짐) | None
+    train_size: int = 100_000,            # 학습에 사용할 최대 벡터 수 (무작위 추출)
+    seed: int = 0,
+    n_total: Optional[int] = None,        # 전체 벡터 수 (vectors 가 학습 표본일 때, factory 자동 선택용)
+) -> Any:
+    """학습까지 끝난 빈 faiss 인덱스 반환 (L2 거리, langchain FAISS 기본값과 동일)."""
+    faiss = _faiss()
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, dim = vectors.shape
+    factory = factory or suggest_factory(n_total or n, dim)
+    if n < min_train_size(factory):
+        fallback = "Flat" if n < TINY_CORPUS else "SQ8"
+        print(f"Warning: {n} vectors are not enough to train '{factory}' "
+              f"(needs {min_train_size(factory)}). Using '{fallback}' instead.")
+        factory = fallback
+    refine = _refine_for(factory, refine)
+    if refine:
+        factory = f"{factory},Refine({refine})"
+    index = faiss.index_factory(dim, factory, faiss.METRIC_L2)
+    if not index.is_trained:
+        rng = np.random.default_rng(seed)
+        sample = vectors if n <= train_size else vectors[rng.choice(n, train_size, replace=False)]
+        index.train(sample)
+    set_search_params(index)
+    return index
+
+
+def build_index(vectors: np.ndarray, add_batch_size: int = 100_000, **kwargs: Any) -> Any:
+    """학습 → 배치 추가까지 끝난 faiss 인덱스 반환. kwargs 는 train_index 와 동일."""
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    index = train_index(vectors, **kwargs)
+    for i in range(0, len(vectors), add_batch_size):
+        index.add(vectors[i:i + add_batch_size])
+    return index
+
+
+def get_search_params(index: Any) -> Dict[str, Any]:
+    """현재 검색 파라미터 (set_search_params 에 그대로 넘길 수 있는 dict)."""
+    faiss = _faiss()
+    top = faiss.downcast_index(index)
+    base = top
+    params: Dict[str, Any] = {"nprobe": None, "ef_search": None, "k_factor": None}
+    if isinstance(top, faiss.IndexRefine):
+        params["k_factor"] = top.k_factor
+        base = faiss.downcast_index(top.base_index)
+    ivf = faiss.try_extract_index_ivf(base)
+    if ivf is not None:
+        params["nprobe"] = ivf.nprobe
+    if hasattr(base, "hnsw"):
+        params["ef_search"] = base.hnsw.efSearch
+    return params
+
+
+def set_search_params(
+    index: Any,
+    nprobe: Optional[int] = 16,           # IVF: 탐색할 클러스터 수
+    ef_search: Optional[int] = 64,        # HNSW: 탐색 후보 리스트 크기
+    k_factor: Optional[float] = 10,       # 재순위: k * k_factor 개 후보를 재순위 벡터로 다시 계산
+) -> Any:
+    """검색 파라미터 설정 (load_local 후에도 다시 호출)."""
+    faiss = _faiss()
+    top = faiss.downcast_index(index)
+    base = top
+    if isinstance(top, faiss.IndexRefine):
+        if k_factor is not None:
+            top.k_factor = float(k_factor)
+        base = faiss.downcast_index(top.base_index)
+    ivf = faiss.try_extract_index_ivf(base)
+    if ivf is not None and nprobe is not None:
+        ivf.nprobe = int(nprobe)
+    if hasattr(base, "hnsw") and ef_search is not None:
+        base.hnsw.efSearch = int(ef_search)
+    return index
+
+
+def index_memory_bytes(index: Any) -> int:
+    """직렬화 크기로 추정한 인덱스 메모리."""
+    return int(_faiss().serialize_index(index).nbytes)
+
+
+# -----------------------------
+# 2) langchain FAISS 벡터 저장소로 구축
+# -----------------------------
+def from_texts_quantized(
+    texts: Sequence[str],
+    embedding: Any,
+    metadatas: Optional[Iterable[dict]] = None,
+    factory: Optional[str] = None,
+    refine: Optional[str] = "auto",
+    embed_batch_size: int = 512,
+    train_size: int = 100_000,
+    seed: int = 0,
+    **search_params: Any,
+) -> Any:
+    """
+    FAISS.from_texts(texts, embedding) 와 같은 용도로, 압축 인덱스를 사용하는 FAISS 벡터 저장소 생성.
+      vectorstore = from_texts_quantized(texts, OpenAIEmbeddings(), factory="IVF1024,SQ8")
+      vectorstore.save_local("d:/data/db_faiss_ivfsq")
+    학습 표본(train_size 개)만 먼저 임베딩해 학습하고, 나머지는 배치 단위로 임베딩하면서 바로 인덱스에 추가
+    (전체 임베딩을 메모리에 모으지 않음). 인덱스 순서는 texts 순서와 같다.
+    """
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    texts = list(texts)
+    metadatas = list(metadatas) if metadatas else None
+    n = len(texts)
+
+    def embed(ids: Sequence[int]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for i in range(0, len(ids), embed_batch_size):
+            vectors.extend(embedding.embed_documents([texts[j] for j in ids[i:i + embed_batch_size]]))
+        return vectors
+
+    # ① 무작위 표본으로 학습 (표본 벡터는 추가할 때 다시 임베딩하지 않도록 보관)
+    rng = np.random.default_rng(seed)
+    sample_ids = sorted(rng.choice(n, train_size, replace=False).tolist()) if n > train_size else list(range(n))
+    sampled = dict(zip(sample_ids, embed(sample_ids)))
+    index = train_index(
+        np.asarray(list(sampled.values()), dtype="float32"), factory=factory, refine=refine,
+        train_size=train_size, seed=seed, n_total=n,
+    )
+    set_search_params(index, **search_params)
+    vectorstore = FAISS(embedding, index, InMemoryDocstore(), {})
+
+    # ② texts 순서대로 배치 추가 (FAISS.add_embeddings 로 docstore 매핑 유지)
+    for start in range(0, n, embed_batch_size):
+        ids = range(start, min(start + embed_batch_size, n))
+        fresh = iter(embed([j for j in ids if j not in sampled]))
+        vectors = [sampled.pop(j) if j in sampled else next(fresh) for j in ids]
+        vectorstore.add_embeddings(
+            zip([texts[j] for j in ids], vectors), metadatas=[metadatas[j] for j in ids] if metadatas else None
+        )
+    return vectorstore
+
+
+# -----------------------------
+# 3) recall / 지연 시간 리포트
+# -----------------------------
+def recall_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    index: Any,
+    k: int = 10,
+    nprobes: Sequence[int] = (1, 4, 16, 64),
+    k_factors: Sequence[float] = (4, 10),
+) -> List[Dict[str, Any]]:
+    """
+    Flat 인덱스 결과를 정답으로 두고, 파라미터 조합별 recall@k 와 질의당 지연 시간(p50/p99 ms) 측정.
+    질의는 실제 서비스처럼 한 건씩 검색한다.
+    """
+    faiss = _faiss()
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+
+    def timed(idx: Any) -> tuple:
+        found, times = [], []
+        for q in queries:
+            start = time.perf_counter()
+            _, ids = idx.search(q[None, :], k)
+            times.append((time.perf_counter() - start) * 1000)
+            found.append(ids[0])
+        return np.array(found), np.array(times)
+
+    truth, flat_times = timed(flat)
+    rows = [{
+        "index": "Flat", "nprobe": None, "k_factor": None, f"recall@{k}": 1.0,
+        "p50_ms": round(float(np.percentile(flat_times, 50)), 3),
+        "p99_ms": round(float(np.percentile(flat_times, 99)), 3),
+        "memory_mb": round(index_memory_bytes(flat) / 2**20, 1),
+    }]
+    memory_mb = round(index_memory_bytes(index) / 2**20, 1)
+    saved = get_search_params(index)
+    is_ivf = faiss.try_extract_index_ivf(index) is not None
+    for nprobe in (nprobes if is_ivf else [None]):
+        for k_factor in k_factors:
+            set_search_params(index, nprobe=nprobe, k_factor=k_factor)
+            found, times = timed(index)
+            recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+            rows.append({
+                "index": "quantized", "nprobe": nprobe, "k_factor": k_factor,
+                f"recall@{k}": round(float(recall), 4),
+                "p50_ms": round(float(np.percentile(times, 50)), 3),
+                "p99_ms": round(float(np.percentile(times, 99)), 3),
+                "memory_mb": memory_mb,
+            })
+    set_search_params(index, **saved)   # 호출자가 설정한 검색 파라미터로 되돌림
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    keys = list(rows[0].keys())
+    print(" | ".join(f"{k:>10}" for k in keys))
+    for row in rows:
+        print(" | ".join(f"{str(row[k]):>10}" for k in keys))
+
+
+if __name__ == "__main__":
+    # 군집 구조가 있는 합성 데이터로 Flat 대비 압축 인덱스 비교
+    rng = np.random.default_rng(0)
+    n, dim, n_queries = 200_000, 384, 200
+    centers = rng.normal(size=(256, dim)).astype("float32")
+    data = centers[rng.integers(0, 256, n)] + 0.3 * rng.normal(size=(n, dim)).astype("float32")
+    queries = data[rng.choice(n, n_queries, replace=False)] + 0.05 * rng.normal(size=(n_queries, dim)).astype("float32")
+
+    for kind in ("ivfsq", "ivfpq"):
+        start = time.perf_counter()
+        index = build_index(data, factory=suggest_factory(n, dim, kind))
+        print(f"\n[{kind}] build {time.perf_counter() - start:.1f}s")
+        print_report(recall_report(data, queries, index, k=10))
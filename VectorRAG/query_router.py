@@ -0,0 +1,190 @@
+# --------------------------------------------------------------
+# query_router.py
+#   질문 유형에 따라 벡터 검색 / 그래프(Cypher) / 표(집계) 백엔드 중 하나로 보내는 라우터
+#     - LLM 호출 없이 키워드·정규식 기반 로컬 분류기로 판단
+#     - 여러 백엔드가 필요한 질문(복합 질문)은 하위 검색을 동시에 실행
+#     - 경로별 지연 시간을 기록해 통계(p50/p95) 제공
+# --------------------------------------------------------------
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# 경로별 기본 규칙 (정규식, 가중치)
+DEFAULT_RULES: Dict[str, List[Tuple[str, float]]] = {
+    # 집계·정렬·비교: 벡터 검색으로는 전체 행을 볼 수 없어 답할 수 없는 질문
+    "tabular": [
+        (r"평균|합계|총합|총액|합산|중앙값|표준편차", 2.0),
+        (r"가장\s*(많|적|높|낮|비싼|싼|큰|작|어린|나이 많)|최대|최소|최고|최저|순위|상위|하위", 2.0),
+        (r"몇\s*(명|개|건|대|곳|%)|개수|인원|비율|퍼센트", 2.0),
+        (r"\d+\s*(세|살|명|원|만원|억|유로|%)?\s*(이상|이하|초과|미만|넘는|보다)", 1.5),
+        (r"\b(average|mean|sum|total|count|how many|max(imum)?|min(imum)?|top\s*\d+|highest|lowest|rank)\b", 2.0),
+    ],
+    # 엔터티 간 관계: 그래프 탐색이 적합한 질문
+    "graph": [
+        (r"소속|관계|연결|관련된|출연|제조사|만든|생산|증상|질환|가능한 질환|함께|같은 팀|동료", 1.5),
+        (r"누가|누구|어느 팀|어느 회사|어떤 (선수|팀|브랜드|배우|영화|질환)", 1.0),
+        (r"\b(related|connected|relationship|belongs? to|plays? for|produced by|acted in|who)\b", 1.5),
+    ],
+    # 설명·요약·절차: 문서 청크 검색이 적합한 질문
+    "vector": [
+        (r"설명|요약|정의|방법|이유|왜|어떻게|특징|원인|치료|관리|주의", 1.5),
+        (r"\b(explain|describe|summari[sz]e|what is|why|how (do|to|does))\b", 1.5),
+    ],
+}
+
+# 완결된 문장(?/!/. 또는 ~요/~까/~니다 로 끝남) 사이에서만 분리. "김철수 그리고 이영희의 관계는?" 처럼
+# 명사 사이의 그리고/또한 에서 나누면 하위 질문이 공통 주어를 잃으므로 분리하지 않는다
+_SPLIT_RE = re.compile(
+    r"(?<=[?？!！.。])\s*;?\s+(?:(?:그리고|또한),?\s+)?"
+    r"|(?:(?<=[요까])|(?<=니다))(?:\s*;\s*|\s*,?\s*(?:그리고|또한),?\s+)"
+)
+
+
+def split_question(question: str) -> List[str]:
+    """"A는? 그리고 B는?" 같은 복합 질문을 문장 단위 하위 질문으로 분리 (분리되지 않으면 원래 질문 하나)."""
+    parts = [p.strip() for p in _SPLIT_RE.split(question.strip()) if p and p.strip()]
+    return parts or [question.strip()]
+
+
+class KeywordClassifier:
+    """규칙 점수 합으로 경로를 고르는 로컬 분류기. 임계값 이상인 경로가 없으면 default."""
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, List[Tuple[str, float]]]] = None,
+        default: str = "vector",
+        threshold: float = 1.0,
+    ):
+        self.default = default
+        self.threshold = threshold
+        self._rules = {
+            route: [(re.compile(pattern, re.I), weight) for pattern, weight in patterns]
+            for route, patterns in (rules or DEFAULT_RULES).items()
+        }
+
+    def scores(self, question: str) -> Dict[str, float]:
+        return {
+            route: sum(weight for regex, weight in patterns if regex.search(question))
+            for route, patterns in self._rules.items()
+        }
+
+    def __call__(self, question: str) -> str:
+        scores = self.scores(question)
+        route, best = max(scores.items(), key=lambda kv: kv[1], default=(self.default, 0.0))
+        return route if best >= self.threshold else self.default
+
+
+class QueryRouter:
+    """
+    routes: 경로 이름 -> 질문을 받아 결과를 반환하는 함수
+        예) {"vector": lambda q: qa_chain.invoke(q)["result"],
+             "graph": lambda q: cypher_chain.invoke({"query": q})["result"],
+             "tabular": lambda q: agent.invoke(q)["output"]}
+    costs: 경로별 상대 비용. 분류 점수가 같으면 비용이 낮은 경로를 선택하고,
+           지정하지 않은 경로는 측정된 평균 지연 시간을 비용으로 사용한다.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, Callable[[str], Any]],
+        classifier: Optional[Callable[[str], str]] = None,
+        costs: Optional[Dict[str, float]] = None,
+        fallback: Optional[str] = "vector",    # 선택된 경로가 실패하면 다시 시도할 경로
+        max_workers: int = 4,
+        window: int = 1000,                    # 경로별로 보관할 최근 지연 시간 개수
+    ):
+        self.routes = routes
+        self.classifier = classifier or KeywordClassifier(default=fallback or next(iter(routes)))
+        self.costs = costs or {}
+        self.fallback = fallback if fallback in routes else None
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="route")
+        # batch() 의 질문 단위 작업은 별도 풀에서 실행: 같은 풀에서 하위 질문을 기다리면 교착 상태
+        self._batch_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="route-batch")
+        self._latency: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # 경로 선택
+    # -----------------------------
+    def _cost(self, route: str) -> float:
+        if route in self.costs:
+            return self.costs[route]
+        with self._lock:
+            samples = list(self._latency.get(route, ()))
+        return sum(samples) / len(samples) if samples else float("inf")
+
+    def choose(self, question: str) -> str:
+        """분류기가 고른 경로. 점수가 같은 후보가 여러 개면 가장 싼 경로."""
+        if isinstance(self.classifier, KeywordClassifier):
+            scores = {r: s for r, s in self.classifier.scores(question).items() if r in self.routes}
+            best = max(scores.values(), default=0.0)
+            if best < self.classifier.threshold:
+                return self.classifier.default
+            return min((r for r, s in scores.items() if s == best), key=self._cost)
+        route = self.classifier(question)
+        return route if route in self.routes else (self.fallback or next(iter(self.routes)))
+
+    def plan(self, question: str) -> List[Tuple[str, str]]:
+        """(하위 질문, 경로) 목록."""
+        return [(q, self.choose(q)) for q in split_question(question)]
+
+    # -----------------------------
+    # 실행
+    # -----------------------------
+    def _timed(self, route: str, question: str) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        try:
+            return self.routes[route](question), time.perf_counter() - start
+        finally:
+            with self._lock:
+                self._latency[route].append(time.perf_counter() - start)
+
+    def _run(self, question: str, route: str) -> Dict[str, Any]:
+        try:
+            result, elapsed = self._timed(route, question)
+        except Exception as e:
+            if not self.fallback or route == self.fallback:
+                raise
+            print(f"Error in route '{route}', falling back to '{self.fallback}'. Error: {e}")
+            route = self.fallback
+            result, elapsed = self._timed(route, question)
+        return {"question": question, "route": route, "result": result, "latency": round(elapsed, 4)}
+
+    def invoke(self, question: str) -> Dict[str, Any]:
+        """
+        질문을 라우팅해 실행. 하위 질문이 여러 개면 동시에 실행한다.
+        반환: {"question", "answers": [{"question", "route", "result", "latency"}, ...], "latency"}
+        """
+        start = time.perf_counter()
+        plan = self.plan(question)
+        if len(plan) == 1:
+            answers = [self._run(*plan[0])]
+        else:
+            futures = [self.executor.submit(self._run, q, route) for q, route in plan]
+            answers = [f.result() for f in futures]
+        return {"question": question, "answers": answers, "latency": round(time.perf_counter() - start, 4)}
+
+    def batch(self, questions: Iterable[str]) -> List[Dict[str, Any]]:
+        return list(self._batch_executor.map(self.invoke, questions))
+
+    # -----------------------------
+    # 지연 시간 통계
+    # -----------------------------
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        with self._lock:
+            items = {route: sorted(samples) for route, samples in self._latency.items()}
+        for route, samples in items.items():
+            if not samples:
+                continue
+            n = len(samples)
+            out[route] = {
+                "count": n,
+                "mean": round(sum(samples) / n, 4),
+                "p50": round(samples[n // 2], 4),
+                "p95": round(samples[min(n - 1, int(n * 0.95))], 4),
+            }
+        return out
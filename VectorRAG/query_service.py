@@ -0,0 +1,459 @@
+# pip install faiss-cpu numpy langchain-community langchain-core
+# --------------------------------------------------------------
+# query_service.py
+#   노트북의 qa_chain.invoke(...) (RetrievalQA, chain_type="stuff") 를 장기 실행 질의 서비스로 제공
+#     - FAISS 인덱스를 mmap 으로 읽기 → 여러 워커 프로세스가 같은 메모리 페이지(OS 페이지 캐시)를 공유
+#     - 동시에 들어온 질의를 모아(마이크로 배치) 임베딩 호출 1회 + 인덱스 검색 1회로 처리
+#     - 처리 중인 요청 수 상한 (backpressure): 넘치면 ServiceBusy / HTTP 503 + Retry-After
+#     - 테스트용 StubLLM 과 HashEmbeddings (get_embeddings("stub")) 로 네트워크 없이 실행
+#
+#   python query_service.py --index d:/data/db_faiss_combined --embeddings openai --llm openai --processes 4
+#   curl -X POST localhost:8000/query -d '{"query": "마음 챙김의 리뷰는?"}'
+# --------------------------------------------------------------
+import argparse
+import json
+import os
+import pickle
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.language_models.llms import LLM
+
+# RetrievalQA "stuff" 체인의 기본 프롬프트와 같은 문구
+QA_PROMPT = (
+    "Use the following pieces of context to answer the question at the end. "
+    "If you don't know the answer, just say that you don't know, don't try to make up an answer.\n\n"
+    "{context}\n\nQuestion: {question}\nHelpful Answer:"
+)
+
+
+class ServiceBusy(RuntimeError):
+    """처리 중인 요청이 max_pending 에 도달해 새 요청을 받을 수 없음."""
+
+
+def _faiss():
+    try:
+        import faiss
+    except ImportError:
+        raise ImportError("Could not import faiss. Please install it with `pip install faiss-cpu`.")
+    return faiss
+
+
+# -----------------------------
+# 1) 테스트용 LLM
+# -----------------------------
+class StubLLM(LLM):
+    """컨텍스트 첫 줄을 그대로 답으로 돌려주는 LLM (latency 초만큼 대기해 실제 호출 지연을 흉내)."""
+
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        time.sleep(self.latency)
+        context = prompt.split("\n\n", 1)[-1].rsplit("\n\nQuestion:", 1)[0]
+        first = next((line.strip() for line in context.splitlines() if line.strip()), "")
+        return first[:200] or "I don't know."
+
+
+def make_llm(backend: str = "stub") -> Any:
+    """"stub" | "openai" (ChatOpenAI gpt-4o) | "ollama" (OllamaLLM deepseek-r1)."""
+    if backend == "stub":
+        return StubLLM()
+    if backend == "openai":
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(model="gpt-4o", temperature=0)
+    if backend == "ollama":
+        from langchain_ollama import OllamaLLM
+
+        return OllamaLLM(model="deepseek-r1")
+    raise ValueError(f"Unknown llm backend: {backend}")
+
+
+# -----------------------------
+# 2) 공유 인덱스 로드
+# -----------------------------
+def load_index(folder_path: str, embeddings: Any, index_name: str = "index", mmap: bool = True) -> Any:
+    """
+    FAISS.save_local 로 저장한 폴더를 langchain FAISS 벡터 저장소로 로드.
+    mmap=True 이면 벡터를 메모리에 복사하지 않고 파일을 매핑해 읽기 전용으로 사용하므로,
+    같은 인덱스를 여는 워커 프로세스들이 물리 메모리를 한 벌만 사용한다.
+    (index.pkl 의 문서 저장소는 pickle 이므로 직접 만든 인덱스만 로드할 것)
+    """
+    from langchain_community.vectorstores import FAISS
+
+    faiss = _faiss()
+    flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY if mmap else 0
+    index = faiss.read_index(os.path.join(folder_path, f"{index_name}.faiss"), flags)
+    with open(os.path.join(folder_path, f"{index_name}.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+# -----------------------------
+# 3) 서비스
+# -----------------------------
+class QueryService:
+    """
+    service = QueryService(load_index("d:/data/db_faiss_combined", OpenAIEmbeddings()), llm)
+    service.invoke("마음 챙김의 리뷰는?")   # {"query", "result", "source_documents"} (RetrievalQA 와 같은 키)
+    future = service.submit(question)      # 비동기 제출, 가득 차면 ServiceBusy
+    """
+
+    def __init__(
+        self,
+        vectorstore: Any,                 # langchain FAISS 벡터 저장소
+        llm: Any,
+        k: int = 4,                       # RetrievalQA 기본 검색 개수
+        max_batch: int = 64,              # 한 번에 임베딩·검색할 최대 질의 수
+        max_wait_ms: float = 5.0,         # 첫 질의 도착 후 배치를 채우려고 기다리는 최대 시간
+        max_pending: int = 256,           # 처리 중(대기 + 검색 + LLM)인 요청 수 상한
+        batch_threads: int = 2,           # 임베딩·검색 배치를 동시에 처리하는 스레드 수
+        llm_workers: int = 32,            # 동시 LLM 호출 수
+        prompt: str = QA_PROMPT,
+        window: int = 10000,              # 통계용으로 보관할 최근 요청 수
+    ):
+        self.vectorstore = vectorstore
+        self.embeddings = vectorstore.embedding_function
+        self.llm = llm
+        self.k = k
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_pending = max_pending
+        self.prompt = prompt
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._llm_pool = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counts = {"requests": 0, "rejected": 0, "errors": 0, "batches": 0, "batched_queries": 0}
+        self._latency: deque = deque(maxlen=window)
+        self._batchers = [
+            threading.Thread(target=self._batch_loop, name=f"batcher-{i}", daemon=True) for i in range(batch_threads)
+        ]
+        for thread in self._batchers:
+            thread.start()
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += n
+
+    # -----------------------------
+    # 제출 / 동기 호출
+    # -----------------------------
+    def submit(self, question: str) -> Future:
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self._counts["rejected"] += 1
+                raise ServiceBusy(f"{self.max_pending} requests already in progress")
+            self._in_flight += 1
+            self._counts["requests"] += 1
+        future: Future = Future()
+        future.add_done_callback(self._release)
+        self._queue.put((question, future, time.perf_counter()))
+        return future
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def invoke(self, question: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.submit(question).result(timeout)
+
+    # -----------------------------
+    # 배치 검색
+    # -----------------------------
+    def _embed_queries(self, questions: List[str]) -> List[List[float]]:
+        # LocalEmbeddings 처럼 질의용 배치 함수가 있으면 사용,
+        # 없으면 embed_documents (OpenAI / Ollama 는 embed_query 와 같은 벡터)
+        embed = getattr(self.embeddings, "embed_queries", None) or self.embeddings.embed_documents
+        return embed(questions)
+
+    def retrieve(self, questions: List[str]) -> List[List[Tuple[Document, float]]]:
+        """질의 목록을 임베딩 1회 + 인덱스 검색 1회로 처리. 질의별 (문서, L2 거리) 목록."""
+        matrix = np.asarray(self._embed_queries(questions), dtype="float32")
+        if getattr(self.vectorstore, "_normalize_L2", False):
+            _faiss().normalize_L2(matrix)
+        distances, ids = self.vectorstore.index.search(matrix, self.k)
+        mapping, docstore = self.vectorstore.index_to_docstore_id, self.vectorstore.docstore
+        results = []
+        for row_ids, row_distances in zip(ids, distances):
+            docs = []
+            for i, distance in zip(row_ids, row_distances):
+                if i == -1:
+                    continue
+                doc = docstore.search(mapping[int(i)])
+                if isinstance(doc, Document):
+                    docs.append((doc, float(distance)))
+            results.append(docs)
+        return results
+
+    def _next_batch(self) -> List[Tuple[str, Future, float]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                # 이미 쌓인 질의는 바로 가져오고, 비어 있으면 deadline 까지만 기다림
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _batch_loop(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if any(item is None for item in batch):   # close(): 다른 배치 스레드도 종료되도록 신호를 되돌려 놓음
+                for item in batch:
+                    if item is not None:
+                        item[1].set_exception(ServiceBusy("service closed"))
+                self._queue.put(None)
+                return
+            try:
+                results = self.retrieve([question for question, _, _ in batch])
+            except Exception as e:
+                print(f"Error retrieving batch of {len(batch)}. Error: {e}")
+                self._count("errors", len(batch))
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            self._count("batches")
+            self._count("batched_queries", len(batch))
+            for (question, future, start), docs in zip(batch, results):
+                self._llm_pool.submit(self._answer, question, docs, future, start)
+
+    # -----------------------------
+    # 답변 생성
+    # -----------------------------
+    def _answer(self, question: str, docs: List[Tuple[Document, float]], future: Future, start: float) -> None:
+        try:
+            context = "\n\n".join(doc.page_content for doc, _ in docs)
+            output = self.llm.invoke(self.prompt.format(context=context, question=question))
+            future.set_result({
+                "query": question,
+                "result": getattr(output, "content", output),
+                "source_documents": [doc for doc, _ in docs],
+            })
+        except Exception as e:
+            self._count("errors")
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._latency.append(time.perf_counter() - start)
+
+    # -----------------------------
+    # 통계 / 종료
+    # -----------------------------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            samples = sorted(self._latency)
+            in_flight = self._in_flight
+        out: Dict[str, Any] = {**counts, "in_flight": in_flight}
+        out["mean_batch"] = round(counts["batched_queries"] / counts["batches"], 2) if counts["batches"] else 0.0
+        if samples:
+            n = len(samples)
+            out["p50"] = round(samples[n // 2], 4)
+            out["p95"] = round(samples[min(n - 1, int(n * 0.95))], 4)
+            out["p99"] = round(samples[min(n - 1, int(n * 0.99))], 4)
+        return out
+
+    def close(self) -> None:
+        self._queue.put(None)
+        for thread in self._batchers:
+            thread.join()
+        self._llm_pool.shutdown(wait=True)
+
+
+# -----------------------------
+# 4) HTTP 서버 (워커 프로세스)
+# -----------------------------
+def _make_handler(service: QueryService, timeout: float) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if self.path == "/stats":
+                self._send(200, {"pid": os.getpid(), **service.stats()})
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            if self.path != "/query":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                question = json.loads(self.rfile.read(length) or b"{}").get("query", "").strip()
+            except (ValueError, AttributeError):
+                self._send(400, {"error": "body must be JSON like {\"query\": \"...\"}"})
+                return
+            if not question:
+                self._send(400, {"error": "query is empty"})
+                return
+            try:
+                response = service.invoke(question, timeout=timeout)
+            except ServiceBusy as e:
+                self._send(503, {"error": str(e)}, {"Retry-After": "1"})
+                return
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+                return
+            self._send(200, {
+                "query": response["query"],
+                "result": response["result"],
+                "sources": [doc.metadata for doc in response["source_documents"]],
+            })
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def _worker(sock: socket.socket, index_path: str, embeddings: str, llm: str, timeout: float, kwargs: Dict[str, Any]) -> None:
+    from local_embeddings import get_embeddings
+
+    service = QueryService(load_index(index_path, get_embeddings(embeddings)), make_llm(llm), **kwargs)
+    server = ThreadingHTTPServer(sock.getsockname(), _make_handler(service, timeout), bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock          # 부모가 연 소켓을 모든 워커가 함께 accept
+    server.daemon_threads = True
+    try:
+        server.serve_forever()
+    finally:
+        service.close()
+
+
+def serve(
+    index_path: str,
+    embeddings: str = "openai",          # local_embeddings.get_embeddings 백엔드 이름
+    llm: str = "openai",                 # make_llm 백엔드 이름
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    processes: int = 2,
+    timeout: float = 60.0,               # 요청당 최대 대기 시간(초)
+    **service_kwargs: Any,               # QueryService 인자 (k, max_batch, max_pending, ...)
+) -> None:
+    """워커 프로세스 processes 개가 같은 포트에서 요청을 받는다. Ctrl+C 로 종료."""
+    import multiprocessing
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    workers = [
+        multiprocessing.Process(
+            target=_worker, args=(sock, index_path, embeddings, llm, timeout, service_kwargs), daemon=True
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"Serving {index_path} on http://{host}:{sock.getsockname()[1]} with {processes} workers")
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+    finally:
+        sock.close()
+
+
+# -----------------------------
+# 5) 부하 테스트 (stub 백엔드)
+# -----------------------------
+def load_test(service: QueryService, questions: List[str], concurrency: int = 200) -> Dict[str, Any]:
+    """동시 사용자 concurrency 명이 질문을 나눠 보내는 부하 테스트. ServiceBusy 는 잠시 후 재시도."""
+    start = time.perf_counter()
+    busy = [0]
+
+    def client(i: int) -> None:
+        for question in questions[i::concurrency]:
+            while True:
+                try:
+                    service.invoke(question)
+                    break
+                except ServiceBusy:
+                    busy[0] += 1
+                    time.sleep(0.05)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"qps": round(len(questions) / elapsed, 1), "retries_after_busy": busy[0], **service.stats()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RAG query service")
+    parser.add_argument("--index", help="FAISS.save_local 폴더 (생략하면 stub 백엔드로 부하 테스트)")
+    parser.add_argument("--embeddings", default="openai")
+    parser.add_argument("--llm", default="openai")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-pending", type=int, default=256)
+    args = parser.parse_args()
+
+    if args.index:
+        serve(
+            args.index, args.embeddings, args.llm, args.host, args.port, args.processes,
+            k=args.k, max_batch=args.max_batch, max_pending=args.max_pending,
+        )
+    else:
+        # 합성 문서로 인덱스를 만들고, 배치 크기별 처리량 비교
+        import tempfile
+
+        from langchain_community.vectorstores import FAISS
+        from local_embeddings import HashEmbeddings
+
+        class RemoteEmbeddings(HashEmbeddings):
+            # 임베딩 API 왕복 지연(호출당 20ms)을 흉내: 질의 수와 무관하게 호출 횟수가 비용
+            def embed_documents(self, texts: List[str]) -> List[List[float]]:
+                time.sleep(0.02)
+                return super().embed_documents(texts)
+
+        embeddings = RemoteEmbeddings()
+        texts = [f"문서 {i}: 제품 {i % 97} 의 리뷰와 사용 방법 {i % 13}" for i in range(20000)]
+        folder = tempfile.mkdtemp()
+        FAISS.from_texts(texts, embeddings).save_local(folder)
+        questions = [f"제품 {i % 97} 사용 방법 {i % 13} 은?" for i in range(4000)]
+        for max_batch in (1, 64):
+            service = QueryService(
+                load_index(folder, embeddings), StubLLM(latency=0.05),
+                max_batch=max_batch, max_pending=args.max_pending, llm_workers=128,
+            )
+            print(f"max_batch={max_batch}:", load_test(service, questions, concurrency=300))
+            service.close()
@@ -0,0 +1,370 @@
+# pip install faiss-cpu langchain-community langchain-text-splitters pypdf python-docx openpyxl langchain-chroma
+# --------------------------------------------------------------
+# retrieval_benchmark.py
+#   저장소에 포함된 데이터로 검색 품질·속도를 측정하는 오프라인 벤치마크 / 회귀 테스트
+#     - 데이터: succulent.pdf, 안구건조증.pdf, files/ 폴더, car_prices.xlsx, football.csv, 질병 CSV
+#     - 임베딩: 결정적 HashEmbeddings (네트워크·모델 없이 항상 같은 결과), --embeddings local 로 교체 가능
+#     - 구성: FAISS(Flat) / FAISS(HNSW+SQ8, 재순위) / Chroma / 하이브리드(BM25 + FAISS, RRF)
+#     - 지표: recall@k, MRR, 인덱스 구축 시간, 메모리 증가량, 질의 지연 p50/p99
+#     - --save 로 결과를 저장하고 --baseline 으로 이전 결과와 비교 (품질 하락·지연 증가 시 종료 코드 1)
+#
+#   python retrieval_benchmark.py --save bench.json          # 기준 결과 저장
+#   python retrieval_benchmark.py --baseline bench.json      # 변경 후 비교
+# --------------------------------------------------------------
+import argparse
+import csv
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# -----------------------------
+# 1) 질문 세트
+# -----------------------------
+# (질문, 정답 청크가 모두 포함해야 하는 문자열 목록)
+# 청크 크기와 무관하도록 정답을 청크 id 대신 내용 조건으로 지정한다.
+QUESTIONS: Dict[str, List[Tuple[str, List[str]]]] = {
+    "succulent": [
+        ("겨울철 다육이 키우는 방법은?", ["겨울"]),
+        ("겨울철 물은 몇 번 주는 것이 적당해?", ["겨울(휴면기)"]),
+        ("다육이에 좋은 흙은?", ["마사토"]),
+        ("다육이 번식 방법은?", ["잎꽂이"]),
+        ("비료는 언제 주나요?", ["비료"]),
+        ("깍지벌레는 어떻게 없애?", ["깍지벌레"]),
+    ],
+    "dry_eye": [
+        ("안구건조증 예방 방법은?", ["예방"]),
+        ("습도가 안구건조증에 미치는 영향은?", ["습도"]),
+        ("인공눈물은 자주 사용해도 되는거야?", ["인공눈물"]),
+        ("안구건조증은 왜 생기는거야?", ["요인"]),
+        ("언제 병원에 가야 해?", ["병원"]),
+        ("콘택트렌즈를 끼면 안구건조증이 심해져?", ["콘택트렌즈"]),
+    ],
+    "files": [
+        ("마음 챙김의 리뷰는?", ["마음 챙김"]),
+        ("집중력 향상을 위해 좋은 활동은?", ["집중력"]),
+        ("가죽 소파는 온도 변화에 어때?", ["온도 변화"]),
+        ("1세대 스마트팜의 특징은?", ["1세대"]),
+        ("폴스타 2 리뷰는?", ["폴스타 2"]),
+        ("외국어 배우기는 두뇌에 어떤 효과가 있어?", ["외국어"]),
+    ],
+    "cars": [
+        ("아반떼의 제조사는?", ["아반떼"]),
+        ("현대에서 가장 비싼 자동차는 무엇인가요?", ["현대"]),
+        ("포르쉐 타이칸 가격은?", ["타이칸"]),
+        ("테슬라 모델은?", ["테슬라"]),
+    ],
+    "football": [
+        ("L. Messi의 소속팀은?", ["L. Messi"]),
+        ("Cristiano Ronaldo의 국적은?", ["Cristiano Ronaldo"]),
+        ("Liverpool 소속 선수는?", ["Liverpool"]),
+        ("Real Madrid 선수의 포지션은?", ["Real Madrid"]),
+    ],
+    "disease": [
+        ("기침과 발열이 있는 질병은 무엇인가요?", ["Fever: Yes", "Cough: Yes"]),
+        ("Asthma 환자의 증상은?", ["Disease: Asthma"]),
+        (
+            "35대 여성이고, 기존에 혈압이 높았어, 어제부터 열이 있고 기침 증상이 있어. 무슨 질병을 의심해야해?",
+            ["Fever: Yes", "Cough: Yes", "Gender: Female", "Blood Pressure: High"],
+        ),
+    ],
+}
+
+
+# -----------------------------
+# 2) 데이터 로드 (노트북과 같은 방식)
+# -----------------------------
+def _pdf_text(path: str) -> str:
+    from pypdf import PdfReader
+
+    return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+
+
+def _docx_text(path: str) -> str:
+    from docx import Document as DocxDocument
+
+    return "\n".join(p.text for p in DocxDocument(path).paragraphs if p.text.strip() != "")
+
+
+def _csv_rows(path: str) -> List[Document]:
+    # CSVLoader 와 같은 "열: 값" 줄 형식, 행 하나가 문서 하나
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [
+            Document(
+                page_content="\n".join(f"{k.strip()}: {(v or '').strip()}" for k, v in row.items()),
+                metadata={"source": path, "row": i},
+            )
+            for i, row in enumerate(csv.DictReader(f))
+        ]
+
+
+def _split(documents: List[Document], chunk_size: int, chunk_overlap: int) -> List[Document]:
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter.split_documents(documents)
+
+
+def load_dataset(name: str, chunk_size: int = 200, chunk_overlap: int = 20) -> List[Document]:
+    """데이터 이름별 청크 목록. 문서형(PDF/docx)은 분할하고, 표 데이터는 행 하나를 청크 하나로 사용."""
+    from excel_stream_loader import ExcelStreamLoader
+
+    if name in ("succulent", "dry_eye"):
+        path = os.path.join(HERE, "succulent.pdf" if name == "succulent" else "안구건조증.pdf")
+        return _split([Document(page_content=_pdf_text(path), metadata={"source": path})], chunk_size, chunk_overlap)
+    if name == "files":
+        folder = os.path.join(HERE, "files")
+        texts, rows = [], []
+        for file in sorted(os.listdir(folder)):
+            path = os.path.join(folder, file)
+            extension = os.path.splitext(file)[1].lower()
+            try:
+                if extension == ".pdf":
+                    texts.append(Document(page_content=_pdf_text(path), metadata={"source": path}))
+                elif extension == ".docx":
+                    texts.append(Document(page_content=_docx_text(path), metadata={"source": path}))
+                elif extension == ".xlsx":
+                    rows.extend(ExcelStreamLoader(path, rows_per_chunk=1).lazy_load())
+            except Exception as e:
+                print(f"Error processing file {path}. Error: {e}")
+        return _split(texts, chunk_size, chunk_overlap) + rows
+    if name == "cars":
+        return list(ExcelStreamLoader(os.path.join(HERE, "car_prices.xlsx"), rows_per_chunk=1).lazy_load())
+    if name == "football":
+        return _csv_rows(os.path.join(HERE, "football.csv"))
+    if name == "disease":
+        return _csv_rows(os.path.join(HERE, "Disease_symptom_and_patient_profile_dataset.csv"))
+    raise ValueError(f"Unknown dataset: {name}")
+
+
+# -----------------------------
+# 3) 검색 구성
+# -----------------------------
+# 구성 이름 -> (문서, 임베딩, k) 를 받아 "질문 -> 문서 목록" 함수를 반환
+def _faiss_flat(docs: List[Document], embeddings: Any, k: int) -> Tuple[Callable[[str], List[Document]], Any]:
+    from langchain_community.vectorstores import FAISS
+
+    store = FAISS.from_documents(docs, embeddings)
+    return (lambda q: store.similarity_search(q, k=k)), store
+
+
+def _faiss_hnsw(docs: List[Document], embeddings: Any, k: int) -> Tuple[Callable[[str], List[Document]], Any]:
+    from quantized_index import from_texts_quantized
+
+    store = from_texts_quantized(
+        [d.page_content for d in docs], embeddings, [d.metadata for d in docs], factory="HNSW32,SQ8"
+    )
+    return (lambda q: store.similarity_search(q, k=k)), store
+
+
+def _chroma(docs: List[Document], embeddings: Any, k: int) -> Tuple[Callable[[str], List[Document]], Any]:
+    import uuid
+
+    from langchain_chroma import Chroma
+
+    store = Chroma.from_documents(docs, embeddings, collection_name=f"bench_{uuid.uuid4().hex[:8]}")
+    return (lambda q: store.similarity_search(q, k=k)), store
+
+
+def _hybrid(docs: List[Document], embeddings: Any, k: int) -> Tuple[Callable[[str], List[Document]], Any]:
+    from langchain_community.vectorstores import FAISS
+
+    from hybrid_retriever import HybridRetriever
+
+    retriever = HybridRetriever.from_documents(docs, embeddings, FAISS, k=k)
+    return retriever.invoke, retriever
+
+
+CONFIGS: Dict[str, Callable[..., Tuple[Callable[[str], List[Document]], Any]]] = {
+    "faiss": _faiss_flat,
+    "faiss_hnsw": _faiss_hnsw,
+    "chroma": _chroma,
+    "hybrid": _hybrid,
+}
+
+
+# -----------------------------
+# 4) 측정
+# -----------------------------
+def _rss_bytes() -> Optional[int]:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _is_relevant(doc: Document, terms: Sequence[str]) -> bool:
+    return all(term in doc.page_content for term in terms)
+
+
+def evaluate(
+    search: Callable[[str], List[Document]],
+    docs: List[Document],
+    questions: List[Tuple[str, List[str]]],
+    k: int,
+    repeat: int = 5,
+) -> Dict[str, float]:
+    """
+    recall@k : 상위 k 개 중 정답 청크 수 / min(k, 전체 정답 청크 수)
+    mrr      : 첫 정답 청크 순위의 역수 평균 (k 안에 없으면 0)
+    지연 시간은 질문마다 repeat 회 호출해 측정.
+    """
+    recalls, ranks, times = [], [], []
+    for question, terms in questions:
+        n_relevant = sum(_is_relevant(d, terms) for d in docs)
+        if n_relevant == 0:
+            print(f"Warning: no chunk matches {terms} for '{question}'")
+            continue
+        for _ in range(repeat):
+            start = time.perf_counter()
+            found = search(question)[:k]
+            times.append((time.perf_counter() - start) * 1000)
+        hits = [_is_relevant(d, terms) for d in found]
+        recalls.append(sum(hits) / min(k, n_relevant))
+        ranks.append(next((1 / (i + 1) for i, hit in enumerate(hits) if hit), 0.0))
+    times.sort()
+    n = len(times)
+    return {
+        f"recall@{k}": round(sum(recalls) / len(recalls), 4) if recalls else 0.0,
+        "mrr": round(sum(ranks) / len(ranks), 4) if ranks else 0.0,
+        "p50_ms": round(times[n // 2], 3) if n else 0.0,
+        "p99_ms": round(times[min(n - 1, int(n * 0.99))], 3) if n else 0.0,
+    }
+
+
+def run(
+    datasets: Sequence[str],
+    configs: Sequence[str],
+    embeddings: Any,
+    k: int = 4,
+    chunk_size: int = 200,
+    chunk_overlap: int = 20,
+    repeat: int = 5,
+    scale: int = 1,                   # 구축 시간·메모리 측정용으로 청크를 scale 배 복제 (내용이 같아 품질 지표는 유지)
+) -> List[Dict[str, Any]]:
+    rows = []
+    # 라이브러리 초기화 비용이 첫 구성의 구축 시간·메모리에 섞이지 않도록 작은 문서로 한 번씩 미리 실행
+    warmup = [Document(page_content=f"warm up {i}", metadata={"source": "warmup"}) for i in range(64)]
+    available = []
+    for config in configs:
+        try:
+            CONFIGS[config](warmup, embeddings, k)[0]("warm up")
+            available.append(config)
+        except ImportError as e:
+            print(f"Skipping {config}: {e}")
+
+    for dataset in datasets:
+        docs = load_dataset(dataset, chunk_size, chunk_overlap)
+        if scale > 1:
+            docs = [
+                Document(page_content=d.page_content, metadata={**d.metadata, "copy": c})
+                for c in range(scale) for d in docs
+            ]
+        for config in available:
+            gc.collect()
+            # 네이티브 메모리(faiss, chroma)까지 포함하는 RSS 증가량, RSS 를 읽을 수 없으면 파이썬 힙 최대치
+            rss_before = _rss_bytes()
+            if rss_before is None:
+                tracemalloc.start()
+            start = time.perf_counter()
+            search, store = CONFIGS[config](docs, embeddings, k)
+            build_s = time.perf_counter() - start
+            if rss_before is None:
+                memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            else:
+                memory = (_rss_bytes() or rss_before) - rss_before
+            row = {
+                "dataset": dataset,
+                "config": config,
+                "chunks": len(docs),
+                "build_s": round(build_s, 3),
+                "memory_mb": round(max(memory, 0) / 2**20, 2),
+                **evaluate(search, docs, QUESTIONS[dataset], k, repeat),
+            }
+            rows.append(row)
+            del search, store
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    keys = list(rows[0].keys())
+    widths = {key: max(len(key), *(len(str(row.get(key, ""))) for row in rows)) for key in keys}
+    print(" | ".join(key.rjust(widths[key]) for key in keys))
+    for row in rows:
+        print(" | ".join(str(row.get(key, "")).rjust(widths[key]) for key in keys))
+
+
+# -----------------------------
+# 5) 회귀 비교
+# -----------------------------
+def compare(
+    rows: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    quality_drop: float = 0.02,       # recall / MRR 이 이 값보다 많이 떨어지면 회귀
+    latency_ratio: float = 1.5,       # p99 가 이 배수 이상 (그리고 1ms 이상) 늘어나면 회귀
+) -> List[str]:
+    """기준 결과 대비 회귀 목록 (비어 있으면 통과)."""
+    previous = {(row["dataset"], row["config"]): row for row in baseline}
+    problems = []
+    for row in rows:
+        old = previous.get((row["dataset"], row["config"]))
+        if old is None:
+            continue
+        name = f"{row['dataset']}/{row['config']}"
+        for key in row:
+            if key.startswith("recall@") or key == "mrr":
+                if key in old and row[key] < old[key] - quality_drop:
+                    problems.append(f"{name}: {key} {old[key]} -> {row[key]}")
+        if row["p99_ms"] > old["p99_ms"] * latency_ratio and row["p99_ms"] - old["p99_ms"] > 1.0:
+            problems.append(f"{name}: p99_ms {old['p99_ms']} -> {row['p99_ms']}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline retrieval benchmark")
+    parser.add_argument("--datasets", nargs="+", default=list(QUESTIONS))
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS))
+    parser.add_argument("--embeddings", default="stub", help="local_embeddings.get_embeddings 백엔드 (stub | local | ...)")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--chunk-overlap", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=int, default=1, help="청크 복제 배수 (대용량 구축 시간·메모리 측정)")
+    parser.add_argument("--save", help="결과를 JSON 으로 저장")
+    parser.add_argument("--baseline", help="이전 --save 결과와 비교")
+    args = parser.parse_args()
+
+    from local_embeddings import get_embeddings
+
+    results = run(
+        args.datasets, args.configs, get_embeddings(args.embeddings),
+        k=args.k, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, repeat=args.repeat,
+        scale=args.scale,
+    )
+    print_table(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f))
+        for problem in regressions:
+            print(f"REGRESSION {problem}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against", args.baseline)
@@ -0,0 +1,407 @@
+# pip install langchain-text-splitters tiktoken pypdf python-docx
+# --------------------------------------------------------------
+# span_splitter.py
+#   원문 위치(오프셋)를 보존하는 텍스트 분할기 (RecursiveCharacterTextSplitter / CharacterTextSplitter 대체)
+#     - 구분자 검색은 원문 위에서 (pos, endpos) 로 수행 → 조각마다 문자열을 복사하지 않음
+#     - 결과는 청크 문자열 대신 (doc_id, start, end) 구간을 배열에 저장, 텍스트는 필요할 때만 생성
+#     - separators / chunk_size / chunk_overlap / keep_separator / strip_whitespace 의미는 langchain 과 동일
+#       (split_text 결과가 langchain 분할기와 같은 문자열 목록)
+#     - length_function 으로 토큰 기준 크기 지정 가능 (from_tiktoken_encoder)
+# --------------------------------------------------------------
+import re
+from array import array
+from collections import deque
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from langchain_core.documents import Document
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+_LOOKAROUND_PREFIXES = ("(?=", "(?<!", "(?<=", "(?!")
+
+
+class Span(NamedTuple):
+    doc_id: Any
+    start: int
+    end: int
+
+
+# -----------------------------
+# 1) 분할 결과 (구간 배열)
+# -----------------------------
+class ChunkSpans:
+    """
+    청크 구간 목록. 원문은 참조만 하고, 청크 텍스트는 text(i) / texts() / to_documents() 호출 시 생성.
+      spans = splitter.split_spans(all_texts, doc_ids=file_names)
+      spans[0]            # Span(doc_id='소파.docx', start=0, end=498)
+      spans.text(0)       # 청크 문자열
+    """
+
+    def __init__(self, texts: Sequence[str], doc_ids: Sequence[Any], splitter: "SpanSplitter"):
+        self.sources = texts
+        self.doc_ids = doc_ids
+        self._splitter = splitter       # 구분자를 다시 넣어 합친 청크(joins >= 0)를 만들 때 사용
+        self.docs = array("i")          # 원문 번호
+        self.starts = array("q")
+        self.ends = array("q")
+        self.joins = array("i")         # -1: 원문 구간 그대로 / k: 조각을 separators[k] 로 다시 이어 붙인 청크
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> Span:
+        return Span(self.doc_ids[self.docs[i]], self.starts[i], self.ends[i])
+
+    def __iter__(self) -> Iterator[Span]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def text(self, i: int) -> str:
+        source = self.sources[self.docs[i]]
+        start, end, join = self.starts[i], self.ends[i], self.joins[i]
+        if join < 0:
+            return source[start:end]
+        # keep_separator=False 이고 원문의 구분자가 병합 구분자와 다른 경우 (연속 구분자, 정규식 구분자)
+        return self._splitter._join(source, start, end, join)
+
+    def texts(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self.text(i)
+
+    def to_documents(self, metadatas: Optional[Sequence[Dict[str, Any]]] = None) -> List[Document]:
+        """청크마다 Document 생성. metadata 에 원문 metadata + start_index / end_index."""
+        out = []
+        for i in range(len(self)):
+            metadata = dict(metadatas[self.docs[i]]) if metadatas else {"source": self.doc_ids[self.docs[i]]}
+            metadata["start_index"] = self.starts[i]
+            metadata["end_index"] = self.ends[i]
+            out.append(Document(page_content=self.text(i), metadata=metadata))
+        return out
+
+    def memory_bytes(self) -> int:
+        """구간 배열이 차지하는 메모리 (원문 제외)."""
+        return sum(a.itemsize * len(a) for a in (self.docs, self.starts, self.ends, self.joins))
+
+
+# -----------------------------
+# 2) 구분자 위치로 조각 나누기
+# -----------------------------
+def _pieces(
+    text: str, start: int, end: int, pattern: Any, keep: Union[bool, str], is_regex: bool = False
+) -> Iterator[Tuple[int, int]]:
+    """langchain _split_text_with_regex 와 같은 조각을 (start, end) 로 차례로 반환 (빈 조각 제외)."""
+    if pattern is None:   # 빈 구분자: 한 글자씩
+        yield from zip(range(start, end), range(start + 1, end + 1))
+        return
+    if is_regex:
+        # 정규식(lookbehind, ^ 등)은 langchain 과 같도록 조각 문자열 기준으로 검색
+        matches, offset = pattern.finditer(text[start:end]), start
+    else:
+        # 고정 문자열 구분자는 원문 위에서 바로 검색
+        matches, offset = pattern.finditer(text, start, end), 0
+    prev = start
+    for m in matches:
+        s, e = m.span()
+        s, e = s + offset, e + offset
+        if keep == "end":
+            cut, nxt = e, e
+        elif keep:        # True / "start": 구분자를 다음 조각 앞에 붙임
+            cut, nxt = s, s
+        else:
+            cut, nxt = s, e
+        if cut > prev:
+            yield prev, cut
+        prev = nxt
+    if end > prev:
+        yield prev, end
+
+
+# -----------------------------
+# 3) 분할기
+# -----------------------------
+class SpanSplitter:
+    def __init__(
+        self,
+        separators: Optional[List[str]] = None,   # None 이면 ["\n\n", "\n", " ", ""]
+        chunk_size: int = 4000,
+        chunk_overlap: int = 200,
+        length_function: Callable[[str], int] = len,
+        keep_separator: Union[bool, str] = True,  # True/"start" | "end" | False
+        is_separator_regex: bool = False,
+        strip_whitespace: bool = True,
+        recursive: bool = True,                   # False 이면 CharacterTextSplitter (첫 구분자 하나만 사용)
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), should be smaller."
+            )
+        self.separators = list(separators) if separators is not None else list(DEFAULT_SEPARATORS)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.length_function = length_function
+        self.keep_separator = keep_separator
+        self.is_separator_regex = is_separator_regex
+        self.strip_whitespace = strip_whitespace
+        self.recursive = recursive
+        self._char_length = length_function is len   # 글자 수 기준이면 조각을 복사하지 않고 end - start
+        self._patterns = [
+            re.compile(s if is_separator_regex else re.escape(s)) if s else None for s in self.separators
+        ]
+        # 청크를 합칠 때 다시 넣는 구분자 (langchain 과 동일한 규칙)
+        self._merge_separators = []
+        for s in self.separators:
+            lookaround = is_separator_regex and s.startswith(_LOOKAROUND_PREFIXES)
+            self._merge_separators.append("" if keep_separator or (lookaround and not recursive) else s)
+        self._merge_lengths = [length_function(s) for s in self._merge_separators]
+
+    @classmethod
+    def from_splitter(cls, splitter: Any) -> "SpanSplitter":
+        """기존 RecursiveCharacterTextSplitter / CharacterTextSplitter 설정을 그대로 사용."""
+        recursive = hasattr(splitter, "_separators")
+        return cls(
+            separators=list(splitter._separators) if recursive else [splitter._separator],
+            chunk_size=splitter._chunk_size,
+            chunk_overlap=splitter._chunk_overlap,
+            length_function=splitter._length_function,
+            keep_separator=splitter._keep_separator,
+            is_separator_regex=splitter._is_separator_regex,
+            strip_whitespace=splitter._strip_whitespace,
+            recursive=recursive,
+        )
+
+    @classmethod
+    def from_tiktoken_encoder(
+        cls, encoding_name: str = "cl100k_base", model_name: Optional[str] = None, **kwargs: Any
+    ) -> "SpanSplitter":
+        """토큰 수 기준 분할 (langchain from_tiktoken_encoder 와 같은 길이 계산)."""
+        try:
+            import tiktoken
+        except ImportError:
+            raise ImportError("Could not import tiktoken. Please install it with `pip install tiktoken`.")
+        enc = tiktoken.encoding_for_model(model_name) if model_name else tiktoken.get_encoding(encoding_name)
+
+        def token_length(text: str) -> int:
+            return len(enc.encode(text, allowed_special=set(), disallowed_special="all"))
+
+        return cls(length_function=token_length, **kwargs)
+
+    def _join(self, text: str, start: int, end: int, sep: int) -> str:
+        # 구간의 조각을 병합 구분자로 다시 이어 붙임 (원문의 연속 구분자·정규식 구분자가 있는 청크)
+        pieces = _pieces(text, start, end, self._patterns[sep], False, self.is_separator_regex)
+        joined = self._merge_separators[sep].join(text[s:e] for s, e in pieces)
+        return joined.strip() if self.strip_whitespace else joined
+
+    def _measure(self, text: str, pieces: Iterable[Tuple[int, int]]) -> Iterator[Tuple[int, int, int]]:
+        if self._char_length:
+            return ((s, e, e - s) for s, e in pieces)
+        length = self.length_function
+        return ((s, e, length(text[s:e])) for s, e in pieces)
+
+    # -----------------------------
+    # 조각 병합 (langchain _merge_splits 와 같은 규칙)
+    # -----------------------------
+    def _contiguous(self, text: str, current: deque, total: int, sep: int) -> bool:
+        # 조각 사이가 모두 병합 구분자 한 개이면 이어 붙인 결과가 원문 구간 그대로와 같음
+        merge_sep = self._merge_separators[sep]
+        n = len(merge_sep)
+        start, end = current[0][0], current[-1][1]
+        if not self.is_separator_regex:
+            # 고정 문자열 구분자: 조각 사이 간격은 구분자 길이의 배수이므로 전체 길이만 비교
+            chars = total if self._char_length else sum(e - s for s, e, _ in current) + n * (len(current) - 1)
+            return end - start == chars
+        prev_end = start
+        for s, e, _ in current:
+            if s != start and not (s - prev_end == n and text.startswith(merge_sep, prev_end)):
+                return False
+            prev_end = e
+        return True
+
+    def _merge(self, out: ChunkSpans, doc: int, text: str, pieces: Iterable[Tuple[int, int, int]], sep: int) -> None:
+        sep_len = self._merge_lengths[sep]
+        # keep_separator=False 이면 조각 사이의 구분자가 빠지므로, 병합 구분자가 "" 인 경우((?<=\.) 같은
+        # lookbehind + 글자를 소비하는 정규식)에도 조각이 붙어 있지 않으면 다시 이어 붙여야 함
+        needs_join = bool(self._merge_separators[sep]) or not self.keep_separator
+        strip = self.strip_whitespace
+        chunk_size, overlap = self.chunk_size, self.chunk_overlap
+        docs, starts, ends, joins = out.docs.append, out.starts.append, out.ends.append, out.joins.append
+
+        def emit(current: deque, total: int) -> None:
+            start, end = current[0][0], current[-1][1]
+            join = sep if needs_join and not self._contiguous(text, current, total, sep) else -1
+            if join >= 0:
+                if not self._join(text, start, end, join):
+                    return
+            elif strip:
+                while start < end and text[start].isspace():
+                    start += 1
+                while end > start and text[end - 1].isspace():
+                    end -= 1
+                if end <= start:
+                    return
+            docs(doc)
+            starts(start)
+            ends(end)
+            joins(join)
+
+        current: deque = deque()
+        total = 0
+        for piece in pieces:
+            len_ = piece[2]
+            if total + len_ + (sep_len if current else 0) > chunk_size:
+                if current:
+                    emit(current, total)
+                    while total > overlap or (total + len_ + (sep_len if current else 0) > chunk_size and total > 0):
+                        total -= current[0][2] + (sep_len if len(current) > 1 else 0)
+                        current.popleft()
+            current.append(piece)
+            total += len_ + (sep_len if len(current) > 1 else 0)
+        if current:
+            emit(current, total)
+
+    # -----------------------------
+    # 재귀 분할 (langchain RecursiveCharacterTextSplitter._split_text 와 같은 규칙)
+    # -----------------------------
+    def _split(self, out: ChunkSpans, doc: int, text: str, start: int, end: int, first: int) -> None:
+        last = len(self.separators) - 1
+        sep, rest = last, last + 1
+        for i in range(first, len(self.separators)):
+            pattern = self._patterns[i]
+            if pattern is None:
+                sep = i
+                break
+            found = (
+                pattern.search(text[start:end]) if self.is_separator_regex else pattern.search(text, start, end)
+            )
+            if found:
+                sep, rest = i, i + 1
+                break
+
+        # 크기 미만 조각이 이어지는 구간은 병합, 큰 조각은 다음 구분자로 다시 분할 (조각 목록을 만들지 않고 흘려 보냄)
+        chunk_size = self.chunk_size
+        pieces = _pieces(text, start, end, self._patterns[sep], self.keep_separator, self.is_separator_regex)
+        for small, group in groupby(self._measure(text, pieces), key=lambda piece: piece[2] < chunk_size):
+            if small:
+                self._merge(out, doc, text, group, sep)
+                continue
+            for s, e, _ in group:
+                if rest > last:
+                    out.docs.append(doc)
+                    out.starts.append(s)
+                    out.ends.append(e)
+                    out.joins.append(-1)
+                else:
+                    self._split(out, doc, text, s, e, rest)
+
+    def _split_one(self, out: ChunkSpans, doc: int, text: str) -> None:
+        if self.recursive:
+            self._split(out, doc, text, 0, len(text), 0)
+            return
+        pieces = _pieces(text, 0, len(text), self._patterns[0], self.keep_separator, self.is_separator_regex)
+        self._merge(out, doc, text, self._measure(text, pieces), 0)
+
+    # -----------------------------
+    # 공개 API
+    # -----------------------------
+    def split_spans(self, texts: Union[str, Sequence[str]], doc_ids: Optional[Sequence[Any]] = None) -> ChunkSpans:
+        """원문 목록을 분할해 구간 배열로 반환 (doc_ids 가 없으면 원문 번호)."""
+        if isinstance(texts, str):
+            texts = [texts]
+        doc_ids = list(doc_ids) if doc_ids is not None else list(range(len(texts)))
+        if len(doc_ids) != len(texts):
+            raise ValueError("doc_ids must have the same length as texts")
+        out = ChunkSpans(texts, doc_ids, self)
+        for doc, text in enumerate(texts):
+            self._split_one(out, doc, text)
+        return out
+
+    def split_text(self, text: str) -> List[str]:
+        """langchain split_text 와 같은 결과 (문자열 목록)."""
+        return list(self.split_spans(text).texts())
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        """langchain split_documents(add_start_index=True) 처럼 metadata 에 start_index / end_index 추가."""
+        documents = list(documents)
+        spans = self.split_spans([d.page_content for d in documents])
+        return spans.to_documents([d.metadata for d in documents])
+
+
+# -----------------------------
+# 4) 처리량 비교 (files 폴더 등의 PDF / docx)
+# -----------------------------
+def _load_files(folders: Sequence[str]) -> Dict[str, str]:
+    import os
+
+    from pypdf import PdfReader
+
+    texts = {}
+    for folder in folders:
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            extension = os.path.splitext(name)[1].lower()
+            try:
+                if extension == ".pdf":
+                    texts[path] = "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+                elif extension == ".docx":
+                    from docx import Document as DocxDocument
+
+                    texts[path] = "\n".join(p.text for p in DocxDocument(path).paragraphs if p.text.strip() != "")
+            except Exception as e:
+                print(f"Error processing file {path}. Error: {e}")
+    return texts
+
+
+if __name__ == "__main__":
+    # python span_splitter.py [반복 횟수] [폴더 ...]
+    import logging
+    import os
+    import sys
+    import time
+    import tracemalloc
+
+    from langchain_text_splitters import CharacterTextSplitter, RecursiveCharacterTextSplitter
+
+    logging.disable(logging.WARNING)   # "Created a chunk of size ..." 경고 생략
+    here = os.path.dirname(os.path.abspath(__file__))
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    files = _load_files(sys.argv[2:] or [here, os.path.join(here, "files")])
+    # 5.5 노트북처럼 모든 문서를 하나로 합치고, 반복해서 크기를 늘린 뒤 측정
+    corpus = "\n".join(files.values())
+    big = "\n".join([corpus] * repeat)
+    mb = len(big.encode("utf-8")) / 2**20
+    print(f"{len(files)} files, {len(corpus):,} chars x {repeat} = {len(big):,} chars ({mb:.1f} MB)")
+
+    def measure(fn: Callable[[], Any]) -> Tuple[Any, float, float]:
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        del result
+        tracemalloc.start()
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, elapsed, peak / 2**20
+
+    configs = {
+        "recursive 500/50": RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50),
+        # pypdf / docx 추출 텍스트에는 빈 줄("\n\n")이 없어 줄 단위 구분자로 측정
+        "character 100/10": CharacterTextSplitter(separator="\n", chunk_size=100, chunk_overlap=10),
+        # 토큰 기준 분할 대용 (tiktoken 인코딩 파일 없이 실행 가능하도록 단어 수 사용)
+        "recursive 120/20 words": RecursiveCharacterTextSplitter(
+            chunk_size=120, chunk_overlap=20, length_function=lambda t: len(t.split())
+        ),
+    }
+    for name, splitter in configs.items():
+        span_splitter = SpanSplitter.from_splitter(splitter)
+        for text in files.values():   # 문서별 결과가 langchain 과 같은지 확인
+            assert span_splitter.split_text(text) == splitter.split_text(text), name
+        chunks, t_lc, m_lc = measure(lambda: splitter.split_text(big))
+        spans, t_span, m_span = measure(lambda: span_splitter.split_spans(big))
+        texts, t_text, _ = measure(lambda: list(spans.texts()))
+        assert texts == chunks, name
+        print(
+            f"[{name}] chunks={len(spans):,}\n"
+            f"  langchain split_text : {t_lc:6.2f}s {mb / t_lc:7.1f} MB/s  peak {m_lc:6.1f} MB\n"
+            f"  split_spans          : {t_span:6.2f}s {mb / t_span:7.1f} MB/s  peak {m_span:6.1f} MB"
+            f"  (spans {spans.memory_bytes() / 2**20:.2f} MB)\n"
+            f"  + texts()            : {t_text:6.2f}s"
+        )
@@ -0,0 +1,163 @@
+# pip install langchain-core
+# --------------------------------------------------------------
+# streaming_qa.py
+#   검색 결과(출처)를 먼저 돌려주고, 답변은 생성되는 즉시 토큰 단위로 스트리밍
+#   ChatOpenAI / OllamaLLM 모두 llm.stream() 을 지원하므로 같은 방식으로 동작
+# --------------------------------------------------------------
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.prompts import PromptTemplate
+
+# RetrievalQA(chain_type="stuff") 의 기본 프롬프트와 동일
+DEFAULT_PROMPT = PromptTemplate(
+    template="""Use the following pieces of context to answer the question at the end. If you don't know the answer, just say that you don't know, don't try to make up an answer.
+
+{context}
+
+Question: {question}
+Helpful Answer:""",
+    input_variables=["context", "question"],
+)
+
+
+@dataclass
+class StreamMetrics:
+    retrieval_s: float = 0.0              # 검색 소요 시간
+    first_token_s: Optional[float] = None  # 질문 시점부터 첫 토큰까지 (TTFT)
+    total_s: float = 0.0                  # 전체 소요 시간
+    n_chunks: int = 0                     # 받은 스트림 청크 수
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _ThinkFilter:
+    """deepseek-r1 의 <think>...</think> 추론 구간을 스트림에서 제거."""
+
+    OPEN, CLOSE = "<think>", "</think>"
+
+    def __init__(self):
+        self.buf = ""
+        self.in_think = False
+
+    def feed(self, text: str) -> str:
+        self.buf += text
+        out = []
+        while True:
+            if self.in_think:
+                idx = self.buf.find(self.CLOSE)
+                if idx < 0:
+                    self.buf = self.buf[-len(self.CLOSE):]
+                    break
+                self.buf = self.buf[idx + len(self.CLOSE):].lstrip("\n")
+                self.in_think = False
+            else:
+                idx = self.buf.find(self.OPEN)
+                if idx < 0:
+                    # 태그가 청크 경계에서 잘렸을 수 있으므로 접두어는 남겨둠
+                    keep = next((n for n in range(len(self.OPEN) - 1, 0, -1)
+                                 if self.buf.endswith(self.OPEN[:n])), 0)
+                    out.append(self.buf[: len(self.buf) - keep])
+                    self.buf = self.buf[len(self.buf) - keep:]
+                    break
+                out.append(self.buf[:idx])
+                self.buf = self.buf[idx + len(self.OPEN):]
+                self.in_think = True
+        return "".join(out)
+
+    def flush(self) -> str:
+        rest, self.buf = ("" if self.in_think else self.buf), ""
+        return rest
+
+
+def _chunk_text(chunk: Any) -> str:
+    # ChatOpenAI 는 AIMessageChunk, OllamaLLM 은 str 을 스트리밍
+    content = getattr(chunk, "content", chunk)
+    return content if isinstance(content, str) else str(content)
+
+
+def stream_qa(
+    query: str,
+    retriever: Any,
+    llm: Any,
+    prompt: PromptTemplate = DEFAULT_PROMPT,
+    hide_think: bool = False,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    다음 순서로 (이벤트, 값) 을 yield 한다.
+      ("sources", List[Document]) → ("token", str) ... → ("metrics", StreamMetrics)
+    """
+    metrics = StreamMetrics()
+    t0 = time.perf_counter()
+
+    docs: List[Document] = retriever.invoke(query)
+    metrics.retrieval_s = time.perf_counter() - t0
+    yield "sources", docs
+
+    context = "\n\n".join(doc.page_content for doc in docs)
+    text = prompt.format(context=context, question=query)
+    think = _ThinkFilter() if hide_think else None
+
+    for chunk in llm.stream(text):
+        metrics.n_chunks += 1
+        token = _chunk_text(chunk)
+        if think is not None:
+            token = think.feed(token)
+        if metrics.first_token_s is None:
+            token = token.lstrip()  # 답변 앞의 빈 줄은 첫 토큰으로 보지 않음
+        if not token:
+            continue
+        if metrics.first_token_s is None:
+            metrics.first_token_s = time.perf_counter() - t0
+        yield "token", token
+
+    if think is not None:
+        rest = think.flush()
+        if rest:
+            if metrics.first_token_s is None:
+                metrics.first_token_s = time.perf_counter() - t0
+            yield "token", rest
+
+    metrics.total_s = time.perf_counter() - t0
+    yield "metrics", metrics
+
+
+class StreamingQA:
+    """
+    기존 RetrievalQA 체인의 retriever / llm / prompt 를 그대로 사용하는 스트리밍 진입점.
+    qa_chain.invoke(query) 대신 for event, value in StreamingQA.from_chain(qa_chain).stream(query)
+    """
+
+    def __init__(self, retriever: Any, llm: Any, prompt: PromptTemplate = DEFAULT_PROMPT, hide_think: bool = False):
+        self.retriever = retriever
+        self.llm = llm
+        self.prompt = prompt
+        self.hide_think = hide_think
+
+    @classmethod
+    def from_chain(cls, qa_chain: Any, hide_think: bool = False) -> "StreamingQA":
+        llm_chain = qa_chain.combine_documents_chain.llm_chain
+        return cls(qa_chain.retriever, llm_chain.llm, llm_chain.prompt, hide_think=hide_think)
+
+    def stream(self, query: str) -> Iterator[Tuple[str, Any]]:
+        return stream_qa(query, self.retriever, self.llm, self.prompt, self.hide_think)
+
+    def print_stream(self, query: str) -> Dict[str, Any]:
+        """노트북에서 바로 쓰기 위한 헬퍼: 출처 → 답변(실시간) → 지표 순으로 출력."""
+        answer = []
+        metrics = None
+        for event, value in self.stream(query):
+            if event == "sources":
+                print("📚 출처:", [doc.metadata.get("source", doc.page_content[:30]) for doc in value])
+                print("💡 답변: ", end="")
+            elif event == "token":
+                answer.append(value)
+                print(value, end="", flush=True)
+            else:
+                metrics = value
+        print()
+        print("⏱️", metrics.to_dict())
+        return {"query": query, "result": "".join(answer), "metrics": metrics.to_dict()}
@@ -0,0 +1,218 @@
+# pip install langchain-core
+# --------------------------------------------------------------
+# summary_memory.py
+#   토큰 상한이 있는 대화 메모리 (ConversationBufferMemory 대체)
+#     - 최근 대화는 그대로 유지
+#     - 상한을 넘는 오래된 대화는 백그라운드에서 요약으로 누적
+#     - 요약 자체도 max_tokens 의 일정 비율 이하로 유지 (넘으면 다시 압축, 그래도 넘으면 잘라냄)
+#     - 세션별 대화는 압축(zlib)해서 보관 → 한 서버에서 많은 세션 유지
+# --------------------------------------------------------------
+import json
+import threading
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+SUMMARY_PROMPT = """다음은 지금까지의 대화 요약과 그 이후에 이어진 대화입니다.
+새 대화 내용을 반영하여 요약을 갱신하세요. 사용자의 증상, 질문 의도, 이미 안내한 핵심 정보는 반드시 남기고 간결하게 작성하세요.
+요약은 {max_tokens} 토큰 이내로 작성하세요.
+
+현재 요약:
+{summary}
+
+새 대화:
+{lines}
+
+갱신된 요약:"""
+
+COMPRESS_PROMPT = """다음 대화 요약이 너무 깁니다. 사용자의 증상, 질문 의도, 이미 안내한 핵심 정보만 남겨 {max_tokens} 토큰 이내로 줄이세요.
+
+요약:
+{summary}
+
+줄인 요약:"""
+
+SUMMARY_PREFIX = "이전 대화 요약: "
+
+
+def _pack(human: str, ai: str) -> bytes:
+    return zlib.compress(json.dumps([human, ai], ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(blob: bytes) -> Tuple[str, str]:
+    human, ai = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return human, ai
+
+
+class _Session:
+    __slots__ = ("turns", "pending", "summary", "summary_tokens", "summarizing", "lock")
+
+    def __init__(self):
+        self.turns: deque = deque()     # (압축된 대화, 토큰 수) - 최근 대화
+        self.pending: deque = deque()   # 요약 대기 중인 오래된 대화
+        self.summary: bytes = b""       # 압축된 누적 요약
+        self.summary_tokens = 0
+        self.summarizing = False
+        self.lock = threading.Lock()
+
+
+class SummaryBufferMemory:
+    """
+    세션 ID 별 대화 메모리.
+    load(session_id) 결과(요약 + 최근 대화)는 항상 max_tokens 이하로 유지된다.
+    """
+
+    def __init__(
+        self,
+        llm: Any,                                   # 요약에 사용할 LLM (ChatOpenAI 등)
+        max_tokens: int = 1000,                     # 프롬프트에 넣을 대화 이력의 토큰 상한
+        summary_ratio: float = 0.5,                 # 요약이 차지할 수 있는 최대 비율 (나머지는 최근 대화)
+        token_counter: Optional[Callable[[str], int]] = None,
+        max_sessions: int = 10000,                  # 초과 시 가장 오래 사용하지 않은 세션 삭제
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.llm = llm
+        self.max_tokens = max_tokens
+        self.max_summary_tokens = max(1, int(max_tokens * summary_ratio))
+        self.count_tokens = token_counter or llm.get_num_tokens
+        self.max_sessions = max_sessions
+        self.executor = executor or ThreadPoolExecutor(max_workers=2, thread_name_prefix="summary")
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # -----------------------------
+    # 세션 관리
+    # -----------------------------
+    def _session(self, session_id: str) -> _Session:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session()
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    # -----------------------------
+    # 저장 / 조회
+    # -----------------------------
+    def save_context(self, session_id: str, human: str, ai: str) -> None:
+        """한 턴을 저장. 상한을 넘으면 오래된 턴을 요약 대기열로 옮기고 요약 작업을 예약."""
+        session = self._session(session_id)
+        tokens = self.count_tokens(human) + self.count_tokens(ai)
+        with session.lock:
+            session.turns.append((_pack(human, ai), tokens))
+            budget = self.max_tokens - session.summary_tokens
+            total = sum(t for _, t in session.turns)
+            while len(session.turns) > 1 and total > budget:
+                blob, t = session.turns.popleft()
+                session.pending.append((blob, t))
+                total -= t
+            schedule = bool(session.pending) and not session.summarizing
+            if schedule:
+                session.summarizing = True
+        if schedule:
+            # 요약은 응답 경로 밖(백그라운드 스레드)에서 수행
+            self.executor.submit(self._summarize, session)
+
+    def load(self, session_id: str) -> List[BaseMessage]:
+        """요약(SystemMessage) + 최근 대화(Human/AIMessage) 목록을 토큰 상한 내에서 반환."""
+        session = self._session(session_id)
+        with session.lock:
+            summary = zlib.decompress(session.summary).decode("utf-8") if session.summary else ""
+            budget = self.max_tokens - session.summary_tokens
+            # 최근 대화부터 예산 안에서 채우고, 아직 요약되지 않은 대화도 남는 예산이 있으면 포함
+            turns: List[Tuple[str, str]] = []
+            for blob, t in reversed(list(session.pending) + list(session.turns)):
+                if t > budget:
+                    break
+                turns.append(_unpack(blob))
+                budget -= t
+
+        messages: List[BaseMessage] = []
+        if summary:
+            messages.append(SystemMessage(content=SUMMARY_PREFIX + summary))
+        for human, ai in reversed(turns):
+            messages.append(HumanMessage(content=human))
+            messages.append(AIMessage(content=ai))
+        return messages
+
+    # -----------------------------
+    # 백그라운드 요약
+    # -----------------------------
+    def _complete(self, prompt: str) -> str:
+        result = self.llm.invoke(prompt)
+        return getattr(result, "content", result).strip()
+
+    def _target(self) -> int:
+        # SystemMessage 접두어 몫을 뺀 요약 본문의 목표 길이
+        return max(1, self.max_summary_tokens - self.count_tokens(SUMMARY_PREFIX))
+
+    def _fit(self, summary: str) -> Tuple[str, int]:
+        """요약(접두어 포함)이 max_summary_tokens 를 넘으면 한 번 더 압축하고, 그래도 넘으면 뒤를 잘라냄."""
+        tokens = self.count_tokens(SUMMARY_PREFIX + summary)
+        if tokens <= self.max_summary_tokens:
+            return summary, tokens
+        summary = self._complete(COMPRESS_PROMPT.format(summary=summary, max_tokens=self._target()))
+        tokens = self.count_tokens(SUMMARY_PREFIX + summary)
+        if tokens <= self.max_summary_tokens:
+            return summary, tokens
+        # 글자 수 이진 탐색으로 상한 안에 들어가는 가장 긴 앞부분
+        lo, hi = 0, len(summary)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.count_tokens(SUMMARY_PREFIX + summary[:mid]) <= self.max_summary_tokens:
+                lo = mid
+            else:
+                hi = mid - 1
+        summary = summary[:lo]
+        return summary, self.count_tokens(SUMMARY_PREFIX + summary)
+
+    def _summarize(self, session: _Session) -> None:
+        try:
+            while True:
+                with session.lock:
+                    if not session.pending:
+                        session.summarizing = False
+                        return
+                    batch = list(session.pending)
+                    summary = zlib.decompress(session.summary).decode("utf-8") if session.summary else ""
+
+                lines = []
+                for blob, _ in batch:
+                    human, ai = _unpack(blob)
+                    lines.append(f"Human: {human}\nAI: {ai}")
+                new_summary = self._complete(
+                    SUMMARY_PROMPT.format(summary=summary or "(없음)", lines="\n".join(lines), max_tokens=self._target())
+                )
+                new_summary, summary_tokens = self._fit(new_summary)
+
+                with session.lock:
+                    for _ in batch:
+                        session.pending.popleft()
+                    session.summary = zlib.compress(new_summary.encode("utf-8"))
+                    session.summary_tokens = summary_tokens
+        except Exception as e:
+            # 요약 실패 시 대기 중인 대화는 유지(조회 시 예산 내에서 그대로 사용)하고 다음 저장 때 재시도
+            print(f"Error summarizing conversation. Error: {e}")
+            with session.lock:
+                session.summarizing = False
+
+
+def invoke_with_memory(chain: Any, memory: SummaryBufferMemory, session_id: str, question: str) -> Dict[str, Any]:
+    """
+    ConversationalRetrievalChain 을 memory 인자 없이 만들고 이 함수로 호출.
+    chat_history 를 직접 넘기므로 대화 이력이 무한히 늘어나지 않는다.
+    """
+    result = chain.invoke({"question": question, "chat_history": memory.load(session_id)})
+    answer = result.get("result") or result.get("answer", "")
+    memory.save_context(session_id, question, answer)
+    return result
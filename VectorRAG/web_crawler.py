@@ -0,0 +1,255 @@
+# pip install requests beautifulsoup4 langchain-core
+# --------------------------------------------------------------
+# web_crawler.py
+#   여러 URL 을 동시에 가져오는 웹 로더 (WebBaseLoader 대체)
+#     - 스레드 풀로 동시 요청, 호스트별 동시 연결 수·요청 간격 제한 (politeness)
+#     - ETag / Last-Modified 를 디스크에 저장하고 조건부 GET (304 이면 본문 전송 없음)
+#     - 추출한 본문 해시가 이전과 같으면 제외 → 실제로 바뀐 페이지만 분할·임베딩
+# --------------------------------------------------------------
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import requests
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+
+
+# -----------------------------
+# 1) 디스크 캐시
+# -----------------------------
+class CrawlCache:
+    """URL 별 {etag, last_modified, content_hash, fetched_at} 를 JSON 파일로 보관."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Dict[str, Any]:
+        path = self._path(url)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        path = self._path(url)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"url": url, **entry}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+# -----------------------------
+# 2) 호스트별 요청 제한
+# -----------------------------
+class _HostLimiter:
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._hosts: Dict[str, list] = {}     # host -> [Semaphore, Lock, 다음 요청 가능 시각]
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> list:
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = [threading.BoundedSemaphore(self.max_concurrent), threading.Lock(), 0.0]
+            return self._hosts[host]
+
+    def acquire(self, host: str) -> None:
+        state = self._host(host)
+        state[0].acquire()
+        with state[1]:
+            # 같은 호스트의 요청 시작 시각이 min_interval 이상 벌어지도록 예약
+            now = time.monotonic()
+            start = max(now, state[2])
+            state[2] = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def release(self, host: str) -> None:
+        self._host(host)[0].release()
+
+    def backoff(self, host: str, seconds: float) -> None:
+        # 429/503 의 Retry-After 만큼 해당 호스트 전체 요청을 늦춤
+        state = self._host(host)
+        with state[1]:
+            state[2] = max(state[2], time.monotonic() + seconds)
+
+
+# -----------------------------
+# 3) 로더
+# -----------------------------
+def _extract_text(html: str) -> Dict[str, str]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    return {"title": title, "text": soup.get_text("\n", strip=True)}
+
+
+class ConcurrentWebLoader(BaseLoader):
+    """
+    loader = ConcurrentWebLoader(urls, cache_dir="d:/data/web_cache")
+    changed_docs = loader.load()     # 새로 생기거나 내용이 바뀐 페이지만 반환
+    loader.results                   # URL 별 상태: new / changed / unchanged / not_modified / error
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        cache_dir: str,
+        max_workers: int = 16,            # 전체 동시 요청 수
+        per_host: int = 2,                # 호스트별 동시 요청 수
+        min_interval: float = 0.5,        # 같은 호스트 요청 사이 최소 간격(초)
+        timeout: float = 10.0,
+        max_retries: int = 2,
+        headers: Optional[Dict[str, str]] = None,
+        force: bool = False,              # True 이면 캐시와 무관하게 모든 페이지 반환
+        auto_commit: bool = True,         # False 이면 commit() 호출 전까지 캐시를 갱신하지 않음 (임베딩 실패 대비)
+    ):
+        self.urls = list(dict.fromkeys(urls))
+        self.cache = CrawlCache(cache_dir)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.headers = {"User-Agent": os.environ.get("USER_AGENT", "ConcurrentWebLoader/1.0"), **(headers or {})}
+        self.force = force
+        self.auto_commit = auto_commit
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._limiter = _HostLimiter(per_host, min_interval)
+        self._local = threading.local()   # 스레드별 requests.Session (연결 재사용)
+        self.results: List[Dict[str, Any]] = []
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            self._local.session.headers.update(self.headers)
+        return self._local.session
+
+    def _get(self, url: str, cached: Dict[str, Any]) -> requests.Response:
+        host = urlparse(url).netloc
+        headers = {}
+        if cached.get("etag") and not self.force:
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified") and not self.force:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            self._limiter.acquire(host)
+            try:
+                response = self._session().get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException:
+                if attempt == self.max_retries:
+                    raise
+                self._limiter.backoff(host, 2 ** attempt)
+                continue
+            finally:
+                self._limiter.release(host)
+            if response.status_code in (429, 503) and attempt < self.max_retries:
+                retry_after = response.headers.get("Retry-After", "")
+                self._limiter.backoff(host, float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+                continue
+            return response
+        return response
+
+    def _fetch(self, url: str) -> Dict[str, Any]:
+        cached = self.cache.get(url)
+        try:
+            response = self._get(url, cached)
+            if response.status_code == 304:
+                return {"url": url, "status": "not_modified", "document": None}
+            response.raise_for_status()
+            if response.encoding is None or response.encoding.lower() == "iso-8859-1":
+                response.encoding = response.apparent_encoding
+            page = _extract_text(response.text)
+        except Exception as e:
+            print(f"Error fetching {url}. Error: {e}")
+            return {"url": url, "status": "error", "document": None, "error": str(e)}
+
+        content_hash = hashlib.sha1(page["text"].encode("utf-8")).hexdigest()
+        entry = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "fetched_at": time.time(),
+        }
+        if self.auto_commit:
+            self.cache.put(url, entry)
+        else:
+            self._pending[url] = entry
+        if cached.get("content_hash") == content_hash and not self.force:
+            return {"url": url, "status": "unchanged", "document": None}   # 서버가 조건부 GET 을 지원하지 않는 경우
+
+        document = Document(
+            page_content=page["text"],
+            metadata={"source": url, "title": page["title"], "content_hash": content_hash},
+        )
+        return {"url": url, "status": "changed" if cached else "new", "document": document}
+
+    def crawl(self) -> List[Dict[str, Any]]:
+        """모든 URL 의 결과(상태 + 문서) 목록. 순서는 urls 와 같다."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawl") as pool:
+            self.results = list(pool.map(self._fetch, self.urls))
+        return self.results
+
+    def commit(self) -> None:
+        """auto_commit=False 일 때, 반환된 문서를 저장(임베딩)한 뒤 호출해 캐시를 갱신."""
+        for url, entry in self._pending.items():
+            self.cache.put(url, entry)
+        self._pending.clear()
+
+    def lazy_load(self) -> Iterator[Document]:
+        for result in self.crawl():
+            if result["document"] is not None:
+                yield result["document"]
+
+    def stats(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for result in self.results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        return counts
+
+
+if __name__ == "__main__":
+    # 로컬 HTTP 서버로 동작 확인: 첫 실행 new → 재실행 not_modified → 파일 수정 후 changed
+    import functools
+    import http.server
+    import tempfile
+
+    root = tempfile.mkdtemp()
+    for i in range(20):
+        with open(os.path.join(root, f"page{i}.html"), "w", encoding="utf-8") as f:
+            f.write(f"<html><head><title>페이지 {i}</title></head><body><p>본문 {i}</p></body></html>")
+
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    handler = functools.partial(QuietHandler, directory=root)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base}/page{i}.html" for i in range(20)] + [f"{base}/missing.html"]
+    cache_dir = os.path.join(root, "cache")
+
+    for step in ("first", "second", "after edit"):
+        if step == "after edit":
+            time.sleep(1.1)   # Last-Modified 는 초 단위
+            with open(os.path.join(root, "page3.html"), "w", encoding="utf-8") as f:
+                f.write("<html><head><title>페이지 3</title></head><body><p>수정된 본문</p></body></html>")
+        loader = ConcurrentWebLoader(urls, cache_dir, per_host=4, min_interval=0.01)
+        start = time.perf_counter()
+        docs = loader.load()
+        print(f"[{step}] {time.perf_counter() - start:.2f}s, docs={len(docs)}, {loader.stats()}")
+    server.shutdown()